@@ -2,7 +2,7 @@ import discord
 from discord.ext import commands
 import aiosqlite
 from datetime import datetime
-from database import get_user, update_user
+from database import get_user, update_user, connect
 
 class Achievements(commands.Cog):
     def __init__(self, bot):
@@ -169,7 +169,7 @@ class Achievements(commands.Cog):
     
     async def check_achievement_progress(self, user_id: int, achievement_type: str, current_value: int):
         """Cek progress achievement dan unlock jika sudah tercapai"""
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             cursor = await db.execute("""
                 SELECT achievement_id FROM user_achievements 
                 WHERE user_id = ? AND unlocked = 1
@@ -189,7 +189,7 @@ class Achievements(commands.Cog):
         """Unlock achievement dan berikan reward"""
         ach = self.achievements[achievement_id]
         
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             await db.execute("""
                 INSERT OR REPLACE INTO user_achievements 
                 (user_id, achievement_id, unlocked_at, unlocked)
@@ -203,7 +203,7 @@ class Achievements(commands.Cog):
     
     async def get_user_achievements(self, user_id: int):
         """Ambil semua achievements user"""
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             cursor = await db.execute("""
                 SELECT achievement_id, unlocked_at 
                 FROM user_achievements 
@@ -349,35 +349,30 @@ class Achievements(commands.Cog):
         embed.set_footer(text="Gunakan mochi!help untuk kembali ke menu utama")
         await ctx.send(embed=embed)
 
-async def init_achievement_tables():
-    """Initialize achievement tables"""
-    async with aiosqlite.connect("mochi.db") as db:
-        # User achievements table
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS user_achievements (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                achievement_id TEXT NOT NULL,
-                unlocked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                unlocked INTEGER DEFAULT 0,
-                UNIQUE(user_id, achievement_id)
-            )
-        """)
-        
-        # Portfolio tracking
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS portfolio_tracking (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                portfolio_count INTEGER DEFAULT 0,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(user_id)
-            )
-        """)
-        
-        await db.commit()
-        print("✅ Achievement tables created!")
+async def init_achievement_tables(db):
+    """Initialize achievement tables (migration step, dipanggil database.run_migrations)"""
+    # User achievements table
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS user_achievements (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            achievement_id TEXT NOT NULL,
+            unlocked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            unlocked INTEGER DEFAULT 0,
+            UNIQUE(user_id, achievement_id)
+        )
+    """)
+    
+    # Portfolio tracking
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS portfolio_tracking (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            portfolio_count INTEGER DEFAULT 0,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(user_id)
+        )
+    """)
 
 async def setup(bot):
-    await init_achievement_tables()
     await bot.add_cog(Achievements(bot))
\ No newline at end of file
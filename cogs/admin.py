@@ -3,7 +3,7 @@ from discord.ext import commands
 import asyncio
 import aiosqlite
 
-from database import get_user, create_user, update_user
+from database import get_user, create_user, update_user, connect, user_cache, fishing_cache, pool, write_behind
 from utils.helpers import OWNER_ID, RANK_ROLE_IDS, get_rank_role_name, get_rank_title
 from config import MAIN_PORTO_CHANNEL_NAME
 
@@ -65,13 +65,9 @@ class Admin(commands.Cog):
             return
 
         target = member or ctx.author
-        user_data = await get_user(target.id)
-        if not user_data:
-            await create_user(target.id)
-            user_data = await get_user(target.id)
-
-        await update_user(target.id, xp=amount)
-        new_xp = user_data["xp"] + amount
+        # update_user membuat user jika belum ada dan return row terbaru
+        user_data = await update_user(target.id, xp=amount)
+        new_xp = user_data["xp"]
 
         # Import check_level_up from leveling cog
         leveling_cog = self.bot.get_cog('Leveling')
@@ -133,13 +129,8 @@ class Admin(commands.Cog):
             return
 
         target = member or ctx.author
-        user_data = await get_user(target.id)
-        if not user_data:
-            await create_user(target.id)
-            user_data = await get_user(target.id)
-
-        new_currency = user_data["currency"] + amount
-        await update_user(target.id, currency=amount)
+        user_data = await update_user(target.id, currency=amount)
+        new_currency = user_data["currency"]
         await ctx.send(f"💰 {target.mention} dapat **Rp {amount:,}**! Total: Rp {new_currency:,}")
 
     @commands.command(name="forcequestgen")
@@ -171,7 +162,7 @@ class Admin(commands.Cog):
     @commands.is_owner()
     async def quest_debug(self, ctx):
         """🔍 Debug quest system"""
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             cursor = await db.execute("""
                 SELECT quest_id, type, title, target_amount, active, expires_at
                 FROM global_quests 
@@ -213,6 +204,72 @@ class Admin(commands.Cog):
         
         await ctx.send(embed=embed)
     
+    @commands.command(name="dbstats")
+    @commands.is_owner()
+    async def db_stats(self, ctx):
+        """🗄️ Statistik cache & connection pool database"""
+        cache = user_cache.stats
+        embed = discord.Embed(title="🗄️ Database Stats", color=0x3498db)
+        embed.add_field(
+            name="👤 User Cache",
+            value=(
+                f"Entries: `{len(user_cache)}/{user_cache.maxsize}`\n"
+                f"Hits: `{cache['hits']:,}` • Misses: `{cache['misses']:,}`\n"
+                f"Hit rate: `{user_cache.hit_rate:.1%}`\n"
+                f"Evictions: `{cache['evictions']:,}` • Invalidations: `{cache['invalidations']:,}`"
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name="🎣 Fishing Cache",
+            value=(
+                f"Entries: `{len(fishing_cache)}/{fishing_cache.maxsize}`\n"
+                f"Hit rate: `{fishing_cache.hit_rate:.1%}` • Invalidations: `{fishing_cache.stats['invalidations']:,}`"
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name="🔌 Connection Pool",
+            value=(
+                f"Size: `{pool.size}` • Profile: `{pool.profile}`\n"
+                f"Acquires: `{pool.stats['acquires']:,}` • Waits: `{pool.stats['waits']:,}`\n"
+                f"Connects: `{pool.stats['connects']:,}` • Overflow: `{pool.stats['overflow']:,}`"
+            ),
+            inline=False
+        )
+        leveling_cog = self.bot.get_cog('Leveling')
+        if leveling_cog:
+            reactions = leveling_cog.kumpul_filter_stats()
+            embed.add_field(
+                name="🔥 Kumpul Reaction Filter",
+                value=(
+                    f"Sesi aktif: `{reactions['active']}`\n"
+                    f"Rejected (0 I/O): `{reactions['rejected']:,}` • Processed: `{reactions['processed']:,}`"
+                ),
+                inline=False
+            )
+        lb_cog = self.bot.get_cog('Leaderboards')
+        if lb_cog:
+            _, refreshed_at = await lb_cog.get_board("top")
+            embed.add_field(
+                name="🏆 Leaderboard Snapshots",
+                value=(
+                    f"Boards: `{len(lb_cog.boards)}` • Refresh: `{lb_cog.refresh_stats['runs']:,}`x "
+                    f"(`{lb_cog.refresh_stats['last_duration_ms']:.0f}ms`, error `{lb_cog.refresh_stats['errors']}`)\n"
+                    f"{lb_cog.staleness_text(refreshed_at)}"
+                ),
+                inline=False
+            )
+        embed.add_field(
+            name="✍️ Write-Behind",
+            value=(
+                f"Mode: `{write_behind.mode}`\n"
+                f"Queued: `{write_behind.stats['queued']:,}` • Flushes: `{write_behind.stats['flushes']:,}`"
+            ),
+            inline=False
+        )
+        await ctx.send(embed=embed)
+    
     @commands.command(name="giverp", aliases=["givecurrency", "pay"])
     async def give_rp_command(self, ctx, member: discord.Member = None, amount: int = None):
         """💰 Transfer Rupiah (Rp) ke user lain"""
@@ -299,6 +356,7 @@ class Admin(commands.Cog):
                 "`mochi!profile [@user]` - Lihat profil\n"
                 "`mochi!rank` - Info sistem rank\n"
                 "`mochi!top` - Leaderboard\n"
+                "`mochi!myrank [@user]` - Posisi kamu di semua leaderboard\n"
                 "`mochi!help <category>` - Help detail"
             ),
             inline=False
@@ -377,7 +435,8 @@ class Admin(commands.Cog):
                     "`mochi!forcequestgen` - Force spawn quest\n"
                     "`mochi!forceshopgen` - Force spawn shop\n"
                     "`mochi!testquest <type> <amount>` - Test quest\n"
-                    "`mochi!questdebug` - Debug quest system"
+                    "`mochi!questdebug` - Debug quest system\n"
+                    "`mochi!dbstats` - Cache & pool database"
                 ),
                 inline=False
             )
@@ -1,10 +1,109 @@
 import discord
 from discord.ext import commands, tasks
-import aiosqlite
 import random
-import asyncio
+import json
 from datetime import datetime, timedelta
-from database import get_user, create_user, update_user
+from database import (
+    get_user, create_user, update_user, connect, write_behind,
+    get_fishing_state, cache_fish_amount, cache_clear_fish_inventory, cache_upgrade_level,
+    invalidate_fishing_state,
+    get_autofish_sessions, insert_autofish_session, delete_autofish_session, save_autofish_summaries,
+    get_upgrade_levels, save_fish_catches
+)
+from utils.helpers import build_alias_table, alias_sample, alias_probabilities
+from config import (
+    AUTOFISH_TICK_SECONDS, AUTOFISH_OUTPUT_MODE, AUTOFISH_DIGEST_MINUTES,
+    FISHING_ROBOT_MIN_CLAIM_MINUTES, FISHING_ROBOT_MAX_HOURS, FISHING_NET_MAX_MINUTES
+)
+
+# Batas sampel alias per kredit ikan pasif; di atas ini tiap sampel mewakili beberapa ikan
+PASSIVE_FISH_MAX_DRAWS = 1000
+
+# Data ikan dengan rarity dan base price
+FISH_TYPES = {
+    "common": [
+        {"name": "Ikan Teri", "emoji": "🐟", "base_price": 50, "weight": 40},
+        {"name": "Ikan Bandeng", "emoji": "🐠", "base_price": 100, "weight": 30},
+        {"name": "Ikan Nila", "emoji": "🐡", "base_price": 150, "weight": 20},
+        {"name": "Ikan Lele", "emoji": "🎣", "base_price": 120, "weight": 25}
+    ],
+    "uncommon": [
+        {"name": "Ikan Kakap", "emoji": "🐟", "base_price": 300, "weight": 15},
+        {"name": "Ikan Tongkol", "emoji": "🐠", "base_price": 400, "weight": 12},
+        {"name": "Ikan Kembung", "emoji": "🐡", "base_price": 350, "weight": 13}
+    ],
+    "rare": [
+        {"name": "Ikan Tuna", "emoji": "🐟", "base_price": 800, "weight": 7},
+        {"name": "Ikan Salmon", "emoji": "🐠", "base_price": 1000, "weight": 5},
+        {"name": "Ikan Barakuda", "emoji": "🦈", "base_price": 900, "weight": 6}
+    ],
+    "epic": [
+        {"name": "Ikan Marlin", "emoji": "🐟", "base_price": 2000, "weight": 3},
+        {"name": "Ikan Hiu", "emoji": "🦈", "base_price": 3000, "weight": 2}
+    ],
+    "legendary": [
+        {"name": "Ikan Paus", "emoji": "🐋", "base_price": 10000, "weight": 0.5},
+        {"name": "Ikan Naga", "emoji": "🐉", "base_price": 50000, "weight": 0.1}
+    ]
+}
+
+def fish_weight(rarity: str, fish: dict, rod_level: int) -> float:
+    """Weight ikan setelah luck bonus rod (rare+ dapat +0.5 per level)"""
+    if rarity in ["rare", "epic", "legendary"]:
+        return fish["weight"] + rod_level * 0.5
+    return fish["weight"]
+
+def build_fish_table(rod_level: int, fish_types: dict = FISH_TYPES):
+    """Bangun (fish_list, alias table) untuk rod level ini"""
+    fish_list = []
+    weights = []
+    for rarity, fishes in fish_types.items():
+        for fish in fishes:
+            fish_list.append(fish)
+            weights.append(fish_weight(rarity, fish, rod_level))
+    return fish_list, build_alias_table(weights)
+
+def _reference_fish_weights(rod_level: int, fish_types: dict = FISH_TYPES):
+    """Weight versi lama get_random_fish (acuan untuk check_fish_tables)."""
+    luck_bonus = rod_level * 0.5
+    all_fish = []
+    for rarity, fish_list in fish_types.items():
+        for fish in fish_list:
+            adjusted_weight = fish["weight"]
+            if rarity in ["rare", "epic", "legendary"]:
+                adjusted_weight += luck_bonus
+            all_fish.append((fish, adjusted_weight))
+    return all_fish
+
+def check_fish_tables(rod_levels=(0, 1, 10, 25, 50, 100)):
+    """Bandingkan peluang eksak alias table FISH_TYPES dengan weight lama per rod level.
+
+    Urutan ikan dan peluang (toleransi 1e-9) harus sama dengan get_random_fish
+    versi lama. Return list rod level yang gagal.
+    """
+    failures = []
+    for rod_level in rod_levels:
+        fish_list, table = build_fish_table(rod_level)
+        legacy = _reference_fish_weights(rod_level)
+        total_weight = sum(weight for _, weight in legacy)
+        
+        same_order = [fish for fish, _ in legacy] == fish_list
+        error = max(
+            abs(p - weight / total_weight)
+            for p, (_, weight) in zip(alias_probabilities(table), legacy)
+        )
+        legendary = sum(
+            weight for fish, weight in legacy if fish in FISH_TYPES["legendary"]
+        ) / total_weight
+        
+        ok = same_order and error < 1e-9
+        if not ok:
+            failures.append(rod_level)
+        print(
+            f"{'✅' if ok else '❌'} Rod level {rod_level}: {len(fish_list)} ikan, "
+            f"error peluang {error:.1e}, legendary {legendary:.2%}"
+        )
+    return failures
 
 class Fishing(commands.Cog):
     def __init__(self, bot):
@@ -12,37 +111,19 @@ class Fishing(commands.Cog):
         self.fish_market_prices = {}
         self.last_price_update = None
         
-        # Tracking auto fishing
-        self.auto_fishing_tasks = {}
-        self.auto_fishing_end_time = {}
+        # Sesi auto fishing: {user_id: {channel_id, guild_id, duration_hours, end_time, catches, ticks}}
+        # Disimpan juga di tabel autofish_sessions, diproses oleh auto_fishing_ticker
+        self.auto_fishing_sessions = {}
+        # Mode digest: 1 pesan status per channel yang di-edit berkala
+        self._digest_messages = {}  # {channel_id: discord.Message}
+        self._next_digest = None
+        # Fishing Net: {user_id: waktu mulai di voice}, dikredit saat keluar voice
+        self._voice_joined = {}
+        # Waktu gateway terputus (state voice tidak terlihat sampai on_ready berikutnya)
+        self._disconnected_at = None
         
         # Data ikan dengan rarity dan base price
-        self.fish_types = {
-            "common": [
-                {"name": "Ikan Teri", "emoji": "🐟", "base_price": 50, "weight": 40},
-                {"name": "Ikan Bandeng", "emoji": "🐠", "base_price": 100, "weight": 30},
-                {"name": "Ikan Nila", "emoji": "🐡", "base_price": 150, "weight": 20},
-                {"name": "Ikan Lele", "emoji": "🎣", "base_price": 120, "weight": 25}
-            ],
-            "uncommon": [
-                {"name": "Ikan Kakap", "emoji": "🐟", "base_price": 300, "weight": 15},
-                {"name": "Ikan Tongkol", "emoji": "🐠", "base_price": 400, "weight": 12},
-                {"name": "Ikan Kembung", "emoji": "🐡", "base_price": 350, "weight": 13}
-            ],
-            "rare": [
-                {"name": "Ikan Tuna", "emoji": "🐟", "base_price": 800, "weight": 7},
-                {"name": "Ikan Salmon", "emoji": "🐠", "base_price": 1000, "weight": 5},
-                {"name": "Ikan Barakuda", "emoji": "🦈", "base_price": 900, "weight": 6}
-            ],
-            "epic": [
-                {"name": "Ikan Marlin", "emoji": "🐟", "base_price": 2000, "weight": 3},
-                {"name": "Ikan Hiu", "emoji": "🦈", "base_price": 3000, "weight": 2}
-            ],
-            "legendary": [
-                {"name": "Ikan Paus", "emoji": "🐋", "base_price": 10000, "weight": 0.5},
-                {"name": "Ikan Naga", "emoji": "🐉", "base_price": 50000, "weight": 0.1}
-            ]
-        }
+        self.fish_types = FISH_TYPES
         
         # Upgrades yang bisa dibeli
         self.upgrades = {
@@ -75,16 +156,22 @@ class Fishing(commands.Cog):
             }
         }
         
+        # Alias table sampling ikan per rod level: {rod_level: (fish_list, table)}
+        # Kosongkan (self._fish_tables.clear()) kalau fish_types / rumus luck diubah
+        self._fish_tables = {}
+        
         # Tax rate untuk penjualan ikan
         self.sell_tax_rate = 0.25  # 25% pajak
         
         # Start background task
         self.update_market_prices.start()
     
-    def cog_unload(self):
+    async def cog_unload(self):
         self.update_market_prices.cancel()
-        for task in self.auto_fishing_tasks.values():
-            task.cancel()
+        # Sesi tetap tersimpan di DB, lanjut lagi saat cog diload
+        self.auto_fishing_ticker.cancel()
+        # Waktu voice sejauh ini dikredit sekarang (tracker hanya di memori)
+        await self.credit_net_income(list(self._voice_joined))
     
     @tasks.loop(minutes=15)
     async def update_market_prices(self):
@@ -109,40 +196,8 @@ class Fishing(commands.Cog):
         return self.fish_market_prices.get(fish_name, 0)
     
     async def get_user_fishing_data(self, user_id: int):
-        """Ambil data fishing user dari database"""
-        async with aiosqlite.connect("mochi.db") as db:
-            db.row_factory = aiosqlite.Row
-            
-            cursor = await db.execute("""
-                SELECT * FROM fishing_stats WHERE user_id = ?
-            """, (user_id,))
-            stats = await cursor.fetchone()
-            
-            if not stats:
-                await db.execute("""
-                    INSERT INTO fishing_stats (user_id, total_fish_caught, last_fish_time)
-                    VALUES (?, 0, ?)
-                """, (user_id, datetime.utcnow()))
-                await db.commit()
-                stats = {"total_fish_caught": 0, "last_fish_time": datetime.utcnow()}
-            
-            cursor = await db.execute("""
-                SELECT upgrade_type, level FROM fishing_upgrades WHERE user_id = ?
-            """, (user_id,))
-            upgrades_rows = await cursor.fetchall()
-            upgrades_dict = {row["upgrade_type"]: row["level"] for row in upgrades_rows}
-            
-            cursor = await db.execute("""
-                SELECT fish_name, amount FROM fishing_inventory WHERE user_id = ?
-            """, (user_id,))
-            inventory_rows = await cursor.fetchall()
-            inventory_dict = {row["fish_name"]: row["amount"] for row in inventory_rows}
-            
-            return {
-                "stats": dict(stats) if stats else {},
-                "upgrades": upgrades_dict,
-                "inventory": inventory_dict
-            }
+        """Ambil data fishing user (stats, upgrades, inventory) dari fishing_cache/database"""
+        return await get_fishing_state(user_id)
     
     def calculate_upgrade_cost(self, upgrade_key: str, current_level: int) -> int:
         """Hitung harga upgrade berikutnya"""
@@ -150,37 +205,35 @@ class Fishing(commands.Cog):
         cost = upgrade["base_cost"] * (upgrade["multiplier"] ** current_level)
         return int(cost)
     
+    def get_fish_table(self, rod_level: int):
+        """Alias table untuk rod level ini (dibangun sekali lalu di-cache)"""
+        entry = self._fish_tables.get(rod_level)
+        if entry is None:
+            entry = build_fish_table(rod_level, self.fish_types)
+            self._fish_tables[rod_level] = entry
+        return entry
+    
+    def sample_fish(self, rod_level: int = 0, k: int = 1):
+        """Ambil k ikan random (berbobot, dengan pengembalian) untuk rod level ini"""
+        fish_list, table = self.get_fish_table(rod_level)
+        return [fish_list[i] for i in alias_sample(table, k)]
+    
     def get_random_fish(self, rod_level: int = 0):
-        """Ambil ikan random berdasarkan weight dan rod level"""
-        luck_bonus = rod_level * 0.5
-        
-        all_fish = []
-        for rarity, fish_list in self.fish_types.items():
-            for fish in fish_list:
-                adjusted_weight = fish["weight"]
-                if rarity in ["rare", "epic", "legendary"]:
-                    adjusted_weight += luck_bonus
-                
-                all_fish.append((fish, adjusted_weight))
-        
-        total_weight = sum(w for _, w in all_fish)
-        rand = random.uniform(0, total_weight)
-        
-        current = 0
-        for fish, weight in all_fish:
-            current += weight
-            if rand <= current:
-                return fish
-        
-        return all_fish[0][0]
+        """Ambil 1 ikan random berdasarkan weight dan rod level"""
+        return self.sample_fish(rod_level, 1)[0]
     
-    async def perform_fishing(self, user_id: int, channel_id: int, guild_id: int, is_auto: bool = False):
-        """Core fishing logic"""
+    async def catch_fish(self, user_id: int, guild_id: int, fishing_data: dict = None, pending: dict = None):
+        """Roll tangkapan + tulis DB, quest & achievement. Return (caught_fish, in_voice)
+
+        pending: kalau diisi, tangkapan dikumpulkan ke {user_id: [(nama, jumlah)]}
+        dan caller yang menulisnya sekaligus (lihat save_fish_catches).
+        """
         user_data = await get_user(user_id)
         if not user_data:
             await create_user(user_id)
         
-        fishing_data = await self.get_user_fishing_data(user_id)
+        if fishing_data is None:
+            fishing_data = await self.get_user_fishing_data(user_id)
         
         # Check voice channel
         voice_bonus = 1.0
@@ -223,8 +276,7 @@ class Fishing(commands.Cog):
         
         # Catch fish
         caught_fish = []
-        for _ in range(base_catch_count):
-            fish = self.get_random_fish(rod_level)
+        for fish in self.sample_fish(rod_level, base_catch_count):
             amount = random.randint(fish_amount_min, fish_amount_max)
             
             if in_voice:
@@ -232,67 +284,13 @@ class Fishing(commands.Cog):
             
             caught_fish.append((fish, amount))
         
-        # Update database
-        async with aiosqlite.connect("mochi.db") as db:
-            await db.execute("""
-                UPDATE fishing_stats 
-                SET total_fish_caught = total_fish_caught + ?, 
-                    last_fish_time = ?
-                WHERE user_id = ?
-            """, (sum(amt for _, amt in caught_fish), datetime.utcnow(), user_id))
-            
-            for fish, amount in caught_fish:
-                cursor = await db.execute("""
-                    SELECT amount FROM fishing_inventory 
-                    WHERE user_id = ? AND fish_name = ?
-                """, (user_id, fish["name"]))
-                existing = await cursor.fetchone()
-                
-                if existing:
-                    await db.execute("""
-                        UPDATE fishing_inventory 
-                        SET amount = amount + ? 
-                        WHERE user_id = ? AND fish_name = ?
-                    """, (amount, user_id, fish["name"]))
-                else:
-                    await db.execute("""
-                        INSERT INTO fishing_inventory (user_id, fish_name, amount)
-                        VALUES (?, ?, ?)
-                    """, (user_id, fish["name"], amount))
-            
-            await db.commit()
-        
-        # Build response
-        catch_text = ""
-        total_value = 0
-        
-        for fish, amount in caught_fish:
-            price = self.get_fish_price(fish["name"])
-            value = price * amount
-            total_value += value
-            catch_text += f"{fish['emoji']} **{fish['name']}** x{amount} (Rp {value:,})\n"
-        
-        embed = discord.Embed(
-            title=f"{'🤖 Auto-Fishing' if is_auto else '🎣 Hasil Memancing'}!",
-            description=catch_text,
-            color=0x3498db
-        )
-        
-        if in_voice:
-            embed.add_field(
-                name="🎤 Voice Bonus",
-                value="**+150%** ikan! (2.5x multiplier)",
-                inline=False
-            )
-        
-        embed.add_field(name="💰 Total Nilai", value=f"Rp {total_value:,}", inline=True)
-        embed.add_field(name="🎒 Inventory", value="Gunakan `mochi!inventory`", inline=True)
-        
-        footer_text = "Jual: mochi!sellfish • Harga berubah tiap 15 menit!"
-        if not in_voice:
-            footer_text = "💡 Join VC untuk +150% ikan! • " + footer_text
-    
-        embed.set_footer(text=footer_text)
+        # Update database (lewat write-behind: langsung commit di mode strict,
+        # digabung dengan write lain di mode batched), atau dikumpulkan caller
+        catches = [(fish["name"], amount) for fish, amount in caught_fish]
+        if pending is not None:
+            pending.setdefault(user_id, []).extend(catches)
+        else:
+            await write_behind.add_fish_catch(user_id, catches)
     
         # ========================================
         # ✅ UPDATE QUEST PROGRESS
@@ -320,9 +318,8 @@ class Fishing(commands.Cog):
         # ========================================
         ach_cog = self.bot.get_cog('Achievements')
         if ach_cog:
-            # Achievement: total fish caught
-            fishing_stats = await self.get_user_fishing_data(user_id)
-            total_caught = fishing_stats["stats"].get("total_fish_caught", 0)
+            # Achievement: total fish caught (state sebelum tick + tangkapan tick ini)
+            total_caught = fishing_data["stats"].get("total_fish_caught", 0) + sum(amt for _, amt in caught_fish)
             await ach_cog.check_achievement_progress(user_id, "fish_caught", total_caught)
             
             # Achievement: legendary fish
@@ -332,6 +329,50 @@ class Fishing(commands.Cog):
                         await ach_cog.check_achievement_progress(user_id, "legendary_fish", 1)
                         break
         
+        return caught_fish, in_voice
+    
+    def describe_catch(self, caught_fish):
+        """Teks daftar tangkapan + total nilai pada harga pasar saat ini"""
+        catch_text = ""
+        total_value = 0
+        
+        for fish, amount in caught_fish:
+            price = self.get_fish_price(fish["name"])
+            value = price * amount
+            total_value += value
+            catch_text += f"{fish['emoji']} **{fish['name']}** x{amount} (Rp {value:,})\n"
+        
+        return catch_text, total_value
+    
+    async def perform_fishing(self, user_id: int, channel_id: int, guild_id: int, is_auto: bool = False, fishing_data: dict = None):
+        """Core fishing logic (fishing_data boleh dioper kalau caller sudah baca)"""
+        caught_fish, in_voice = await self.catch_fish(user_id, guild_id, fishing_data)
+        
+        # Build response
+        catch_text, total_value = self.describe_catch(caught_fish)
+        
+        embed = discord.Embed(
+            title=f"{'🤖 Auto-Fishing' if is_auto else '🎣 Hasil Memancing'}!",
+            description=catch_text,
+            color=0x3498db
+        )
+        
+        if in_voice:
+            embed.add_field(
+                name="🎤 Voice Bonus",
+                value="**+150%** ikan! (2.5x multiplier)",
+                inline=False
+            )
+        
+        embed.add_field(name="💰 Total Nilai", value=f"Rp {total_value:,}", inline=True)
+        embed.add_field(name="🎒 Inventory", value="Gunakan `mochi!inventory`", inline=True)
+        
+        footer_text = "Jual: mochi!sellfish • Harga berubah tiap 15 menit!"
+        if not in_voice:
+            footer_text = "💡 Join VC untuk +150% ikan! • " + footer_text
+    
+        embed.set_footer(text=footer_text)
+        
         # ========================================
         # KIRIM EMBED
         # ========================================
@@ -341,32 +382,401 @@ class Fishing(commands.Cog):
         
         return True
     
-    async def auto_fishing_loop(self, user_id: int, channel_id: int, guild_id: int, duration_hours: int):
-        """Loop auto fishing setiap 1 menit"""
-        import time
-        end_time = datetime.utcnow() + timedelta(hours=duration_hours)
-        self.auto_fishing_end_time[user_id] = end_time
+    # ========================================
+    # AUTO-FISHING (1 ticker untuk semua user)
+    # ========================================
+    
+    async def cog_load(self):
+        # Lanjutkan sesi auto-fishing yang tersimpan sebelum restart
+        for row in await get_autofish_sessions():
+            summary = json.loads(row["catch_summary"]) if row["catch_summary"] else {}
+            self.auto_fishing_sessions[row["user_id"]] = {
+                "channel_id": row["channel_id"],
+                "guild_id": row["guild_id"],
+                "duration_hours": row["duration_hours"],
+                "end_time": datetime.fromisoformat(row["end_time"]),
+                "catches": summary.get("catches", {}),
+                "ticks": summary.get("ticks", 0),
+            }
+        if self.auto_fishing_sessions:
+            print(f"🤖 {len(self.auto_fishing_sessions)} sesi auto-fishing dilanjutkan")
+        self.auto_fishing_ticker.start()
+        # Reload cog saat bot sudah online: on_ready tidak terpanggil lagi
+        if self.bot.is_ready():
+            await self.sync_voice_sessions()
+    
+    def get_autofish_end_time(self, user_id: int):
+        """End time sesi auto-fishing user, atau None kalau tidak aktif"""
+        session = self.auto_fishing_sessions.get(user_id)
+        return session["end_time"] if session else None
+    
+    @tasks.loop(seconds=AUTOFISH_TICK_SECONDS)
+    async def auto_fishing_ticker(self):
+        """Proses semua auto-fisher sekali per tick: 1 transaksi DB, 1 pesan per channel"""
+        now = datetime.utcnow()
+        finished = [uid for uid, s in self.auto_fishing_sessions.items() if s["end_time"] <= now]
+        active = [uid for uid, s in self.auto_fishing_sessions.items() if s["end_time"] > now]
+        
+        results_by_channel = {}
+        pending = {}
+        for user_id in active:
+            # Sesi bisa di-stop selama tick ini berjalan (ada await di tiap user)
+            session = self.auto_fishing_sessions.get(user_id)
+            if session is None or session["end_time"] <= now:
+                continue
+            try:
+                caught_fish, in_voice = await self.catch_fish(user_id, session["guild_id"], pending=pending)
+            except Exception as e:
+                print(f"⚠️ Auto-fishing user {user_id} gagal: {e}")
+                continue
+            if user_id not in self.auto_fishing_sessions:
+                # Di-stop saat catch_fish: tangkapan tick ini dibatalkan
+                pending.pop(user_id, None)
+                continue
+            # Akumulasi untuk digest & ringkasan akhir sesi
+            catches = session["catches"]
+            for fish, amount in caught_fish:
+                catches[fish["name"]] = catches.get(fish["name"], 0) + amount
+            session["ticks"] += 1
+            results_by_channel.setdefault(session["channel_id"], []).append(
+                (user_id, caught_fish, in_voice)
+            )
         
+        # Semua inventory tick ini dalam 1 transaksi, tanpa menahan write_behind global
         try:
-            while datetime.utcnow() < end_time:
-                await self.perform_fishing(user_id, channel_id, guild_id, is_auto=True)
-                await asyncio.sleep(60)
-            
+            await save_fish_catches(pending, caught_at=now)
+        except Exception as e:
+            print(f"❌ Gagal simpan tangkapan auto-fishing: {e}")
+        
+        if AUTOFISH_OUTPUT_MODE == "tick":
+            for channel_id, results in results_by_channel.items():
+                try:
+                    await self.send_autofish_results(channel_id, results)
+                except Exception as e:
+                    print(f"⚠️ Gagal kirim hasil auto-fishing ke channel {channel_id}: {e}")
+        elif self._next_digest is None or now >= self._next_digest:
+            self._next_digest = now + timedelta(minutes=AUTOFISH_DIGEST_MINUTES)
+            await self.send_autofish_digests()
+        
+        for user_id in finished:
+            await self.end_autofish(user_id, stopped=False)
+    
+    @auto_fishing_ticker.before_loop
+    async def before_auto_fishing_ticker(self):
+        await self.bot.wait_until_ready()
+    
+    async def send_autofish_results(self, channel_id: int, results):
+        """Gabungkan hasil semua auto-fisher di 1 channel (embed dipecah per 25 field)"""
+        channel = self.bot.get_channel(channel_id)
+        if not channel:
+            return
+        
+        fields = []
+        for user_id, caught_fish, in_voice in results:
+            catch_text, total_value = self.describe_catch(caught_fish)
+            member = channel.guild.get_member(user_id) if getattr(channel, "guild", None) else None
+            name = member.display_name if member else f"User {user_id}"
+            voice_tag = " 🎤" if in_voice else ""
+            fields.append((f"🎣 {name}{voice_tag}", f"{catch_text}💰 **Rp {total_value:,}**"[:1024]))
+        
+        for start in range(0, len(fields), 25):
+            embed = discord.Embed(
+                title="🤖 Auto-Fishing!",
+                color=0x3498db
+            )
+            for name, value in fields[start:start + 25]:
+                embed.add_field(name=name, value=value, inline=True)
+            embed.set_footer(text="🎤 = Voice bonus +150% • Jual: mochi!sellfish • mochi!afstatus untuk status")
+            await channel.send(embed=embed)
+    
+    def summarize_catches(self, catches: dict, limit: int = None):
+        """Ringkasan akumulasi {nama_ikan: jumlah} -> (teks, total_nilai, total_ikan)"""
+        fish_info = {fish["name"]: fish for fish_list in self.fish_types.values() for fish in fish_list}
+        ranked = sorted(catches.items(), key=lambda item: self.get_fish_price(item[0]) * item[1], reverse=True)
+        
+        text = ""
+        for fish_name, amount in ranked[:limit]:
+            emoji = fish_info[fish_name]["emoji"] if fish_name in fish_info else "🐟"
+            text += f"{emoji} **{fish_name}** x{amount:,}\n"
+        if limit is not None and len(ranked) > limit:
+            text += f"... dan {len(ranked) - limit} jenis lainnya\n"
+        
+        total_value = sum(self.get_fish_price(name) * amount for name, amount in catches.items())
+        return text, total_value, sum(catches.values())
+    
+    async def send_autofish_digests(self):
+        """Mode digest: edit (atau kirim) 1 pesan status per channel, lalu simpan akumulasi sesi"""
+        sessions_by_channel = {}
+        for user_id, session in self.auto_fishing_sessions.items():
+            sessions_by_channel.setdefault(session["channel_id"], []).append((user_id, session))
+        
+        for channel_id, sessions in sessions_by_channel.items():
             channel = self.bot.get_channel(channel_id)
-            if channel:
-                await channel.send(
-                    f"<@{user_id}> ⏰ **Auto-fishing selesai!** ({duration_hours} jam)\n"
-                    f"Gunakan `mochi!autofish` lagi untuk melanjutkan."
+            if not channel:
+                continue
+            
+            embed = discord.Embed(
+                title="🤖 Auto-Fishing — Status",
+                description=f"{len(sessions)} auto-fisher aktif di channel ini",
+                color=0x3498db,
+                timestamp=datetime.utcnow()
+            )
+            for user_id, session in sessions[:25]:
+                text, total_value, total_fish = self.summarize_catches(session["catches"], limit=3)
+                member = channel.guild.get_member(user_id) if getattr(channel, "guild", None) else None
+                name = member.display_name if member else f"User {user_id}"
+                embed.add_field(
+                    name=f"🎣 {name}",
+                    value=(
+                        f"{text}"
+                        f"🐟 {total_fish:,} ikan • 💰 Rp {total_value:,}\n"
+                        f"⏰ Selesai <t:{int(session['end_time'].timestamp())}:R>"
+                    )[:1024],
+                    inline=True
                 )
-        except asyncio.CancelledError:
-            channel = self.bot.get_channel(channel_id)
-            if channel:
-                await channel.send(f"<@{user_id}> 🛑 **Auto-fishing dihentikan!**")
-        finally:
-            if user_id in self.auto_fishing_tasks:
-                del self.auto_fishing_tasks[user_id]
-            if user_id in self.auto_fishing_end_time:
-                del self.auto_fishing_end_time[user_id]
+            if len(sessions) > 25:
+                embed.add_field(name="…", value=f"+{len(sessions) - 25} auto-fisher lainnya", inline=False)
+            embed.set_footer(text=f"Update tiap {AUTOFISH_DIGEST_MINUTES} menit • Ringkasan lengkap dikirim saat sesi selesai")
+            
+            try:
+                message = self._digest_messages.get(channel_id)
+                if message:
+                    try:
+                        await message.edit(embed=embed)
+                        continue
+                    except discord.NotFound:
+                        pass
+                self._digest_messages[channel_id] = await channel.send(embed=embed)
+            except Exception as e:
+                print(f"⚠️ Gagal update digest auto-fishing channel {channel_id}: {e}")
+        
+        # Pesan status channel yang sudah tidak punya sesi aktif dilupakan saja
+        for channel_id in list(self._digest_messages):
+            if channel_id not in sessions_by_channel:
+                del self._digest_messages[channel_id]
+        
+        await save_autofish_summaries({
+            user_id: json.dumps({"catches": session["catches"], "ticks": session["ticks"]})
+            for user_id, session in self.auto_fishing_sessions.items()
+        })
+    
+    async def end_autofish(self, user_id: int, stopped: bool):
+        """Tutup sesi auto-fishing (selesai waktunya atau di-stop user)"""
+        session = self.auto_fishing_sessions.pop(user_id, None)
+        if session is None:
+            return
+        await delete_autofish_session(user_id)
+        
+        channel = self.bot.get_channel(session["channel_id"])
+        if not channel:
+            return
+        
+        if stopped:
+            content = f"<@{user_id}> 🛑 **Auto-fishing dihentikan!**"
+        else:
+            content = (
+                f"<@{user_id}> ⏰ **Auto-fishing selesai!** ({session['duration_hours']} jam)\n"
+                f"Gunakan `mochi!autofish` lagi untuk melanjutkan."
+            )
+        
+        if AUTOFISH_OUTPUT_MODE == "tick" or not session["catches"]:
+            await channel.send(content)
+            return
+        
+        text, total_value, total_fish = self.summarize_catches(session["catches"], limit=15)
+        embed = discord.Embed(
+            title="📋 Ringkasan Auto-Fishing",
+            description=text,
+            color=0x00ff00
+        )
+        embed.add_field(name="🎣 Total Tick", value=f"{session['ticks']:,}x", inline=True)
+        embed.add_field(name="🐟 Total Ikan", value=f"{total_fish:,}", inline=True)
+        embed.add_field(name="💰 Nilai Sekarang", value=f"Rp {total_value:,}", inline=True)
+        embed.set_footer(text="Jual: mochi!sellfish • Harga berubah tiap 15 menit!")
+        await channel.send(content, embed=embed)
+    
+    # ========================================
+    # PASSIVE INCOME (FISHING ROBOT & FISHING NET)
+    # ========================================
+    
+    def parse_timestamp(self, value):
+        """Timestamp fishing_stats bisa str (dari DB) atau datetime (dari cache)"""
+        if value is None or isinstance(value, datetime):
+            return value
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    
+    def roll_passive_fish(self, rod_level: int, total: int):
+        """Bagi `total` ikan pasif ke jenis ikan sesuai peluang rod -> [(fish, amount)]"""
+        draws = min(total, PASSIVE_FISH_MAX_DRAWS)
+        if draws <= 0:
+            return []
+        
+        per_draw, extra = divmod(total, draws)
+        fish_by_name = {}
+        amounts = {}
+        for i, fish in enumerate(self.sample_fish(rod_level, draws)):
+            fish_by_name[fish["name"]] = fish
+            amounts[fish["name"]] = amounts.get(fish["name"], 0) + per_draw + (1 if i < extra else 0)
+        return [(fish_by_name[name], amount) for name, amount in amounts.items()]
+    
+    async def claim_robot_income(self, user_id: int, fishing_data: dict = None, reset: bool = False):
+        """Lazy accrual Fishing Robot sejak last_daily_claim. Return [(fish, amount)] yang dikredit
+
+        Tidak ada polling: dihitung saat user pakai command fishing.
+        reset=True dipakai sebelum level robot berubah, supaya periode lama dibayar dengan level lama.
+        """
+        if fishing_data is None:
+            fishing_data = await self.get_user_fishing_data(user_id)
+        
+        now = datetime.utcnow()
+        level = fishing_data["upgrades"].get("fishing_robot", 0)
+        per_day = self.upgrades["fishing_robot"]["bonus_per_level"] * level
+        last_claim = self.parse_timestamp(fishing_data["stats"].get("last_daily_claim"))
+        
+        if last_claim is None or per_day == 0:
+            # Jam robot mulai dari sekarang (robot baru dibeli / dibeli sebelum fitur ini ada)
+            if reset or (last_claim is None and per_day > 0):
+                await write_behind.add_passive_fish(user_id, [], claimed_at=now)
+            return []
+        
+        elapsed = now - last_claim
+        if not reset and elapsed < timedelta(minutes=FISHING_ROBOT_MIN_CLAIM_MINUTES):
+            return []
+        
+        max_elapsed = timedelta(hours=FISHING_ROBOT_MAX_HOURS)
+        owed = int(per_day * min(elapsed, max_elapsed).total_seconds() / 86400)
+        if owed <= 0 and not reset:
+            return []
+        
+        if reset or elapsed > max_elapsed:
+            claimed_at = now
+        else:
+            # Sisa pecahan ikan tidak hangus: jam hanya maju sebesar waktu yang sudah dibayar
+            claimed_at = last_claim + timedelta(days=owed / per_day)
+        
+        rod_level = fishing_data["upgrades"].get("fishing_rod", 0)
+        caught_fish = self.roll_passive_fish(rod_level, max(owed, 0))
+        await write_behind.add_passive_fish(
+            user_id, [(fish["name"], amount) for fish, amount in caught_fish], claimed_at=claimed_at
+        )
+        return caught_fish
+    
+    async def cog_before_invoke(self, ctx):
+        """Klaim hasil Fishing Robot setiap kali user pakai command fishing"""
+        try:
+            if not await get_upgrade_levels([ctx.author.id], "fishing_robot"):
+                return
+            caught_fish = await self.claim_robot_income(ctx.author.id)
+        except Exception as e:
+            print(f"⚠️ Klaim Fishing Robot user {ctx.author.id} gagal: {e}")
+            return
+        
+        if caught_fish:
+            text, total_value, total_fish = self.summarize_catches(
+                {fish["name"]: amount for fish, amount in caught_fish}, limit=5
+            )
+            await ctx.send(
+                f"🤖 **Fishing Robot** mengumpulkan **{total_fish:,}** ikan "
+                f"(Rp {total_value:,}) untuk {ctx.author.mention}!\n{text}"
+            )
+    
+    def counts_for_net(self, voice_state) -> bool:
+        """Fishing Net hanya jalan di voice channel biasa (bukan AFK channel)"""
+        channel = voice_state.channel if voice_state else None
+        return channel is not None and channel != channel.guild.afk_channel
+    
+    async def credit_net_income(self, user_ids, restart: bool = False, until: datetime = None):
+        """Kredit ikan Fishing Net untuk waktu voice user-user ini dalam 1 transaksi
+
+        restart=True: tracker tetap jalan mulai sekarang (dipakai sebelum level net berubah).
+        until: batas akhir waktu yang dikredit (default sekarang).
+        Return {user_id: jumlah ikan}.
+        """
+        now = datetime.utcnow()
+        until = until or now
+        minutes = {}
+        for user_id in user_ids:
+            joined_at = self._voice_joined.get(user_id) if restart else self._voice_joined.pop(user_id, None)
+            if joined_at is None:
+                continue
+            if restart:
+                self._voice_joined[user_id] = now
+            elapsed_minutes = min(int((until - joined_at).total_seconds() // 60), FISHING_NET_MAX_MINUTES)
+            if elapsed_minutes > 0:
+                minutes[user_id] = elapsed_minutes
+        
+        if not minutes:
+            return {}
+        
+        credited = {}
+        pending = {}
+        levels = await get_upgrade_levels(minutes, "fishing_net")
+        # Pemilik net pasti sudah punya row fishing_stats (dibuat saat beli upgrade)
+        rod_levels = await get_upgrade_levels(levels, "fishing_rod")
+        for user_id, level in levels.items():
+            total = self.upgrades["fishing_net"]["bonus_per_level"] * level * minutes[user_id]
+            rod_level = rod_levels.get(user_id, 0)
+            caught_fish = self.roll_passive_fish(rod_level, total)
+            pending[user_id] = [(fish["name"], amount) for fish, amount in caught_fish]
+            credited[user_id] = total
+        await save_fish_catches(pending)
+        return credited
+    
+    async def sync_voice_sessions(self):
+        """Samakan tracker Fishing Net dengan isi voice channel (startup, reload, reconnect)"""
+        now = datetime.utcnow()
+        disconnected_at, self._disconnected_at = self._disconnected_at, None
+        in_voice = set()
+        for guild in self.bot.guilds:
+            for channel in guild.voice_channels:
+                if channel == guild.afk_channel:
+                    continue
+                for member in channel.members:
+                    if not member.bot:
+                        in_voice.add(member.id)
+        
+        # Selama terputus bot tidak tahu siapa di voice: waktu itu tidak dikredit.
+        # Yang masih di voice dibayar sampai disconnect lalu mulai lagi dari sekarang.
+        if disconnected_at is not None:
+            still_in_voice = [user_id for user_id in self._voice_joined if user_id in in_voice]
+            await self.credit_net_income(still_in_voice, restart=True, until=disconnected_at)
+        left = [user_id for user_id in self._voice_joined if user_id not in in_voice]
+        await self.credit_net_income(left, until=disconnected_at)
+        
+        for user_id in in_voice:
+            self._voice_joined.setdefault(user_id, now)
+    
+    @commands.Cog.listener()
+    async def on_ready(self):
+        await self.sync_voice_sessions()
+    
+    @commands.Cog.listener()
+    async def on_disconnect(self):
+        if self._disconnected_at is None:
+            self._disconnected_at = datetime.utcnow()
+    
+    @commands.Cog.listener()
+    async def on_resumed(self):
+        # Resume memutar ulang event yang terlewat, tracker tetap valid
+        self._disconnected_at = None
+    
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member, before, after):
+        if member.bot:
+            return
+        
+        was_fishing = self.counts_for_net(before)
+        is_fishing = self.counts_for_net(after)
+        if is_fishing and not was_fishing:
+            self._voice_joined[member.id] = datetime.utcnow()
+        elif was_fishing and not is_fishing:
+            try:
+                await self.credit_net_income([member.id])
+            except Exception as e:
+                print(f"⚠️ Kredit Fishing Net user {member.id} gagal: {e}")
     
     @commands.command(name="autofish", aliases=["af"])
     async def autofish_command(self, ctx, duration: int = 2):
@@ -377,14 +787,23 @@ class Fishing(commands.Cog):
             await ctx.send("⏰ Durasi harus antara 1-12 jam!")
             return
         
-        if ctx.author.id in self.auto_fishing_tasks:
+        if ctx.author.id in self.auto_fishing_sessions:
             await ctx.send("⚠️ Auto-fishing sudah berjalan! Gunakan `mochi!stopautofish`")
             return
         
-        task = asyncio.create_task(
-            self.auto_fishing_loop(ctx.author.id, ctx.channel.id, ctx.guild.id, duration)
+        now = datetime.utcnow()
+        end_time = now + timedelta(hours=duration)
+        await insert_autofish_session(
+            ctx.author.id, ctx.channel.id, ctx.guild.id, duration, now.isoformat(), end_time.isoformat()
         )
-        self.auto_fishing_tasks[ctx.author.id] = task
+        self.auto_fishing_sessions[ctx.author.id] = {
+            "channel_id": ctx.channel.id,
+            "guild_id": ctx.guild.id,
+            "duration_hours": duration,
+            "end_time": end_time,
+            "catches": {},
+            "ticks": 0,
+        }
         
         end_timestamp = int(time.time()) + (duration * 3600)
         
@@ -406,23 +825,18 @@ class Fishing(commands.Cog):
     @commands.command(name="stopautofish", aliases=["stopaf"])
     async def stop_autofish_command(self, ctx):
         """🛑 Stop auto-fishing"""
-        if ctx.author.id not in self.auto_fishing_tasks:
+        if ctx.author.id not in self.auto_fishing_sessions:
             await ctx.send("❌ Auto-fishing tidak aktif!")
             return
         
-        self.auto_fishing_tasks[ctx.author.id].cancel()
-        await ctx.send("🛑 **Auto-fishing dihentikan!**")
+        await self.end_autofish(ctx.author.id, stopped=True)
     
     @commands.command(name="afstatus", aliases=["autofishstatus"])
     async def autofish_status_command(self, ctx):
         """📊 Cek status auto-fishing"""
-        if ctx.author.id not in self.auto_fishing_tasks:
-            await ctx.send("❌ Auto-fishing tidak aktif!\nGunakan `mochi!autofish`")
-            return
-        
-        end_time = self.auto_fishing_end_time.get(ctx.author.id)
+        end_time = self.get_autofish_end_time(ctx.author.id)
         if not end_time:
-            await ctx.send("❌ Data tidak ditemukan!")
+            await ctx.send("❌ Auto-fishing tidak aktif!\nGunakan `mochi!autofish`")
             return
         
         remaining = end_time - datetime.utcnow()
@@ -432,6 +846,15 @@ class Fishing(commands.Cog):
         embed = discord.Embed(title="📊 Status Auto-Fishing", color=0x3498db)
         embed.add_field(name="⏰ Sisa Waktu", value=f"**{hours} jam {minutes} menit**", inline=False)
         embed.add_field(name="🏁 Selesai", value=f"<t:{int(end_time.timestamp())}:F>", inline=False)
+
+        catches = self.auto_fishing_sessions[ctx.author.id]["catches"]
+        if catches:
+            text, total_value, total_fish = self.summarize_catches(catches, limit=10)
+            embed.add_field(
+                name=f"🐟 Tangkapan Sesi Ini ({total_fish:,} ikan • Rp {total_value:,})",
+                value=text[:1024],
+                inline=False
+            )
         embed.set_footer(text="mochi!stopautofish untuk menghentikan")
         
         await ctx.send(embed=embed)
@@ -444,18 +867,17 @@ class Fishing(commands.Cog):
         channel_id = ctx.channel.id
         
         # 1. Check if Auto-fishing is running
-        if user_id in self.auto_fishing_tasks:
-            end_time = self.auto_fishing_end_time.get(user_id)
-            if end_time and datetime.utcnow() < end_time:
-                remaining_time = end_time - datetime.utcnow()
-                hours = int(remaining_time.total_seconds() // 3600)
-                minutes = int((remaining_time.total_seconds() % 3600) // 60)
-                
-                await ctx.send(
-                    f"🤖 **Auto-fishing sedang aktif!** Kamu akan menerima ikan otomatis.\n"
-                    f"Sisa waktu: **{hours} jam {minutes} menit**."
-                )
-                return
+        end_time = self.get_autofish_end_time(user_id)
+        if end_time and datetime.utcnow() < end_time:
+            remaining_time = end_time - datetime.utcnow()
+            hours = int(remaining_time.total_seconds() // 3600)
+            minutes = int((remaining_time.total_seconds() % 3600) // 60)
+            
+            await ctx.send(
+                f"🤖 **Auto-fishing sedang aktif!** Kamu akan menerima ikan otomatis.\n"
+                f"Sisa waktu: **{hours} jam {minutes} menit**."
+            )
+            return
 
         user_data = await get_user(user_id)
         if not user_data:
@@ -483,7 +905,7 @@ class Fishing(commands.Cog):
                 return
         
         # 3. ✅ HANYA PANGGIL perform_fishing() - SELESAI!
-        await self.perform_fishing(user_id, channel_id, guild_id, is_auto=False)
+        await self.perform_fishing(user_id, channel_id, guild_id, is_auto=False, fishing_data=fishing_data)
         
     @commands.command(name="inventory", aliases=["inv"])
     async def inventory_command(self, ctx, member: discord.Member = None):
@@ -567,6 +989,10 @@ class Fishing(commands.Cog):
             )
             return
         
+        # Tangkapan yang masih antre di write-behind harus masuk DB dulu,
+        # kalau tidak DELETE/UPDATE di bawah tidak melihatnya
+        await write_behind.flush()
+        
         fishing_data = await self.get_user_fishing_data(ctx.author.id)
         
         if not fishing_data["inventory"]:
@@ -578,17 +1004,27 @@ class Fishing(commands.Cog):
             total_money_before_tax = 0
             sold_items = []
             
-            async with aiosqlite.connect("mochi.db") as db:
-                for fish_name, amount in fishing_data["inventory"].items():
-                    price = self.get_fish_price(fish_name)
-                    money = price * amount
-                    total_money_before_tax += money
-                    sold_items.append((fish_name, amount, money))
-                
-                await db.execute("""
+            # Yang dibayar = yang benar-benar terhapus (RETURNING), bukan snapshot inventory
+            async with connect() as db:
+                cursor = await db.execute("""
                     DELETE FROM fishing_inventory WHERE user_id = ?
+                    RETURNING fish_name, amount
                 """, (ctx.author.id,))
+                deleted = await cursor.fetchall()
+                await cursor.close()
                 await db.commit()
+            cache_clear_fish_inventory(ctx.author.id)
+            
+            for fish_name, amount in deleted:
+                if amount <= 0:
+                    continue
+                money = self.get_fish_price(fish_name) * amount
+                total_money_before_tax += money
+                sold_items.append((fish_name, amount, money))
+            
+            if not sold_items:
+                await ctx.send("❌ Inventory kosong! Gunakan `mochi!fish`")
+                return
             
             # Apply tax
             tax_amount = int(total_money_before_tax * self.sell_tax_rate)
@@ -653,30 +1089,53 @@ class Fishing(commands.Cog):
             await ctx.send(f"❌ Kamu hanya punya {current_amount} {found_fish_name}!")
             return
         
-        # Hitung harga dengan pajak
-        price = self.get_fish_price(found_fish_name)
-        total_money_before_tax = price * sell_amount
-        tax_amount = int(total_money_before_tax * self.sell_tax_rate)
-        total_money = total_money_before_tax - tax_amount
-        
-        # Update database
-        async with aiosqlite.connect("mochi.db") as db:
-            new_amount = current_amount - sell_amount
-            
-            if new_amount <= 0:
-                await db.execute("""
+        # Update database (relatif + dicek di statement yang sama): yang dibayar
+        # hanya jumlah yang benar-benar dikurangi, sisa 0 langsung dihapus
+        async with connect() as db:
+            if amount_str == "all":
+                cursor = await db.execute("""
                     DELETE FROM fishing_inventory 
                     WHERE user_id = ? AND fish_name = ?
+                    RETURNING amount
                 """, (ctx.author.id, found_fish_name))
+                row = await cursor.fetchone()
+                await cursor.close()
+                sell_amount = row[0] if row else 0
+                new_amount = 0
             else:
-                await db.execute("""
+                cursor = await db.execute("""
                     UPDATE fishing_inventory 
-                    SET amount = ? 
-                    WHERE user_id = ? AND fish_name = ?
-                """, (new_amount, ctx.author.id, found_fish_name))
+                    SET amount = amount - ? 
+                    WHERE user_id = ? AND fish_name = ? AND amount >= ?
+                    RETURNING amount
+                """, (sell_amount, ctx.author.id, found_fish_name, sell_amount))
+                row = await cursor.fetchone()
+                await cursor.close()
+                if row is None:
+                    sell_amount = 0
+                else:
+                    new_amount = row[0]
+                    if new_amount <= 0:
+                        await db.execute("""
+                            DELETE FROM fishing_inventory 
+                            WHERE user_id = ? AND fish_name = ? AND amount <= 0
+                        """, (ctx.author.id, found_fish_name))
             
             await db.commit()
         
+        if sell_amount <= 0:
+            # Inventory berubah sejak dibaca (misal dijual di command lain)
+            invalidate_fishing_state(ctx.author.id)
+            await ctx.send(f"❌ {found_fish_name} kamu sudah tidak cukup! Cek `mochi!inventory`")
+            return
+        cache_fish_amount(ctx.author.id, found_fish_name, new_amount)
+        
+        # Hitung harga dengan pajak
+        price = self.get_fish_price(found_fish_name)
+        total_money_before_tax = price * sell_amount
+        tax_amount = int(total_money_before_tax * self.sell_tax_rate)
+        total_money = total_money_before_tax - tax_amount
+        
         await update_user(ctx.author.id, currency=total_money)
         
         embed = discord.Embed(title="✅ Penjualan Berhasil!", color=0x00ff00)
@@ -799,31 +1258,25 @@ class Fishing(commands.Cog):
             )
             return
         
+        # Tutup periode passive income berjalan dengan level lama dulu
+        if upgrade_key == "fishing_robot":
+            await self.claim_robot_income(ctx.author.id, fishing_data, reset=True)
+        elif upgrade_key == "fishing_net":
+            await self.credit_net_income([ctx.author.id], restart=True)
+        
         # Proses upgrade
         await update_user(ctx.author.id, currency=-cost)
         
-        async with aiosqlite.connect("mochi.db") as db:
-            cursor = await db.execute("""
-                SELECT level FROM fishing_upgrades 
-                WHERE user_id = ? AND upgrade_type = ?
+        async with connect() as db:
+            await db.execute("""
+                INSERT INTO fishing_upgrades (user_id, upgrade_type, level)
+                VALUES (?, ?, 1)
+                ON CONFLICT(user_id, upgrade_type) DO UPDATE SET level = level + 1
             """, (ctx.author.id, upgrade_key))
-            existing = await cursor.fetchone()
-            
-            if existing:
-                await db.execute("""
-                    UPDATE fishing_upgrades 
-                    SET level = level + 1 
-                    WHERE user_id = ? AND upgrade_type = ?
-                """, (ctx.author.id, upgrade_key))
-            else:
-                await db.execute("""
-                    INSERT INTO fishing_upgrades (user_id, upgrade_type, level)
-                    VALUES (?, ?, 1)
-                """, (ctx.author.id, upgrade_key))
-            
             await db.commit()
         
         new_level = current_level + 1
+        cache_upgrade_level(ctx.author.id, upgrade_key, new_level)
         new_bonus = upgrade_info["bonus_per_level"] * new_level
         
         embed = discord.Embed(title="✅ Upgrade Berhasil!", color=0x00ff00)
@@ -862,6 +1315,18 @@ class Fishing(commands.Cog):
         
         embed.add_field(name="⚙️ Upgrades", value=upgrade_text or "Belum ada", inline=False)
         
+        robot_level = fishing_data["upgrades"].get("fishing_robot", 0)
+        net_level = fishing_data["upgrades"].get("fishing_net", 0)
+        if robot_level or net_level:
+            embed.add_field(
+                name="💤 Passive Income",
+                value=(
+                    f"🤖 {self.upgrades['fishing_robot']['bonus_per_level'] * robot_level:,} ikan/hari\n"
+                    f"🕸️ {self.upgrades['fishing_net']['bonus_per_level'] * net_level:,} ikan/menit di VC"
+                ),
+                inline=False
+            )
+        
         await ctx.send(embed=embed)
     
     @commands.command(name="fhelp", aliases=["fishhelp"])
@@ -912,6 +1377,7 @@ class Fishing(commands.Cog):
             value=(
                 "🎤 Join **Voice Channel** untuk +150% ikan!\n"
                 "🤖 Gunakan **Auto-Fishing** untuk farming otomatis\n"
+                "💤 **Fishing Robot** & **Fishing Net** kasih ikan pasif (diklaim saat pakai command fishing / keluar VC)\n"
                 "📊 Cek **Market** sebelum jual untuk profit max\n"
                 "⚙️ Upgrade **Fishing Rod** dulu untuk hasil lebih\n"
                 "💎 Simpan ikan **Rare/Legendary** saat harga turun\n"
@@ -1026,81 +1492,12 @@ class Fishing(commands.Cog):
         if sort_key not in valid_sorts:
             sort_key = "caught"
         
-        async with aiosqlite.connect("mochi.db") as db:
-            db.row_factory = aiosqlite.Row
-            
-            if sort_key == "value":
-                # Calculate portfolio value for each user
-                cursor = await db.execute("""
-                    SELECT 
-                        fs.user_id,
-                        fs.total_fish_caught,
-                        COUNT(DISTINCT fi.fish_name) as unique_fish
-                    FROM fishing_stats fs
-                    LEFT JOIN fishing_inventory fi ON fs.user_id = fi.user_id
-                    GROUP BY fs.user_id
-                    ORDER BY fs.total_fish_caught DESC
-                    LIMIT 10
-                """)
-                rows = await cursor.fetchall()
-                
-                # Calculate portfolio value manually
-                leaderboard_data = []
-                for row in rows:
-                    user_id = row["user_id"]
-                    
-                    # Get user inventory
-                    cursor2 = await db.execute("""
-                        SELECT fish_name, amount FROM fishing_inventory 
-                        WHERE user_id = ?
-                    """, (user_id,))
-                    inventory = await cursor2.fetchall()
-                    
-                    total_value = 0
-                    for item in inventory:
-                        price = self.get_fish_price(item["fish_name"])
-                        total_value += price * item["amount"]
-                    
-                    leaderboard_data.append({
-                        "user_id": user_id,
-                        "total_fish_caught": row["total_fish_caught"],
-                        "unique_fish": row["unique_fish"],
-                        "portfolio_value": total_value
-                    })
-                
-                # Sort by portfolio value
-                leaderboard_data.sort(key=lambda x: x["portfolio_value"], reverse=True)
-                rows = leaderboard_data[:10]
-                
-            elif sort_key == "unique":
-                cursor = await db.execute("""
-                    SELECT 
-                        fs.user_id,
-                        fs.total_fish_caught,
-                        COUNT(DISTINCT fi.fish_name) as unique_fish
-                    FROM fishing_stats fs
-                    LEFT JOIN fishing_inventory fi ON fs.user_id = fi.user_id
-                    GROUP BY fs.user_id
-                    ORDER BY unique_fish DESC
-                    LIMIT 10
-                """)
-                rows = await cursor.fetchall()
-                rows = [dict(row) for row in rows]
-                
-            else:  # caught
-                cursor = await db.execute("""
-                    SELECT 
-                        fs.user_id,
-                        fs.total_fish_caught,
-                        COUNT(DISTINCT fi.fish_name) as unique_fish
-                    FROM fishing_stats fs
-                    LEFT JOIN fishing_inventory fi ON fs.user_id = fi.user_id
-                    GROUP BY fs.user_id
-                    ORDER BY fs.total_fish_caught DESC
-                    LIMIT 10
-                """)
-                rows = await cursor.fetchall()
-                rows = [dict(row) for row in rows]
+        lb_cog = self.bot.get_cog('Leaderboards')
+        if not lb_cog:
+            await ctx.send("❌ Leaderboard system tidak aktif!")
+            return
+        
+        rows, refreshed_at = await lb_cog.get_board(f"flb:{sort_key}")
         
         if not rows:
             await ctx.send("📊 Belum ada data leaderboard fishing!")
@@ -1145,7 +1542,7 @@ class Fishing(commands.Cog):
             ),
             inline=False
         )
-        embed.set_footer(text="Gunakan mochi!fstats untuk lihat stats kamu")
+        embed.set_footer(text=lb_cog.footer(refreshed_at, "Gunakan mochi!fstats untuk lihat stats kamu"))
         
         await ctx.send(embed=embed)
     
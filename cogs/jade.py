@@ -4,7 +4,7 @@ import aiosqlite
 import random
 import asyncio
 from datetime import datetime, timedelta
-from database import get_user, create_user, update_user
+from database import get_user, create_user, update_user, connect
 
 class JadeGacha(commands.Cog):
     def __init__(self, bot):
@@ -74,7 +74,7 @@ class JadeGacha(commands.Cog):
     
     async def save_jade_stats(self, user_id: int, jade_type: str, spent: int, won: int, is_win: bool, is_jackpot: bool):
         """Simpan statistik jade gacha ke database"""
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             # Check if user stats exist
             cursor = await db.execute("""
                 SELECT * FROM jade_stats WHERE user_id = ?
@@ -107,7 +107,7 @@ class JadeGacha(commands.Cog):
     
     async def get_jade_stats(self, user_id: int):
         """Ambil statistik jade gacha user"""
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             db.row_factory = aiosqlite.Row
             cursor = await db.execute("""
                 SELECT * FROM jade_stats WHERE user_id = ?
@@ -610,30 +610,12 @@ class JadeGacha(commands.Cog):
         
         order_by, title_suffix = valid_sorts[sort_key]
         
-        async with aiosqlite.connect("mochi.db") as db:
-            db.row_factory = aiosqlite.Row
-            
-            # Special handling for win rate
-            if sort_key == "winrate":
-                cursor = await db.execute("""
-                    SELECT user_id, total_spent, total_won, total_cuts, total_wins, total_losses, total_jackpots,
-                           (total_won - total_spent) as profit,
-                           CAST(total_wins AS FLOAT) / total_cuts * 100 as win_rate
-                    FROM jade_stats
-                    WHERE total_cuts > 0
-                    ORDER BY win_rate DESC
-                    LIMIT 10
-                """)
-            else:
-                cursor = await db.execute(f"""
-                    SELECT user_id, total_spent, total_won, total_cuts, total_wins, total_losses, total_jackpots,
-                           (total_won - total_spent) as profit,
-                           CAST(total_wins AS FLOAT) / total_cuts * 100 as win_rate
-                    FROM jade_stats
-                    ORDER BY {order_by}
-                    LIMIT 10
-                """)
-            rows = await cursor.fetchall()
+        lb_cog = self.bot.get_cog('Leaderboards')
+        if not lb_cog:
+            await ctx.send("❌ Leaderboard system tidak aktif!")
+            return
+        
+        rows, refreshed_at = await lb_cog.get_board(f"jlb:{sort_key}")
         
         if not rows:
             await ctx.send("📊 Belum ada data leaderboard!")
@@ -668,7 +650,7 @@ class JadeGacha(commands.Cog):
             ),
             inline=False
         )
-        embed.set_footer(text="Gunakan mochi!jadestats untuk lihat stats kamu")
+        embed.set_footer(text=lb_cog.footer(refreshed_at, "Gunakan mochi!jadestats untuk lihat stats kamu"))
         
         await ctx.send(embed=embed)
     
@@ -0,0 +1,356 @@
+import discord
+from discord.ext import commands, tasks
+import json
+import time
+from bisect import bisect_right
+from datetime import datetime
+
+from database import (
+    connect, get_user, get_users_bulk, LEVEL_BOARD_QUERY, JADE_SORTS, jade_board_query,
+    RANK_LEVEL_QUERY, RANK_FISHING_QUERY, RANK_JADE_QUERY
+)
+from config import LEADERBOARD_REFRESH_MINUTES
+
+LEADERBOARD_SIZE = 10
+
+# Query top-N per board. Semua dijalankan di background oleh refresh loop,
+# command leaderboard cukup baca snapshot-nya (maks LEADERBOARD_SIZE row).
+FISHING_BOARD_QUERY = """
+    SELECT
+        fs.user_id,
+        fs.total_fish_caught,
+        COUNT(DISTINCT fi.fish_name) as unique_fish
+    FROM fishing_stats fs
+    LEFT JOIN fishing_inventory fi ON fs.user_id = fi.user_id
+    GROUP BY fs.user_id
+    ORDER BY {order_by}
+    LIMIT ?
+"""
+
+
+class Leaderboards(commands.Cog):
+    """Snapshot leaderboard (top/flb/jlb/networth/taxstats) yang di-refresh berkala."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        # {board: {"rows": [dict], "refreshed_at": datetime}}
+        self.boards = {}
+        self.refresh_stats = {"runs": 0, "last_duration_ms": 0.0, "errors": 0}
+        # Net worth semua user dari refresh terakhir (untuk myrank, harga crypto
+        # tidak bisa di-index di SQL): nilai terurut naik + lookup per user
+        self.networth_sorted = []
+        self.networth_by_user = {}
+        self.refresh_leaderboards.start()
+
+    def cog_unload(self):
+        self.refresh_leaderboards.cancel()
+
+    # ========================================
+    # SNAPSHOT ACCESS
+    # ========================================
+
+    async def get_board(self, board: str):
+        """Ambil snapshot board -> (rows, refreshed_at). rows kosong jika belum pernah di-refresh."""
+        snapshot = self.boards.get(board)
+        if snapshot is None:
+            # Setelah restart, pakai snapshot terakhir yang tersimpan di DB
+            snapshot = await self.load_board(board)
+            if snapshot["rows"]:
+                self.boards[board] = snapshot
+        return snapshot["rows"], snapshot["refreshed_at"]
+
+    async def load_board(self, board: str):
+        async with connect() as db:
+            cursor = await db.execute("""
+                SELECT data, refreshed_at FROM leaderboard_snapshots
+                WHERE board = ?
+                ORDER BY rank
+                LIMIT ?
+            """, (board, LEADERBOARD_SIZE))
+            rows = await cursor.fetchall()
+
+        if not rows:
+            return {"rows": [], "refreshed_at": None}
+        return {
+            "rows": [json.loads(data) for data, _ in rows],
+            "refreshed_at": datetime.fromisoformat(rows[0][1]),
+        }
+
+    def staleness_text(self, refreshed_at) -> str:
+        """Teks footer: seberapa lama snapshot sudah dibuat."""
+        if refreshed_at is None:
+            return "🕒 Leaderboard sedang disiapkan"
+        minutes = int((datetime.utcnow() - refreshed_at).total_seconds() // 60)
+        if minutes < 1:
+            return "🕒 Diperbarui barusan"
+        return f"🕒 Diperbarui {minutes} menit lalu"
+
+    def footer(self, refreshed_at, text: str) -> str:
+        return f"{self.staleness_text(refreshed_at)} • {text}"
+
+    # ========================================
+    # RANK PER USER
+    # ========================================
+
+    async def get_user_ranks(self, user_id: int):
+        """Peringkat user di tiap board = 1 + jumlah row di depannya (COUNT via index).
+
+        Return dict {board: (rank, value)}; board dilewati kalau user belum punya data.
+        """
+        ranks = {}
+        user_data = await get_user(user_id)
+
+        async with connect() as db:
+            if user_data:
+                cursor = await db.execute(
+                    RANK_LEVEL_QUERY, (user_data["level"], user_data["currency"])
+                )
+                ranks["top"] = ((await cursor.fetchone())[0] + 1, user_data["level"])
+
+            cursor = await db.execute(
+                "SELECT total_fish_caught FROM fishing_stats WHERE user_id = ?", (user_id,)
+            )
+            row = await cursor.fetchone()
+            if row:
+                cursor = await db.execute(RANK_FISHING_QUERY, (row[0],))
+                ranks["flb"] = ((await cursor.fetchone())[0] + 1, row[0])
+
+            cursor = await db.execute("SELECT profit FROM jade_stats WHERE user_id = ?", (user_id,))
+            row = await cursor.fetchone()
+            if row:
+                cursor = await db.execute(RANK_JADE_QUERY, (row[0],))
+                ranks["jlb"] = ((await cursor.fetchone())[0] + 1, row[0])
+
+        net_worth = self.networth_by_user.get(user_id)
+        if net_worth is not None:
+            ahead = len(self.networth_sorted) - bisect_right(self.networth_sorted, net_worth)
+            ranks["networth"] = (ahead + 1, net_worth)
+
+        return ranks
+
+    @commands.command(name="myrank", aliases=["peringkat"])
+    async def my_rank(self, ctx, member: discord.Member = None):
+        """Lihat posisi kamu di semua leaderboard (tidak hanya top 10)"""
+        member = member or ctx.author
+        ranks = await self.get_user_ranks(member.id)
+
+        if not ranks:
+            await ctx.send(f"📭 {member.display_name} belum ada di leaderboard manapun!")
+            return
+
+        embed = discord.Embed(
+            title=f"📍 Peringkat {member.display_name}",
+            color=0xffd700
+        )
+
+        labels = {
+            "top": ("🏆 Level (mochi!top)", lambda v: f"Level {v}"),
+            "flb": ("🎣 Fishing (mochi!flb)", lambda v: f"{v:,} ikan"),
+            "jlb": ("💎 Jade Profit (mochi!jlb)", lambda v: f"Rp {v:+,}"),
+            "networth": ("💰 Net Worth (mochi!networth)", lambda v: f"Rp {v:,}"),
+        }
+        for board, (rank, value) in ranks.items():
+            name, fmt = labels[board]
+            embed.add_field(name=name, value=f"**#{rank:,}** • {fmt(value)}", inline=False)
+
+        footer = "Level, fishing & jade real-time"
+        if "networth" in ranks:
+            _, refreshed_at = await self.get_board("networth")
+            footer = self.footer(refreshed_at, "Net worth dari snapshot terakhir")
+        embed.set_footer(text=footer)
+        await ctx.send(embed=embed)
+
+    # ========================================
+    # REFRESH
+    # ========================================
+
+    @tasks.loop(minutes=LEADERBOARD_REFRESH_MINUTES)
+    async def refresh_leaderboards(self):
+        started = time.perf_counter()
+        snapshots = {}
+        builders = [
+            self.build_level_board,
+            self.build_fishing_boards,
+            self.build_jade_boards,
+            self.build_tax_boards,
+            self.build_networth_board,
+        ]
+        for builder in builders:
+            try:
+                snapshots.update(await builder())
+            except Exception as e:
+                self.refresh_stats["errors"] += 1
+                print(f"⚠️ Leaderboard refresh gagal ({builder.__name__}): {e}")
+
+        if snapshots:
+            refreshed_at = datetime.utcnow()
+            await self.store_boards(snapshots, refreshed_at)
+            for board, rows in snapshots.items():
+                self.boards[board] = {"rows": rows, "refreshed_at": refreshed_at}
+
+        self.refresh_stats["runs"] += 1
+        self.refresh_stats["last_duration_ms"] = (time.perf_counter() - started) * 1000
+
+    @refresh_leaderboards.before_loop
+    async def before_refresh_leaderboards(self):
+        await self.bot.wait_until_ready()
+
+    async def store_boards(self, snapshots, refreshed_at):
+        """Tulis ulang snapshot semua board dalam 1 transaksi."""
+        params = [
+            (board, rank, row["user_id"], json.dumps(row), refreshed_at.isoformat())
+            for board, rows in snapshots.items()
+            for rank, row in enumerate(rows, 1)
+        ]
+        async with connect() as db:
+            await db.execute("BEGIN")
+            await db.executemany(
+                "DELETE FROM leaderboard_snapshots WHERE board = ?",
+                [(board,) for board in snapshots]
+            )
+            await db.executemany("""
+                INSERT INTO leaderboard_snapshots (board, rank, user_id, data, refreshed_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, params)
+            await db.commit()
+
+    async def build_level_board(self):
+        async with connect() as db:
+            cursor = await db.execute(LEVEL_BOARD_QUERY, (LEADERBOARD_SIZE,))
+            rows = await cursor.fetchall()
+        return {"top": [
+            {"user_id": user_id, "level": level, "currency": currency}
+            for user_id, level, currency in rows
+        ]}
+
+    async def build_fishing_boards(self):
+        columns = ("user_id", "total_fish_caught", "unique_fish")
+        boards = {}
+        async with connect() as db:
+            for sort_key, order_by in (("caught", "fs.total_fish_caught DESC"),
+                                       ("unique", "unique_fish DESC")):
+                cursor = await db.execute(
+                    FISHING_BOARD_QUERY.format(order_by=order_by), (LEADERBOARD_SIZE,)
+                )
+                boards[f"flb:{sort_key}"] = [dict(zip(columns, row)) for row in await cursor.fetchall()]
+
+            # Portfolio value pakai harga pasar saat refresh, dihitung untuk semua user
+            fishing_cog = self.bot.get_cog('Fishing')
+            if fishing_cog:
+                cursor = await db.execute("""
+                    SELECT fs.user_id, fs.total_fish_caught, fi.fish_name, fi.amount
+                    FROM fishing_stats fs
+                    LEFT JOIN fishing_inventory fi ON fs.user_id = fi.user_id
+                """)
+                portfolios = {}
+                for user_id, caught, fish_name, amount in await cursor.fetchall():
+                    entry = portfolios.setdefault(user_id, {
+                        "user_id": user_id,
+                        "total_fish_caught": caught,
+                        "unique_fish": 0,
+                        "portfolio_value": 0,
+                    })
+                    if fish_name is not None:
+                        entry["unique_fish"] += 1
+                        entry["portfolio_value"] += fishing_cog.get_fish_price(fish_name) * amount
+
+                ranked = sorted(portfolios.values(), key=lambda x: x["portfolio_value"], reverse=True)
+                boards["flb:value"] = ranked[:LEADERBOARD_SIZE]
+        return boards
+
+    async def build_jade_boards(self):
+        columns = ("user_id", "total_spent", "total_won", "total_cuts", "total_wins",
+                   "total_losses", "total_jackpots", "profit", "win_rate")
+        boards = {}
+        async with connect() as db:
+            for sort_key in JADE_SORTS:
+                cursor = await db.execute(jade_board_query(sort_key), (LEADERBOARD_SIZE,))
+                boards[f"jlb:{sort_key}"] = [dict(zip(columns, row)) for row in await cursor.fetchall()]
+        return boards
+
+    async def build_tax_boards(self):
+        async with connect() as db:
+            cursor = await db.execute("SELECT SUM(amount) FROM tax_history")
+            total_collected = (await cursor.fetchone())[0] or 0
+
+            cursor = await db.execute("""
+                SELECT user_id, SUM(amount) AS total_amount
+                FROM tax_history
+                GROUP BY user_id
+                ORDER BY total_amount DESC
+                LIMIT ?
+            """, (LEADERBOARD_SIZE,))
+            rows = await cursor.fetchall()
+        return {
+            "tax:top": [{"user_id": user_id, "total_amount": total} for user_id, total in rows],
+            # user_id 0 = baris agregat, bukan user
+            "tax:total": [{"user_id": 0, "total_collected": total_collected}],
+        }
+
+    async def build_networth_board(self):
+        trading_cog = self.bot.get_cog('Trading')
+        if not trading_cog:
+            return {}
+
+        holdings_by_user = {}
+        async with connect() as db:
+            cursor = await db.execute("""
+                SELECT user_id, crypto_symbol, amount FROM crypto_portfolio
+            """)
+            for user_id, symbol, amount in await cursor.fetchall():
+                holdings_by_user.setdefault(user_id, []).append((symbol, amount))
+
+        users = await get_users_bulk(holdings_by_user.keys())
+
+        # Harga per symbol cukup diambil sekali per refresh
+        symbol_to_id = {info["symbol"]: cid for cid, info in trading_cog.available_crypto.items()}
+        prices = {}
+
+        net_worths = []
+        for user_id, holdings in holdings_by_user.items():
+            user_data = users.get(user_id)
+            if not user_data:
+                continue
+
+            cash = user_data["currency"]
+
+            total_assets = 0
+            for symbol, amount in holdings:
+                if symbol not in prices:
+                    crypto_id = symbol_to_id.get(symbol, symbol.lower())
+                    price_data = await trading_cog.get_crypto_price(crypto_id)
+                    prices[symbol] = price_data["price"] if price_data else None
+
+                if prices[symbol] is not None:
+                    total_assets += prices[symbol] * amount
+
+            net_worths.append({
+                "user_id": user_id,
+                "net_worth": cash + int(total_assets),
+                "cash": cash,
+                "assets": int(total_assets),
+            })
+
+        net_worths.sort(key=lambda x: x["net_worth"], reverse=True)
+        self.networth_by_user = {row["user_id"]: row["net_worth"] for row in net_worths}
+        self.networth_sorted = [row["net_worth"] for row in reversed(net_worths)]
+        return {"networth": net_worths[:LEADERBOARD_SIZE]}
+
+
+# Database migration untuk snapshot leaderboard (dijalankan oleh database.run_migrations)
+async def init_leaderboard_tables(db):
+    """Tabel snapshot top-N per board"""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS leaderboard_snapshots (
+            board TEXT NOT NULL,
+            rank INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            refreshed_at TEXT NOT NULL,
+            PRIMARY KEY (board, rank)
+        )
+    """)
+
+
+async def setup(bot):
+    await bot.add_cog(Leaderboards(bot))
@@ -1,6 +1,7 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import asyncio
+import heapq
 import aiosqlite
 from datetime import datetime, timedelta
 import pytz # Import pytz untuk manajemen timezone
@@ -9,47 +10,78 @@ import pytz # Import pytz untuk manajemen timezone
 from config import (
     ALLOWED_PORTO_CHANNELS, MAIN_PORTO_CHANNEL_NAME, FIRE_EMOJI, 
     CANCEL_EMOJI, CONFIRM_EMOJI, DENY_EMOJI, KUMPUL_COOLDOWN_DAYS, 
-    KUMPUL_DURATION_DAYS, KUMPUL_XP_PER_FIRE
+    KUMPUL_DURATION_DAYS, KUMPUL_XP_PER_FIRE, KUMPUL_XP_DEBOUNCE_SECONDS
 )
 from database import (
     get_user, create_user, update_user, 
-    get_kumpul_tracking, update_kumpul_tracking, insert_kumpul_tracking, get_active_kumpul_messages 
+    get_kumpul_tracking, update_kumpul_tracking, insert_kumpul_tracking, get_active_kumpul_messages,
+    get_active_kumpul_for_user, connect
 )
 from utils.helpers import (
     total_xp_needed_for_level, get_rank_title, get_rank_role_name,
-    get_gacha_rolls_for_level, get_luck_gain_for_level, RANK_ROLE_IDS, OWNER_ID 
+    get_gacha_rolls_for_level, get_luck_gain_for_level, RANK_ROLE_IDS, OWNER_ID,
+    get_level_for_xp, get_level_up_rewards
 )
 from utils.embeds import create_profile_embed
 
 # Define time zone (contoh: WIB)
 MY_TIMEZONE = pytz.timezone('Asia/Jakarta') 
 
+# Jadwal reset akumulasi reaksi
+KUMPUL_BOOST_DURATION = timedelta(hours=1)   # jam pertama: tidak ada reset
+KUMPUL_RESET_INTERVAL = timedelta(hours=1)   # setelahnya: reset per jam
+KUMPUL_RECHECK_DELAY = timedelta(minutes=1)  # sesi 'calculating' dicek ulang
+KUMPUL_RESEED_CONCURRENCY = 5                # fetch_message paralel saat seed tally startup
+
 class Leveling(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Scheduler sesi kumpul: min-heap (due_time, message_id).
+        # _kumpul_due menyimpan due terbaru per sesi; entry heap yang tidak
+        # cocok dianggap basi dan dilewati (lazy deletion).
+        self._kumpul_heap = []
+        self._kumpul_due = {}
+        self._kumpul_wakeup = asyncio.Event()
+        self._kumpul_task = None
+        self._reseed_task = None
+        # Tally reaksi 🔥 (non-bot) per pesan kumpul, dijaga dari event raw add/remove
+        self._fire_counts = {}
+        self._fire_seed_lock = asyncio.Lock()
+        # Sesi aktif per user {user_id: message_id} dan set message_id aktif
+        # (filter cepat untuk listener reaksi), siap setelah scheduler load
+        self._session_by_user = {}
+        self._kumpul_message_ids = set()
+        self._sessions_loaded = False
+        self.reaction_stats = {"rejected": 0, "processed": 0}
+        # Debounce grant XP per sesi: {message_id: {"peak": int, "task": Task}}
+        # dan pesan ringkasan yang di-edit {message_id: {"message": Message, "xp": int}}
+        self._pending_grants = {}
+        self._grant_summaries = {}
+        # Puncak yang ditahan selama verifikasi owner ('calculating') {message_id: peak},
+        # diterapkan sekali saat sesi kembali 'active', dibuang kalau dibatalkan
+        self._held_grants = {}
+
+    async def cog_load(self):
         # Start the background task
-        if not self.kumpul_processor.is_running():
-            self.kumpul_processor.start()
-
-    def cog_unload(self):
-        self.kumpul_processor.cancel()
+        self._kumpul_task = asyncio.create_task(self.kumpul_scheduler())
+
+    async def cog_unload(self):
+        if self._kumpul_task:
+            self._kumpul_task.cancel()
+        if self._reseed_task:
+            self._reseed_task.cancel()
+        # Jangan buang XP yang masih di jendela debounce
+        for message_id in list(self._pending_grants):
+            self._pending_grants[message_id]["task"].cancel()
+            await self.flush_kumpul_grant(message_id)
         
     # --- LOGIC LAMA: CHECK LEVEL UP dan APPLY RANK ROLE (Dipertahankan) ---
     async def check_level_up(self, user_id: int, current_xp: int, current_level: int):
-        # ... (logic check_level_up tetap sama)
-        level = current_level
-        while current_xp >= total_xp_needed_for_level(level + 1):
-            level += 1
+        # Closed form: tidak ada loop per level walau XP yang masuk sangat besar
+        level = get_level_for_xp(current_xp, current_level)
 
         if level > current_level:
-            levels_gained = level - current_level
-            total_reward = sum(50000 * (current_level + i) for i in range(1, levels_gained + 1))
-            total_rolls = 0
-            for i in range(levels_gained):
-                new_lvl = current_level + i + 1
-                total_rolls += get_gacha_rolls_for_level(new_lvl)
-            luck_per_level = get_luck_gain_for_level(level)
-            total_luck_gain = luck_per_level * levels_gained
+            total_reward, total_rolls, total_luck_gain = get_level_up_rewards(current_level, level)
 
             await update_user(
                 user_id, level=level, currency=total_reward, gacha_rolls=total_rolls, luck=total_luck_gain
@@ -111,10 +143,12 @@ class Leveling(commands.Cog):
                 return
 
         # 4. Pengecekan Sesi Aktif (Mencegah duplikasi)
-        active_sessions = await get_active_kumpul_messages() 
-        active_session_data = next((s for s in active_sessions if s['user_id'] == ctx.author.id), None)
+        if self._sessions_loaded:
+            has_active_session = ctx.author.id in self._session_by_user
+        else:
+            has_active_session = await get_active_kumpul_for_user(ctx.author.id) is not None
 
-        if active_session_data:
+        if has_active_session:
             await ctx.send("⚠️ Kamu sudah punya sesi pengumpulan XP yang aktif! Selesaikan dulu sebelum memulai yang baru.")
             return
 
@@ -133,8 +167,10 @@ class Leveling(commands.Cog):
         )
         
         kumpul_message = await ctx.send(embed=embed)
-        await kumpul_message.add_reaction(FIRE_EMOJI) 
-        await kumpul_message.add_reaction(CANCEL_EMOJI)
+        # Daftarkan ke filter reaksi sebelum await lain, supaya 🔥 awal tidak ditolak
+        self._fire_counts[kumpul_message.id] = 0
+        self._session_by_user[ctx.author.id] = kumpul_message.id
+        self._kumpul_message_ids.add(kumpul_message.id)
 
         # 6. Simpan data sesi baru ke database
         await insert_kumpul_tracking(
@@ -146,6 +182,10 @@ class Leveling(commands.Cog):
             0, # max_reactions awal
             now_utc.isoformat() # last_xp_check_time awal
         )
+        await kumpul_message.add_reaction(FIRE_EMOJI) 
+        await kumpul_message.add_reaction(CANCEL_EMOJI)
+        
+        self.schedule_kumpul(kumpul_message.id, now_utc + KUMPUL_BOOST_DURATION)
         
         # 7. Update Cooldown Timer Pengguna (KUNCI untuk mencegah spam setelah cancel)
         await update_user(ctx.author.id, last_kumpul_time=now_utc.isoformat())
@@ -155,9 +195,19 @@ class Leveling(commands.Cog):
     async def on_raw_reaction_add(self, payload):
         if payload.user_id == self.bot.user.id:
             return
+        if not self.is_kumpul_message(payload.message_id):
+            return
 
         kumpul_data = await get_kumpul_tracking(payload.message_id)
-        if not kumpul_data or kumpul_data['status'] != 'active': 
+        if not kumpul_data:
+            return
+        if kumpul_data['status'] == 'calculating' and str(payload.emoji) == FIRE_EMOJI:
+            # Menunggu verifikasi owner: tally tetap dijaga, puncaknya ditahan saat flush
+            fire_count = await self.adjust_fire_count(kumpul_data, +1)
+            if fire_count is not None:
+                self.queue_kumpul_grant(payload.message_id, fire_count)
+            return
+        if kumpul_data['status'] != 'active': 
             return
             
         # --- LOGIC OWNER CANCELLATION (PERBAIKAN FOKUS DI SINI) ---
@@ -178,87 +228,319 @@ class Leveling(commands.Cog):
 
         # --- XP Tracking dan Pemberian XP ---
         if str(payload.emoji) == FIRE_EMOJI:
-            # ... (logic pemberian XP real-time tetap sama seperti yang Anda berikan)
-            channel = self.bot.get_channel(payload.channel_id)
-            if not channel: return
-            
+            fire_count = await self.adjust_fire_count(kumpul_data, +1)
+            if fire_count is not None:
+                self.queue_kumpul_grant(payload.message_id, fire_count)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload):
+        if str(payload.emoji) != FIRE_EMOJI or payload.user_id == self.bot.user.id:
+            return
+        if not self.is_kumpul_message(payload.message_id):
+            return
+        
+        kumpul_data = await get_kumpul_tracking(payload.message_id)
+        if not kumpul_data or kumpul_data['status'] not in ('active', 'calculating'):
+            return
+        
+        fire_count = await self.adjust_fire_count(kumpul_data, -1)
+        if fire_count is not None:
+            self.queue_kumpul_grant(payload.message_id, fire_count)
+
+    # --- DEBOUNCE GRANT XP REAKSI ---
+    def queue_kumpul_grant(self, message_id: int, fire_count: int):
+        """Catat puncak tally 🔥 dan jadwalkan satu flush per jendela debounce."""
+        pending = self._pending_grants.get(message_id)
+        if pending:
+            pending["peak"] = max(pending["peak"], fire_count)
+            return
+        self._pending_grants[message_id] = {
+            "peak": fire_count,
+            "task": asyncio.create_task(self._delayed_kumpul_grant(message_id)),
+        }
+
+    async def _delayed_kumpul_grant(self, message_id: int):
+        await asyncio.sleep(KUMPUL_XP_DEBOUNCE_SECONDS)
+        try:
+            await self.flush_kumpul_grant(message_id)
+        except Exception as e:
+            print(f"❌ Kumpul XP grant error ({message_id}): {e}")
+
+    async def flush_kumpul_grant(self, message_id: int):
+        """Terapkan semua kenaikan reaksi di jendela ini: 1 write XP + 1 update tracking.
+
+        Sesi 'calculating' (menunggu verifikasi owner): puncak ditahan di memori,
+        release_held_grant() menerapkannya kalau pembatalan ditolak.
+        """
+        pending = self._pending_grants.pop(message_id, None)
+        if not pending:
+            return
+        
+        kumpul_data = await get_kumpul_tracking(message_id)
+        if not kumpul_data:
+            return
+        
+        fire_count = self._fire_counts.get(message_id, pending["peak"])
+        previous_max = kumpul_data['max_reactions']
+        new_max = pending["peak"]
+        
+        if kumpul_data['status'] == 'calculating' and new_max > previous_max:
+            self._held_grants[message_id] = max(self._held_grants.get(message_id, 0), new_max)
+        
+        if kumpul_data['status'] != 'active' or new_max <= previous_max:
+            await update_kumpul_tracking(message_id, fire_count=fire_count)
+            return
+        
+        xp_increase = (new_max - previous_max) * KUMPUL_XP_PER_FIRE
+        
+        user_id = kumpul_data['user_id']
+        user_data = await get_user(user_id)
+        if not user_data:
+            return
+
+        xp_multiplier = user_data.get('next_xp_mult', 1.0)
+        final_xp = int(xp_increase * xp_multiplier)
+        
+        updated = await update_user(user_id, xp=final_xp)
+        await self.check_level_up(user_id, updated['xp'], updated['level'])
+        await update_kumpul_tracking(message_id, max_reactions=new_max, fire_count=fire_count)
+        
+        await self.announce_kumpul_grant(kumpul_data, final_xp, new_max)
+
+    def release_held_grant(self, message_id: int):
+        """Sesi kembali 'active' setelah verifikasi: grant puncak yang ditahan sekali."""
+        peak = self._held_grants.pop(message_id, None)
+        if peak is not None:
+            self.queue_kumpul_grant(message_id, peak)
+
+    async def announce_kumpul_grant(self, kumpul_data, final_xp: int, new_max: int):
+        """Edit pesan ringkasan sesi yang masih ada, atau kirim yang baru."""
+        channel = self.bot.get_channel(kumpul_data['channel_id'])
+        user = self.bot.get_user(kumpul_data['user_id'])
+        if not channel or not user:
+            return
+        
+        message_id = kumpul_data['message_id']
+        summary = self._grant_summaries.get(message_id)
+        if summary:
+            summary["xp"] += final_xp
             try:
-                message = await channel.fetch_message(payload.message_id)
-            except discord.NotFound:
+                await summary["message"].edit(
+                    content=f"🎉 {user.mention} mendapatkan **{summary['xp']:,} XP**! (Reaksi naik menjadi {new_max} 🔥)"
+                )
                 return
-
-            fire_count = 0
-            for reaction in message.reactions:
-                if str(reaction.emoji) == FIRE_EMOJI:
-                    users = [user async for user in reaction.users() if user.id != self.bot.user.id]
-                    fire_count = len(users)
-                    break
-            
-            previous_max = kumpul_data['max_reactions']
-            
-            if fire_count > previous_max:
-                new_max = fire_count
-                xp_increase = (new_max - previous_max) * KUMPUL_XP_PER_FIRE
-                
-                user_id = kumpul_data['user_id']
-                user = self.bot.get_user(user_id)
-                user_data = await get_user(user_id)
-                
-                if not user_data: return
-
-                xp_multiplier = user_data.get('next_xp_mult', 1.0)
-                final_xp = int(xp_increase * xp_multiplier)
-                
-                await update_user(user_id, xp=final_xp) 
-                await self.check_level_up(user_id, user_data['xp'] + final_xp, user_data['level'])
-                await update_kumpul_tracking(payload.message_id, max_reactions=new_max)
-                
-                if channel:
-                     await channel.send(
-                        f"🎉 {user.mention} mendapatkan **{final_xp:,} XP**! (Reaksi naik menjadi {new_max} 🔥)", 
-                        delete_after=10
-                     )
-
-
-    # --- BACKGROUND TASK: PROSES RESET AKUMULASI XP PER JAM/PERIODE END ---
-    # PERBAIKAN: Ubah interval loop ke menit
-    @tasks.loop(minutes=1) # <<< PASTIKAN INI minutes=1, BUKAN hours=1
-    async def kumpul_processor(self):
+            except discord.NotFound:
+                pass  # Pesan lama dihapus manual: kirim ulang
+        
+        # Tidak pakai delete_after: pesan ini di-edit selama sesi berjalan
+        message = await channel.send(
+            f"🎉 {user.mention} mendapatkan **{final_xp:,} XP**! (Reaksi naik menjadi {new_max} 🔥)"
+        )
+        self._grant_summaries[message_id] = {"message": message, "xp": final_xp}
+
+    def kumpul_filter_stats(self):
+        """Statistik filter reaksi untuk mochi!dbstats."""
+        return {"active": len(self._kumpul_message_ids), **self.reaction_stats}
+
+    def is_kumpul_message(self, message_id: int):
+        """Filter tanpa I/O untuk event reaksi; sebelum scheduler load, semua lolos ke DB."""
+        if self._sessions_loaded and message_id not in self._kumpul_message_ids:
+            self.reaction_stats["rejected"] += 1
+            return False
+        self.reaction_stats["processed"] += 1
+        return True
+
+    async def adjust_fire_count(self, kumpul_data, delta: int):
+        """Update tally 🔥 untuk pesan kumpul dan return nilai barunya.
+
+        Normalnya tally sudah di-seed dari pesan saat scheduler load
+        (reseed_fire_count). Sebelum itu: dari kolom fire_count jika sudah
+        tersimpan, kalau belum (sesi lama) hitung dari pesan satu kali saja.
+        """
+        message_id = kumpul_data['message_id']
+        if message_id not in self._fire_counts:
+            async with self._fire_seed_lock:
+                if message_id not in self._fire_counts:
+                    if kumpul_data['fire_count'] is not None:
+                        self._fire_counts[message_id] = kumpul_data['fire_count']
+                    else:
+                        # Hasil hitung dari pesan sudah termasuk event ini
+                        seeded = await self.count_fire_reactions(kumpul_data)
+                        if seeded is None:
+                            return None
+                        self._fire_counts[message_id] = seeded
+                        return seeded
+        
+        self._fire_counts[message_id] = max(0, self._fire_counts[message_id] + delta)
+        return self._fire_counts[message_id]
+
+    async def count_fire_reactions(self, kumpul_data):
+        """Hitung reaksi 🔥 non-bot langsung dari pesan (hanya untuk seed)."""
+        channel = self.bot.get_channel(kumpul_data['channel_id'])
+        if not channel:
+            return None
+        try:
+            message = await channel.fetch_message(kumpul_data['message_id'])
+        except discord.HTTPException:
+            return None
+        
+        for reaction in message.reactions:
+            if str(reaction.emoji) == FIRE_EMOJI:
+                return reaction.count - (1 if reaction.me else 0)
+        return 0
+
+    async def reseed_fire_count(self, kumpul_data):
+        """Samakan tally dengan reaksi di pesan (sekali per sesi saat scheduler load).
+
+        Reaksi yang ditambah/dihapus selama bot offline tidak pernah jadi event,
+        jadi fire_count tersimpan bisa basi. Setelah ini cukup delta dari listener.
+        """
+        message_id = kumpul_data['message_id']
+        fire_count = await self.count_fire_reactions(kumpul_data)
+        if fire_count is None or message_id not in self._kumpul_message_ids:
+            return  # gagal fetch, atau sesi sudah selesai selama fetch
+        self._fire_counts[message_id] = fire_count
+        
+        if fire_count != kumpul_data['fire_count']:
+            await update_kumpul_tracking(message_id, fire_count=fire_count)
+            # Reaksi yang masuk saat offline tetap dapat XP (grant hanya kalau melewati puncak)
+            if kumpul_data['status'] in ('active', 'calculating'):
+                self.queue_kumpul_grant(message_id, fire_count)
+
+    async def reseed_fire_counts(self, sessions):
+        """Seed tally semua sesi hasil load, paralel dengan batas KUMPUL_RESEED_CONCURRENCY."""
+        semaphore = asyncio.Semaphore(KUMPUL_RESEED_CONCURRENCY)
+        
+        async def seed(kumpul_data):
+            async with semaphore:
+                try:
+                    await self.reseed_fire_count(kumpul_data)
+                except Exception as e:
+                    print(f"⚠️ Gagal seed reaksi kumpul ({kumpul_data['message_id']}): {e}")
+        
+        await asyncio.gather(*(seed(kumpul_data) for kumpul_data in sessions))
+        print(f"✅ Kumpul tally: {len(sessions)} sesi di-seed dari pesan")
+
+
+    # --- BACKGROUND TASK: SCHEDULER RESET AKUMULASI XP / PERIODE END ---
+    # Tidak polling per menit: setiap sesi dijadwalkan di min-heap berdasarkan
+    # waktu reset/berakhir berikutnya, task tidur sampai entry terdekat jatuh tempo.
+    def next_kumpul_due(self, kumpul_data):
+        """Hitung kapan sesi ini perlu diproses berikutnya."""
+        start_time = datetime.fromisoformat(kumpul_data['start_time'])
+        end_time = datetime.fromisoformat(kumpul_data['end_time'])
+        last_check_time = datetime.fromisoformat(kumpul_data['last_xp_check_time'] or kumpul_data['start_time'])
+        
+        boost_end = start_time + KUMPUL_BOOST_DURATION
+        if last_check_time < boost_end:
+            due = boost_end
+        else:
+            due = last_check_time + KUMPUL_RESET_INTERVAL
+        return min(due, end_time)
+
+    def schedule_kumpul(self, message_id: int, due: datetime):
+        """Jadwalkan (atau jadwal ulang) sesi kumpul lalu bangunkan scheduler."""
+        self._kumpul_due[message_id] = due
+        heapq.heappush(self._kumpul_heap, (due, message_id))
+        self._kumpul_wakeup.set()
+
+    def unschedule_kumpul(self, message_id: int, user_id: int = None):
+        """Lupakan sesi yang sudah selesai/dibatalkan dari semua state in-memory."""
+        self._kumpul_due.pop(message_id, None)
+        self._fire_counts.pop(message_id, None)
+        self._kumpul_message_ids.discard(message_id)
+        self._grant_summaries.pop(message_id, None)
+        self._held_grants.pop(message_id, None)
+        if user_id is not None and self._session_by_user.get(user_id) == message_id:
+            del self._session_by_user[user_id]
+
+    async def kumpul_scheduler(self):
         await self.bot.wait_until_ready()
         
-        active_kumpul = await get_active_kumpul_messages()
+        # Load sekali saat startup, setelah itu hanya lewat schedule_kumpul()
         now_utc = datetime.utcnow()
+        sessions = []
+        for kumpul_data in await get_active_kumpul_messages():
+            if kumpul_data['status'] == 'calculating':
+                # Verifikasi owner hilang bersama proses lama: jangan biarkan sesi tergantung
+                if now_utc >= datetime.fromisoformat(kumpul_data['end_time']):
+                    await update_kumpul_tracking(kumpul_data['message_id'], status='ended')
+                    continue
+                await update_kumpul_tracking(kumpul_data['message_id'], status='active')
+                kumpul_data = {**kumpul_data, 'status': 'active'}
+            self._session_by_user[kumpul_data['user_id']] = kumpul_data['message_id']
+            self._kumpul_message_ids.add(kumpul_data['message_id'])
+            self.schedule_kumpul(kumpul_data['message_id'], self.next_kumpul_due(kumpul_data))
+            sessions.append(kumpul_data)
+        # Filter reaksi aktif segera; seed tally jalan di background tanpa menahan scheduler
+        self._sessions_loaded = True
+        print(f"✅ Kumpul scheduler: {len(self._kumpul_due)} sesi aktif dijadwalkan")
+        self._reseed_task = asyncio.create_task(self.reseed_fire_counts(sessions))
         
-        for kumpul_data in active_kumpul:
-            if kumpul_data['status'] != 'active':
-                continue
-            
-            start_time = datetime.fromisoformat(kumpul_data['start_time'])
-            end_time = datetime.fromisoformat(kumpul_data['end_time'])
+        while True:
+            self._kumpul_wakeup.clear()
+            now_utc = datetime.utcnow()
             
-            # 1. LOGIKA SESI BERAKHIR (Setelah 7 hari)
-            if now_utc >= end_time:
-                # ... (logic sesi berakhir dan konsumsi item tetap sama)
-                pass # Placeholder
-                continue
+            while self._kumpul_heap and self._kumpul_heap[0][0] <= now_utc:
+                due, message_id = heapq.heappop(self._kumpul_heap)
+                if self._kumpul_due.get(message_id) != due:
+                    continue  # entry basi
+                del self._kumpul_due[message_id]
+                try:
+                    await self.process_kumpul_session(message_id, now_utc)
+                except Exception as e:
+                    print(f"❌ Kumpul scheduler error ({message_id}): {e}")
             
-            # 2. LOGIKA RESET AKUMULASI (Tetap sama)
-            is_boost_hour = (now_utc - start_time) < timedelta(hours=1)
-            last_check_time = datetime.fromisoformat(kumpul_data['last_xp_check_time'])
-            
-            if is_boost_hour:
-                if now_utc >= (last_check_time + timedelta(minutes=1)):
-                    await update_kumpul_tracking(kumpul_data['message_id'], last_xp_check_time=now_utc.isoformat())
-            else:
-                if now_utc >= (last_check_time + timedelta(hours=1)):
-                    await update_kumpul_tracking(
-                        kumpul_data['message_id'], 
-                        max_reactions=0, 
-                        last_xp_check_time=now_utc.isoformat()
-                    )
-                    channel = self.bot.get_channel(kumpul_data['channel_id'])
-                    if channel:
-                        await channel.send("🔔 Akumulasi XP (reaksi) di-reset per jam...", delete_after=60)
+            timeout = None
+            if self._kumpul_heap:
+                timeout = max(0.0, (self._kumpul_heap[0][0] - datetime.utcnow()).total_seconds())
+            try:
+                await asyncio.wait_for(self._kumpul_wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def process_kumpul_session(self, message_id: int, now_utc: datetime):
+        """Proses satu sesi yang jatuh tempo: akhiri sesi atau reset akumulasi."""
+        kumpul_data = await get_kumpul_tracking(message_id)
+        if not kumpul_data:
+            return
+        if kumpul_data['status'] in ('canceled', 'ended'):
+            self.unschedule_kumpul(message_id, kumpul_data['user_id'])
+            return
+        
+        start_time = datetime.fromisoformat(kumpul_data['start_time'])
+        end_time = datetime.fromisoformat(kumpul_data['end_time'])
+        last_check_time = datetime.fromisoformat(kumpul_data['last_xp_check_time'] or kumpul_data['start_time'])
+        boost_end = start_time + KUMPUL_BOOST_DURATION
+        
+        # 1. LOGIKA SESI BERAKHIR (Setelah 7 hari), juga kalau masih 'calculating'
+        if now_utc >= end_time:
+            await update_kumpul_tracking(message_id, status='ended')
+            self.unschedule_kumpul(message_id, kumpul_data['user_id'])
+            return
+        
+        if kumpul_data['status'] != 'active':
+            # Masih menunggu verifikasi owner ('calculating'): cek lagi nanti
+            self.schedule_kumpul(message_id, min(now_utc + KUMPUL_RECHECK_DELAY, end_time))
+            return
+        
+        # 2. LOGIKA RESET AKUMULASI
+        if last_check_time < boost_end:
+            # Jam pertama (boost) selesai: mulai hitungan reset per jam, reaksi tidak di-reset
+            last_check = boost_end
+            await update_kumpul_tracking(message_id, last_xp_check_time=last_check.isoformat())
+        else:
+            last_check = now_utc
+            await update_kumpul_tracking(
+                message_id, 
+                max_reactions=0, 
+                last_xp_check_time=last_check.isoformat()
+            )
+            channel = self.bot.get_channel(kumpul_data['channel_id'])
+            if channel:
+                await channel.send("🔔 Akumulasi XP (reaksi) di-reset per jam...", delete_after=60)
+        
+        self.schedule_kumpul(message_id, min(last_check + KUMPUL_RESET_INTERVAL, end_time))
             
     # --- OWNER CANCELLATION HANDLER (Definisi Lengkap) ---
     async def handle_owner_cancellation(self, message, kumpul_data, reacting_owner_id: int): 
@@ -268,11 +550,13 @@ class Leveling(commands.Cog):
         if not owner: 
              await message.channel.send("❌ Gagal menemukan user Owner. Pembatalan dibatalkan.")
              await update_kumpul_tracking(kumpul_data['message_id'], status='active')
+             self.release_held_grant(kumpul_data['message_id'])
              return
         
         kumpul_user = self.bot.get_user(kumpul_data['user_id'])
         if not kumpul_user: # Safety check
             await update_kumpul_tracking(kumpul_data['message_id'], status='canceled')
+            self.unschedule_kumpul(kumpul_data['message_id'], kumpul_data['user_id'])
             return 
             
         await update_kumpul_tracking(kumpul_data['message_id'], status='calculating') 
@@ -294,6 +578,7 @@ class Leveling(commands.Cog):
         except discord.Forbidden: # Handle jika DM ditutup
             await message.channel.send(f"❌ Gagal mengirim DM verifikasi ke Owner {owner.mention}. Pembatalan dibatalkan.")
             await update_kumpul_tracking(kumpul_data['message_id'], status='active')
+            self.release_held_grant(kumpul_data['message_id'])
             return
 
         await dm_message.add_reaction(CONFIRM_EMOJI)
@@ -308,23 +593,22 @@ class Leveling(commands.Cog):
             
             if str(reaction.emoji) == CONFIRM_EMOJI:
                 await update_kumpul_tracking(kumpul_data['message_id'], status='canceled')
+                self.unschedule_kumpul(kumpul_data['message_id'], kumpul_data['user_id'])
                 await message.channel.send(f"✅ **Pembatalan Kumpul XP** untuk {kumpul_user.mention} dikonfirmasi oleh Owner.")
                 await dm_message.edit(embed=discord.Embed(title="✅ PEMBATALAN DIKONFIRMASI", description=f"XP kumpul oleh {kumpul_user.mention} dibatalkan.", color=0x2ecc71))
             
             elif str(reaction.emoji) == DENY_EMOJI:
-                await update_kumpul_tracking(kumpul_data['message_id'], status='active') 
+                await update_kumpul_tracking(kumpul_data['message_id'], status='active')
+                self.release_held_grant(kumpul_data['message_id'])
                 await message.channel.send(f"🚫 **Pembatalan Kumpul XP** untuk {kumpul_user.mention} ditolak oleh Owner. Proses kumpul dilanjutkan.")
                 await dm_message.edit(embed=discord.Embed(title="🚫 PEMBATALAN DITOLAK", description=f"XP kumpul oleh {kumpul_user.mention} dilanjutkan.", color=0xf1c40f))
 
         except asyncio.TimeoutError:
-            await update_kumpul_tracking(kumpul_data['message_id'], status='active') 
+            await update_kumpul_tracking(kumpul_data['message_id'], status='active')
+            self.release_held_grant(kumpul_data['message_id'])
             await message.channel.send(f"⏰ Konfirmasi pembatalan XP kumpul untuk {kumpul_user.mention} **timeout**. Proses kumpul dilanjutkan.")
             await dm_message.edit(embed=discord.Embed(title="⏰ TIMEOUT", description="Konfirmasi pembatalan timeout.", color=0xf39c12))
 
-    @kumpul_processor.before_loop
-    async def before_kumpul_processor(self):
-        await self.bot.wait_until_ready()
-
 
     # --- LOGIC LAMA: PROFILE, TOP, RANK ---
     @commands.command(name="profile")
@@ -338,7 +622,7 @@ class Leveling(commands.Cog):
             return
 
         # Get portfolio count
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             cursor = await db.execute("""
                 SELECT portfolio_count FROM portfolio_tracking WHERE user_id = ?
             """, (user.id,))
@@ -398,15 +682,12 @@ class Leveling(commands.Cog):
 
     @commands.command(name="top")
     async def leaderboard(self, ctx):
-        # ... (logic lama leaderboard)
-        async with aiosqlite.connect("mochi.db") as db:
-            cursor = await db.execute("""
-                SELECT user_id, level, currency
-                FROM users
-                ORDER BY level DESC, currency DESC
-                LIMIT 10
-            """)
-            rows = await cursor.fetchall()
+        lb_cog = self.bot.get_cog('Leaderboards')
+        if not lb_cog:
+            await ctx.send("❌ Leaderboard system tidak aktif!")
+            return
+
+        rows, refreshed_at = await lb_cog.get_board("top")
 
         if not rows:
             await ctx.send("Belum ada data leaderboard!")
@@ -419,13 +700,13 @@ class Leveling(commands.Cog):
         )
 
         leaderboard_text = ""
-        for i, (user_id, level, currency) in enumerate(rows, start=1):
-            user = self.bot.get_user(user_id)
-            username = user.display_name if user else f"[User {user_id}]"
-            leaderboard_text += f"`{i}.` **{username}** — Level {level} | Rp {currency:,}\n"
+        for i, row in enumerate(rows, start=1):
+            user = self.bot.get_user(row["user_id"])
+            username = user.display_name if user else f"[User {row['user_id']}]"
+            leaderboard_text += f"`{i}.` **{username}** — Level {row['level']} | Rp {row['currency']:,}\n"
 
         embed.description = leaderboard_text
-        embed.set_footer(text="Naikkan levelmu dengan kirim portofolio!")
+        embed.set_footer(text=lb_cog.footer(refreshed_at, "Naikkan levelmu dengan kirim portofolio!"))
         await ctx.send(embed=embed)
 
     @commands.command(name="rank")
@@ -4,7 +4,7 @@ import aiosqlite
 import random
 from datetime import datetime, timedelta
 import pytz
-from database import get_user, update_user
+from database import get_user, update_user, connect, write_behind, invalidate_user, BULK_CHUNK_SIZE, QUEST_COMPLETION_QUERY
 from utils.config_secrets import QUEST_CHANNEL_ID #
 
 class Quests(commands.Cog):
@@ -86,7 +86,7 @@ class Quests(commands.Cog):
     @tasks.loop(seconds=10)
     async def check_quest_completion(self):
         """Check quest completion setiap 10 detik dan auto-reward"""
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             # Get current active quest
             cursor = await db.execute("""
                 SELECT quest_id, type, target_amount, reward_currency, 
@@ -103,86 +103,83 @@ class Quests(commands.Cog):
             quest_id, quest_type, target, reward_currency, reward_luck, title, emoji = quest
             
             # Check all users who completed quest but not claimed
-            cursor = await db.execute("""
-                SELECT user_id, current_progress 
-                FROM quest_progress 
-                WHERE quest_id = ? AND completed = 0 AND current_progress >= ?
-            """, (quest_id, target))
+            cursor = await db.execute(QUEST_COMPLETION_QUERY, (quest_id, target))
             completed_users = await cursor.fetchall()
             
-            quest_channel = self.bot.get_channel(QUEST_CHANNEL_ID)
+            if not completed_users:
+                return
             
-            for user_id, progress in completed_users:
-                # Mark as completed
-                await db.execute("""
-                    UPDATE quest_progress 
-                    SET completed = 1, completed_at = ?
-                    WHERE quest_id = ? AND user_id = ?
-                """, (datetime.utcnow().isoformat(), quest_id, user_id))
-                
-                # Give reward - PERBAIKAN DI SINI
-                # Jangan gunakan update_user() yang membuat koneksi database baru
-                # Gunakan execute langsung dengan koneksi yang sama
-                cursor = await db.execute("""
-                    SELECT currency, luck FROM users WHERE user_id = ?
-                """, (user_id,))
-                user_data = await cursor.fetchone()
-                
-                if user_data:
-                    new_currency = user_data[0] + reward_currency
-                    new_luck = user_data[1] + reward_luck
+            # Tandai selesai + beri reward untuk SEMUA user dalam satu transaksi
+            now = datetime.utcnow().isoformat()
+            user_ids = [user_id for user_id, _ in completed_users]
+            
+            await db.executemany("""
+                UPDATE quest_progress 
+                SET completed = 1, completed_at = ?
+                WHERE quest_id = ? AND user_id = ?
+            """, [(now, quest_id, user_id) for user_id in user_ids])
+            
+            # Give reward (increment atomik, bukan read-modify-write)
+            await db.executemany("""
+                UPDATE users 
+                SET currency = currency + ?, luck = luck + ?
+                WHERE user_id = ?
+            """, [(reward_currency, reward_luck, user_id) for user_id in user_ids])
+            
+            # Update quest completed count
+            await db.executemany("""
+                INSERT INTO quest_stats (user_id, total_completed, last_completed_at)
+                VALUES (?, 1, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    total_completed = total_completed + 1,
+                    last_completed_at = excluded.last_completed_at
+            """, [(user_id, now) for user_id in user_ids])
+            
+            await db.commit()
+            
+            # Total completed per user (untuk achievement) dalam query IN per chunk
+            total_completed = {}
+            for i in range(0, len(user_ids), BULK_CHUNK_SIZE):
+                chunk = user_ids[i:i + BULK_CHUNK_SIZE]
+                cursor = await db.execute(f"""
+                    SELECT user_id, total_completed FROM quest_stats 
+                    WHERE user_id IN ({', '.join(['?'] * len(chunk))})
+                """, chunk)
+                total_completed.update(await cursor.fetchall())
+        
+        for user_id in user_ids:
+            invalidate_user(user_id)  # Raw SQL ke users -> buang cache
+        
+        quest_channel = self.bot.get_channel(QUEST_CHANNEL_ID)
+        ach_cog = self.bot.get_cog('Achievements')
+        
+        for user_id, progress in completed_users:
+            # Send completion message
+            if quest_channel:
+                try:
+                    user = self.bot.get_user(user_id)
+                    user_mention = user.mention if user else f"<@{user_id}>"
                     
-                    await db.execute("""
-                        UPDATE users 
-                        SET currency = ?, luck = ?
-                        WHERE user_id = ?
-                    """, (new_currency, new_luck, user_id))
-                
-                await db.commit()  # Commit untuk setiap user
-                
-                # Update quest completed count
-                await db.execute("""
-                    INSERT OR REPLACE INTO quest_stats (user_id, total_completed, last_completed_at)
-                    VALUES (
-                        ?,
-                        COALESCE((SELECT total_completed FROM quest_stats WHERE user_id = ?), 0) + 1,
-                        ?
+                    embed = discord.Embed(
+                        title="✅ QUEST COMPLETED!",
+                        description=f"{user_mention} telah menyelesaikan daily quest!",
+                        color=0x00ff00
                     )
-                """, (user_id, user_id, datetime.utcnow().isoformat()))
-                await db.commit()  # Commit lagi
-                
-                # Send completion message
-                if quest_channel:
-                    try:
-                        user = self.bot.get_user(user_id)
-                        user_mention = user.mention if user else f"<@{user_id}>"
-                        
-                        embed = discord.Embed(
-                            title="✅ QUEST COMPLETED!",
-                            description=f"{user_mention} telah menyelesaikan daily quest!",
-                            color=0x00ff00
-                        )
-                        embed.add_field(name="📋 Quest", value=f"{emoji} {title}", inline=False)
-                        embed.add_field(name="✅ Progress", value=f"{progress}/{target}", inline=True)
-                        embed.add_field(name="💰 Reward", value=f"Rp {reward_currency:,}", inline=True)
-                        embed.add_field(name="🍀  Luck Bonus", value=f"+{reward_luck}", inline=True)
-                        embed.set_footer(text="Selamat! Daily quest baru besok jam 07:00 WIB")
-                        
-                        await quest_channel.send(embed=embed)
-                    except Exception as e:
-                        print(f"Error sending completed quest message: {e}")
-                
-                # Check quest achievement progress (untuk achievement system)
-                ach_cog = self.bot.get_cog('Achievements')
-                if ach_cog:
-                    cursor = await db.execute("""
-                        SELECT total_completed FROM quest_stats 
-                        WHERE user_id = ?
-                    """, (user_id,))
-                    row = await cursor.fetchone()
-                    total_completed = row[0] if row else 0
+                    embed.add_field(name="📋 Quest", value=f"{emoji} {title}", inline=False)
+                    embed.add_field(name="✅ Progress", value=f"{progress}/{target}", inline=True)
+                    embed.add_field(name="💰 Reward", value=f"Rp {reward_currency:,}", inline=True)
+                    embed.add_field(name="🍀  Luck Bonus", value=f"+{reward_luck}", inline=True)
+                    embed.set_footer(text="Selamat! Daily quest baru besok jam 07:00 WIB")
                     
-                    await ach_cog.check_achievement_progress(user_id, "quests_completed", total_completed)
+                    await quest_channel.send(embed=embed)
+                except Exception as e:
+                    print(f"Error sending completed quest message: {e}")
+            
+            # Check quest achievement progress (untuk achievement system)
+            if ach_cog:
+                await ach_cog.check_achievement_progress(
+                    user_id, "quests_completed", total_completed.get(user_id, 0)
+                )
     
     @check_quest_completion.before_loop
     async def before_check_completion(self):
@@ -210,7 +207,7 @@ class Quests(commands.Cog):
         # ========================================
         # ✅ PERBAIKAN: Cek dulu apakah quest hari ini sudah ada
         # ========================================
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             cursor = await db.execute("""
                 SELECT quest_id FROM global_quests 
                 WHERE quest_id = ? AND active = 1
@@ -266,7 +263,7 @@ class Quests(commands.Cog):
         # ========================================
         expires_at = datetime.utcnow() + timedelta(hours=24)
         
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             # Deactivate old quests
             await db.execute("UPDATE global_quests SET active = 0")
             
@@ -338,7 +335,7 @@ class Quests(commands.Cog):
     
     async def update_quest_progress(self, user_id: int, quest_type: str, amount: int = 1):
         """Update progress quest user untuk GLOBAL quest"""
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             # Get current active quest
             cursor = await db.execute("""
                 SELECT quest_id, target_amount FROM global_quests
@@ -346,38 +343,19 @@ class Quests(commands.Cog):
                 LIMIT 1
             """, (quest_type, datetime.utcnow().isoformat()))
             quest = await cursor.fetchone()
-            
-            if not quest:
-                return
-            
-            quest_id, target_amount = quest
-            
-            # Update or insert progress
-            cursor = await db.execute("""
-                SELECT current_progress FROM quest_progress 
-                WHERE quest_id = ? AND user_id = ?
-            """, (quest_id, user_id))
-            existing = await cursor.fetchone()
-            
-            if existing:
-                new_progress = min(existing[0] + amount, target_amount)
-                await db.execute("""
-                    UPDATE quest_progress 
-                    SET current_progress = ?, last_updated = ?
-                    WHERE quest_id = ? AND user_id = ?
-                """, (new_progress, datetime.utcnow().isoformat(), quest_id, user_id))
-            else:
-                await db.execute("""
-                    INSERT INTO quest_progress (quest_id, user_id, current_progress, last_updated)
-                    VALUES (?, ?, ?, ?)
-                """, (quest_id, user_id, min(amount, target_amount), datetime.utcnow().isoformat()))
-            
-            await db.commit()
+        
+        if not quest:
+            return
+        
+        quest_id, target_amount = quest
+        
+        # Upsert progress (dibatasi target_amount) lewat write-behind
+        await write_behind.add_quest_progress(quest_id, user_id, amount, target_amount)
     
     @commands.command(name="quest", aliases=["q", "dailyquest"])
     async def view_quest(self, ctx):
         """📋 Lihat daily quest dengan progress bar"""
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             # Get current active quest
             cursor = await db.execute("""
                 SELECT quest_id, title, description, emoji, target_amount,
@@ -554,7 +532,7 @@ class Quests(commands.Cog):
         """📊 Lihat statistik quest kamu"""
         user = member or ctx.author
         
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             db.row_factory = aiosqlite.Row
             
             # Get quest stats
@@ -708,64 +686,59 @@ class Quests(commands.Cog):
         embed.set_footer(text="Quest spawn otomatis jam 07:00 WIB setiap hari!")
         await ctx.send(embed=embed)
 
-async def init_quest_tables():
-    """Initialize quest tables"""
-    async with aiosqlite.connect("mochi.db") as db:
-        # Global quests table (1 quest for all users)
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS global_quests (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                quest_id TEXT UNIQUE NOT NULL,
-                type TEXT NOT NULL,
-                title TEXT NOT NULL,
-                description TEXT NOT NULL,
-                emoji TEXT DEFAULT '📋',
-                target_amount INTEGER NOT NULL,
-                reward_currency INTEGER NOT NULL,
-                reward_luck INTEGER NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP NOT NULL,
-                active INTEGER DEFAULT 1
-            )
-        """)
-        
-        # Quest progress per user
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS quest_progress (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                quest_id TEXT NOT NULL,
-                user_id INTEGER NOT NULL,
-                current_progress INTEGER DEFAULT 0,
-                completed INTEGER DEFAULT 0,
-                completed_at TIMESTAMP,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(quest_id, user_id)
-            )
-        """)
-        
-        # Quest stats per user
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS quest_stats (
-                user_id INTEGER PRIMARY KEY,
-                total_completed INTEGER DEFAULT 0,
-                last_completed_at TIMESTAMP
-            )
-        """)
-        
-        # Create indexes for performance
-        await db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_quest_progress_user 
-            ON quest_progress(user_id, quest_id)
-        """)
-        
-        await db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_global_quest_active 
-            ON global_quests(active, expires_at)
-        """)
-        
-        await db.commit()
-        print("✅ Quest tables created!")
+async def init_quest_tables(db):
+    """Initialize quest tables (migration step, dipanggil database.run_migrations)"""
+    # Global quests table (1 quest for all users)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS global_quests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            quest_id TEXT UNIQUE NOT NULL,
+            type TEXT NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL,
+            emoji TEXT DEFAULT '📋',
+            target_amount INTEGER NOT NULL,
+            reward_currency INTEGER NOT NULL,
+            reward_luck INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at TIMESTAMP NOT NULL,
+            active INTEGER DEFAULT 1
+        )
+    """)
+    
+    # Quest progress per user
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS quest_progress (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            quest_id TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            current_progress INTEGER DEFAULT 0,
+            completed INTEGER DEFAULT 0,
+            completed_at TIMESTAMP,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(quest_id, user_id)
+        )
+    """)
+    
+    # Quest stats per user
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS quest_stats (
+            user_id INTEGER PRIMARY KEY,
+            total_completed INTEGER DEFAULT 0,
+            last_completed_at TIMESTAMP
+        )
+    """)
+    
+    # Create indexes for performance
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_quest_progress_user 
+        ON quest_progress(user_id, quest_id)
+    """)
+    
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_global_quest_active 
+        ON global_quests(active, expires_at)
+    """)
 
 async def setup(bot):
-    await init_quest_tables()
     await bot.add_cog(Quests(bot))
\ No newline at end of file
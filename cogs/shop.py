@@ -4,7 +4,7 @@ import aiosqlite
 import random
 from datetime import datetime, timedelta
 import pytz
-from database import get_user, update_user
+from database import get_user, update_user, connect
 from utils.config_secrets import QUEST_CHANNEL_ID as SHOP_CHANNEL_ID
 
 class Shop(commands.Cog):
@@ -166,7 +166,7 @@ class Shop(commands.Cog):
         shop_id = now_wib.strftime('%Y%m%d')
         
         # Check if shop already exists for today
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             cursor = await db.execute("""
                 SELECT COUNT(*) FROM daily_shop WHERE shop_id = ?
             """, (shop_id,))
@@ -184,7 +184,7 @@ class Shop(commands.Cog):
         num_deals = random.randint(1, 2)
         special_deals = random.sample(selected_items, num_deals)
         
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             # Clear old shop data (older than 7 days)
             seven_days_ago = (now_wib - timedelta(days=7)).strftime('%Y%m%d')
             await db.execute("""
@@ -232,7 +232,7 @@ class Shop(commands.Cog):
         )
         
         # Get shop items (limit preview)
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             db.row_factory = aiosqlite.Row
             cursor = await db.execute("""
                 SELECT * FROM daily_shop WHERE shop_id = ? AND stock > 0
@@ -276,7 +276,7 @@ class Shop(commands.Cog):
         now_wib = datetime.now(wib)
         shop_id = now_wib.strftime('%Y%m%d')
         
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             db.row_factory = aiosqlite.Row
             cursor = await db.execute("""
                 SELECT * FROM daily_shop WHERE shop_id = ? AND stock > 0
@@ -502,7 +502,7 @@ class Shop(commands.Cog):
         wib = pytz.timezone('Asia/Jakarta')
         shop_id = datetime.now(wib).strftime('%Y%m%d')
         
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             # Double check stock
             cursor = await db.execute("""
                 SELECT stock FROM daily_shop 
@@ -621,7 +621,7 @@ class Shop(commands.Cog):
                     reward_text = f"🎁 Mystery Box: +Rp {amount:,}!"
             
             elif item_key == "double_daily_xp":
-                async with aiosqlite.connect("mochi.db") as db:
+                async with connect() as db:
                     today = datetime.utcnow().date().isoformat()
                     await db.execute("""
                         INSERT OR REPLACE INTO active_buffs (user_id, buff_type, expires_at)
@@ -684,7 +684,7 @@ class Shop(commands.Cog):
         if limit > 50:
             limit = 50
         
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             db.row_factory = aiosqlite.Row
             cursor = await db.execute("""
                 SELECT * FROM shop_purchases 
@@ -727,62 +727,57 @@ class Shop(commands.Cog):
         await self.generate_daily_shop()
         await ctx.send("✅ Daily shop generated!")
 
-async def init_shop_tables():
-    """Initialize shop tables"""
-    async with aiosqlite.connect("mochi.db") as db:
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS daily_shop (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                shop_id TEXT NOT NULL,
-                item_key TEXT NOT NULL,
-                price INTEGER NOT NULL,
-                stock INTEGER NOT NULL,
-                original_price INTEGER NOT NULL,
-                is_special INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(shop_id, item_key)
-            )
-        """)
-        
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS shop_purchases (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                shop_id TEXT NOT NULL,
-                item_key TEXT NOT NULL,
-                price INTEGER NOT NULL,
-                purchased_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS active_buffs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                buff_type TEXT NOT NULL,
-                expires_at TEXT NOT NULL,
-                UNIQUE(user_id, buff_type)
-            )
-        """)
-        
-        await db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_daily_shop_id 
-            ON daily_shop(shop_id, stock)
-        """)
-        
-        await db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_shop_purchases_user 
-            ON shop_purchases(user_id, purchased_at DESC)
-        """)
-        
-        await db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_active_buffs_user 
-            ON active_buffs(user_id, expires_at)
-        """)
-        
-        await db.commit()
-        print("✅ Shop tables created!")
+async def init_shop_tables(db):
+    """Initialize shop tables (migration step, dipanggil database.run_migrations)"""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS daily_shop (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            shop_id TEXT NOT NULL,
+            item_key TEXT NOT NULL,
+            price INTEGER NOT NULL,
+            stock INTEGER NOT NULL,
+            original_price INTEGER NOT NULL,
+            is_special INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(shop_id, item_key)
+        )
+    """)
+    
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS shop_purchases (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            shop_id TEXT NOT NULL,
+            item_key TEXT NOT NULL,
+            price INTEGER NOT NULL,
+            purchased_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS active_buffs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            buff_type TEXT NOT NULL,
+            expires_at TEXT NOT NULL,
+            UNIQUE(user_id, buff_type)
+        )
+    """)
+    
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_daily_shop_id 
+        ON daily_shop(shop_id, stock)
+    """)
+    
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_shop_purchases_user 
+        ON shop_purchases(user_id, purchased_at DESC)
+    """)
+    
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_active_buffs_user 
+        ON active_buffs(user_id, expires_at)
+    """)
 
 async def setup(bot):
-    await init_shop_tables()
     await bot.add_cog(Shop(bot))
\ No newline at end of file
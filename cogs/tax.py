@@ -2,8 +2,8 @@ import discord
 from discord.ext import commands, tasks
 import aiosqlite
 from datetime import datetime, timedelta, timezone
-from database import get_user, update_user, get_tax_system_state, update_tax_system_state, create_user 
-from utils.helpers import get_rank_title, OWNER_ID 
+from database import get_user, update_user, get_tax_system_state, update_tax_system_state, create_user, connect, write_behind, iter_users, TAX_HISTORY_QUERY
+from utils.helpers import get_rank_title, OWNER_ID, RANK_TABLE, is_tax_exempt_level
 from utils.config_secrets import QUEST_CHANNEL_ID # <<< IMPOR QUEST_CHANNEL_ID DARI SINI
 
 def get_next_monday_1700_utc() -> datetime:
@@ -47,7 +47,7 @@ class TaxSystem(commands.Cog):
             "item_trade_tax": 0.10, 
         }
         
-        self.TAX_FREE_RANKS = ["Adipati", "Raja"]
+        self.TAX_FREE_RANKS = [rank["role"] for rank in RANK_TABLE if rank["tax_exempt"]]
         
         self.weekly_tax_collection.start()
 
@@ -57,17 +57,12 @@ class TaxSystem(commands.Cog):
     # --- HELPER: LOG TAX HISTORY (Dipindahkan ke dalam class) ---
     async def record_tax_history(self, user_id: int, tax_type: str, amount: int):
         """Helper to log tax history."""
-        async with aiosqlite.connect("mochi.db") as db:
-            await db.execute("""
-                INSERT INTO tax_history (user_id, tax_type, amount, collected_at)
-                VALUES (?, ?, ?, ?)
-            """, (user_id, tax_type, amount, datetime.utcnow()))
-            await db.commit()
+        await write_behind.add_tax_log(user_id, tax_type, amount)
 
     # --- HELPER: CHECK TAX EXEMPTION ---
     def is_tax_exempt_level(self, level: int):
-        """Check apakah user bebas pajak berdasarkan level (Level 20+ / Adipati/Raja)"""
-        return level >= 20
+        """Check apakah user bebas pajak berdasarkan level (perk rank di RANK_TABLE)"""
+        return is_tax_exempt_level(level)
     
     # --- AUTOMATIC TASK LOOP SETUP ---
     @tasks.loop(hours=1)
@@ -93,30 +88,29 @@ class TaxSystem(commands.Cog):
         taxed_users = 0
         exempt_users = 0
         
-        async with aiosqlite.connect("mochi.db") as db:
-            cursor = await db.execute("SELECT user_id, currency, level FROM users WHERE currency > 0")
-            users = await cursor.fetchall()
-            
-            for user_id, currency, level in users:
+        # Stream users per batch (keyset pagination), bukan fetchall sekaligus
+        async for batch in iter_users(["user_id", "currency", "level"], where="currency > 0"):
+            for user in batch:
                 # Check if user is tax exempt (Logic baru)
-                if self.is_tax_exempt_level(level):
+                if self.is_tax_exempt_level(user["level"]):
                     exempt_users += 1
                     continue
                 
                 # Calculate tax (5% of cash)
-                tax_amount = int(currency * self.TAX_RATES["income_tax"])
+                tax_amount = int(user["currency"] * self.TAX_RATES["income_tax"])
                 
                 if tax_amount > 0:
                     # Deduct tax
-                    await update_user(user_id, currency=-tax_amount)
+                    await write_behind.add_user_delta(user["user_id"], currency=-tax_amount)
                     
                     # Log tax history
-                    await self.record_tax_history(user_id, "income_tax", tax_amount)
+                    await self.record_tax_history(user["user_id"], "income_tax", tax_amount)
                     
                     total_collected += tax_amount
                     taxed_users += 1
-            
-            await db.commit()
+        
+        # Pastikan semua potongan pajak sudah tersimpan sebelum pengumuman
+        await write_behind.flush()
         
         # Send announcement (Logic pengumuman yang sudah ada)
         if tax_channel:
@@ -211,7 +205,7 @@ class TaxSystem(commands.Cog):
     # --- TRANSACTION TAX CALCULATIONS ---
     def calculate_transaction_tax(self, amount: int, tax_type: str, user_level: int = 0):
         # ... (logic tidak berubah, menggunakan self.is_tax_exempt_level)
-        if user_level >= 20:
+        if self.is_tax_exempt_level(user_level):
             return 0, amount
         tax_rate = self.TAX_RATES.get(tax_type, 0)
         tax_amount = int(amount * tax_rate)
@@ -271,14 +265,9 @@ class TaxSystem(commands.Cog):
         if limit > 20: 
             limit = 20 
             
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             db.row_factory = aiosqlite.Row
-            cursor = await db.execute("""
-                SELECT tax_type, amount, collected_at FROM tax_history
-                WHERE user_id = ?
-                ORDER BY collected_at DESC
-                LIMIT ?
-            """, (ctx.author.id, limit))
+            cursor = await db.execute(TAX_HISTORY_QUERY, (ctx.author.id, limit))
             rows = await cursor.fetchall()
         
         if not rows:
@@ -310,22 +299,15 @@ class TaxSystem(commands.Cog):
     async def tax_stats(self, ctx):
         """Lihat total pajak yang terkumpul dan Top Taxpayers."""
         
-        async with aiosqlite.connect("mochi.db") as db:
-            db.row_factory = aiosqlite.Row
-            
-            # 1. Hitung Total Pajak Terkumpul
-            total_cursor = await db.execute("SELECT SUM(amount) AS total FROM tax_history")
-            total_collected = (await total_cursor.fetchone())["total"] or 0
-            
-            # 2. Top 10 Taxpayers (SUM dari semua tax_history)
-            top_cursor = await db.execute("""
-                SELECT user_id, SUM(amount) AS total_amount 
-                FROM tax_history
-                GROUP BY user_id
-                ORDER BY total_amount DESC
-                LIMIT 10
-            """)
-            top_taxpayers = await top_cursor.fetchall()
+        lb_cog = self.bot.get_cog('Leaderboards')
+        if not lb_cog:
+            await ctx.send("❌ Leaderboard system tidak aktif!")
+            return
+        
+        # Total & Top 10 Taxpayers dari snapshot (SUM tax_history dihitung saat refresh)
+        total_rows, refreshed_at = await lb_cog.get_board("tax:total")
+        total_collected = total_rows[0]["total_collected"] if total_rows else 0
+        top_taxpayers, _ = await lb_cog.get_board("tax:top")
 
         embed = discord.Embed(
             title="📊 Mochi Tax System Stats",
@@ -349,7 +331,7 @@ class TaxSystem(commands.Cog):
             top_text += f"{medal} **{username}**: Rp {row['total_amount']:,}\n"
         
         embed.add_field(name="🏆 Top Taxpayers", value=top_text or "No data", inline=False)
-        embed.set_footer(text="Good taxpayers = good citizens! 👍")
+        embed.set_footer(text=lb_cog.footer(refreshed_at, "Good taxpayers = good citizens! 👍"))
         
         await ctx.send(embed=embed)
 
@@ -4,7 +4,7 @@ import aiohttp
 import asyncio
 from datetime import datetime
 
-from database import get_user, create_user, update_user
+from database import get_user, create_user, update_user, connect
 
 class Trading(commands.Cog):
     def __init__(self, bot):
@@ -58,7 +58,7 @@ class Trading(commands.Cog):
     async def get_user_portfolio(self, user_id: int):
         """Ambil portfolio crypto user dari database"""
         import aiosqlite
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             db.row_factory = aiosqlite.Row
             cursor = await db.execute("""
                 SELECT crypto_symbol, amount, avg_buy_price 
@@ -71,7 +71,7 @@ class Trading(commands.Cog):
     async def get_user_holdings(self, user_id: int, crypto_symbol: str):
         """Ambil holdings spesifik crypto user"""
         import aiosqlite
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             db.row_factory = aiosqlite.Row
             cursor = await db.execute("""
                 SELECT crypto_symbol, amount, avg_buy_price 
@@ -85,7 +85,7 @@ class Trading(commands.Cog):
         """Update portfolio user"""
         import aiosqlite
         try:
-            async with aiosqlite.connect("mochi.db") as db:
+            async with connect() as db:
                 cursor = await db.execute("""
                     SELECT amount, avg_buy_price FROM crypto_portfolio 
                     WHERE user_id = ? AND crypto_symbol = ?
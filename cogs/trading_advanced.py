@@ -3,6 +3,8 @@ from discord.ext import commands, tasks
 import aiosqlite
 from datetime import datetime
 
+from database import connect, TRADE_HISTORY_QUERY
+
 class TradingAdvanced(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -14,14 +16,9 @@ class TradingAdvanced(commands.Cog):
         if limit > 50:
             limit = 50
         
-        async with aiosqlite.connect("mochi.db") as db:
+        async with connect() as db:
             db.row_factory = aiosqlite.Row
-            cursor = await db.execute("""
-                SELECT * FROM trade_history 
-                WHERE user_id = ? 
-                ORDER BY timestamp DESC 
-                LIMIT ?
-            """, (ctx.author.id, limit))
+            cursor = await db.execute(TRADE_HISTORY_QUERY, (ctx.author.id, limit))
             rows = await cursor.fetchall()
         
         if not rows:
@@ -132,50 +129,13 @@ class TradingAdvanced(commands.Cog):
     @commands.command(name="networth")
     async def net_worth_leaderboard(self, ctx):
         """Leaderboard berdasarkan net worth (cash + crypto assets)"""
-        # Get trading cog untuk akses harga
-        trading_cog = self.bot.get_cog('Trading')
-        if not trading_cog:
-            await ctx.send("❌ Trading system tidak aktif!")
+        # Snapshot dihitung berkala oleh cog Leaderboards (harga crypto + cash)
+        lb_cog = self.bot.get_cog('Leaderboards')
+        if not lb_cog:
+            await ctx.send("❌ Leaderboard system tidak aktif!")
             return
         
-        from database import get_user
-        
-        # Get all users with crypto portfolio
-        async with aiosqlite.connect("mochi.db") as db:
-            cursor = await db.execute("""
-                SELECT DISTINCT user_id FROM crypto_portfolio
-            """)
-            user_ids = [row[0] for row in await cursor.fetchall()]
-        
-        # Calculate net worth for each user
-        net_worths = []
-        for user_id in user_ids:
-            user_data = await get_user(user_id)
-            if not user_data:
-                continue
-            
-            cash = user_data["currency"]
-            portfolio = await trading_cog.get_user_portfolio(user_id)
-            
-            total_assets = 0
-            for holding in portfolio:
-                crypto_id = holding["crypto_symbol"].lower()
-                
-                # Find crypto info
-                for cid, info in trading_cog.available_crypto.items():
-                    if info["symbol"] == holding["crypto_symbol"]:
-                        crypto_id = cid
-                        break
-                
-                price_data = await trading_cog.get_crypto_price(crypto_id)
-                if price_data:
-                    total_assets += price_data["price"] * holding["amount"]
-            
-            net_worth = cash + int(total_assets)
-            net_worths.append((user_id, net_worth, cash, int(total_assets)))
-        
-        # Sort by net worth
-        net_worths.sort(key=lambda x: x[1], reverse=True)
+        net_worths, refreshed_at = await lb_cog.get_board("networth")
         
         if not net_worths:
             await ctx.send("📭 Belum ada yang punya crypto!")
@@ -188,21 +148,21 @@ class TradingAdvanced(commands.Cog):
         )
         
         leaderboard_text = ""
-        for i, (user_id, net_worth, cash, assets) in enumerate(net_worths[:10], 1):
-            user = self.bot.get_user(user_id)
-            username = user.display_name if user else f"User {user_id}"
+        for i, row in enumerate(net_worths, 1):
+            user = self.bot.get_user(row["user_id"])
+            username = user.display_name if user else f"User {row['user_id']}"
             
             medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"`{i}.`"
             
             leaderboard_text += (
                 f"{medal} **{username}**\n"
-                f"├─ Net Worth: `Rp {net_worth:,}`\n"
-                f"├─ Cash: `Rp {cash:,}`\n"
-                f"└─ Crypto: `Rp {assets:,}`\n\n"
+                f"├─ Net Worth: `Rp {row['net_worth']:,}`\n"
+                f"├─ Cash: `Rp {row['cash']:,}`\n"
+                f"└─ Crypto: `Rp {row['assets']:,}`\n\n"
             )
         
         embed.description = leaderboard_text
-        embed.set_footer(text="Trade smart, get rich! 💰")
+        embed.set_footer(text=lb_cog.footer(refreshed_at, "Trade smart, get rich! 💰"))
         await ctx.send(embed=embed)
     
     @commands.command(name="convert")
@@ -268,25 +228,22 @@ class TradingAdvanced(commands.Cog):
         
         await ctx.send(embed=embed)
 
-# Database migration untuk fitur advanced (optional)
-async def create_history_table():
+# Database migration untuk fitur advanced (dijalankan oleh database.run_migrations)
+async def create_history_table(db):
     """Tambahkan tabel trade_history untuk tracking"""
-    import aiosqlite
-    async with aiosqlite.connect("mochi.db") as db:
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS trade_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                trade_type TEXT NOT NULL,
-                crypto_symbol TEXT NOT NULL,
-                amount REAL NOT NULL,
-                price REAL NOT NULL,
-                total REAL NOT NULL,
-                profit_loss REAL,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        await db.commit()
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS trade_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            trade_type TEXT NOT NULL,
+            crypto_symbol TEXT NOT NULL,
+            amount REAL NOT NULL,
+            price REAL NOT NULL,
+            total REAL NOT NULL,
+            profit_loss REAL,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
 
 async def setup(bot):
     await bot.add_cog(TradingAdvanced(bot))
\ No newline at end of file
@@ -16,4 +16,32 @@ DENY_EMOJI = "🚫" # Emote tolak di DM owner
 KUMPUL_COOLDOWN_DAYS = 7 # Jeda antar mochi!kumpul
 KUMPUL_DURATION_DAYS = 7 # Durasi pengumpulan reaksi
 KUMPUL_XP_PER_FIRE = 1 # Base XP per fire reaction (Atur sesuai keinginanmu)
-# ---------------------------
\ No newline at end of file
+KUMPUL_XP_DEBOUNCE_SECONDS = 5 # Reaksi dalam jendela ini digabung jadi 1 grant XP + 1 pesan
+# ---------------------------
+# --- DATABASE ---
+# "strict"  = setiap write langsung commit (default, paling aman)
+# "batched" = write frekuensi tinggi (auto-fish, quest, pajak) dikumpulkan
+#             selama WRITE_BEHIND_WINDOW_MS lalu di-flush dalam 1 transaksi
+DB_DURABILITY_MODE = "strict"
+WRITE_BEHIND_WINDOW_MS = 250
+# Profil pragma SQLite: "default", "throughput", atau "durable"
+STORAGE_PROFILE = "default"
+# Cache row users di memory (get_user)
+USER_CACHE_SIZE = 2048
+USER_CACHE_TTL_SECONDS = 60
+# State fishing semua write-nya write-through, jadi boleh lebih lama dari interval auto-fishing
+FISHING_CACHE_TTL_SECONDS = 300
+# Snapshot leaderboard (top/flb/jlb/networth/taxstats) di-refresh tiap N menit
+LEADERBOARD_REFRESH_MINUTES = 5
+# Auto-fishing: semua sesi diproses 1 ticker tiap N detik (1 transaksi DB per tick)
+AUTOFISH_TICK_SECONDS = 60
+# Output auto-fishing: "tick" = kirim hasil tiap tick (perilaku lama, default),
+# "digest" = opt-in, 1 pesan status per channel yang di-edit tiap
+# AUTOFISH_DIGEST_MINUTES + ringkasan di akhir sesi
+AUTOFISH_OUTPUT_MODE = "tick"
+AUTOFISH_DIGEST_MINUTES = 10
+# Passive income fishing: Fishing Robot dihitung lazy saat user pakai command fishing,
+# Fishing Net dikreditkan saat user keluar voice (tanpa polling per menit)
+FISHING_ROBOT_MIN_CLAIM_MINUTES = 60
+FISHING_ROBOT_MAX_HOURS = 48
+FISHING_NET_MAX_MINUTES = 240
@@ -1,195 +1,1062 @@
 # database.py
+import asyncio
+import time
 import aiosqlite
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 
-async def init_db():
-    """Initialize all database tables"""
-    async with aiosqlite.connect("mochi.db") as db:
-        # Users table
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INTEGER PRIMARY KEY,
-                xp INTEGER DEFAULT 0,
-                level INTEGER DEFAULT 1,
-                currency INTEGER DEFAULT 0,
-                gacha_rolls INTEGER DEFAULT 0,
-                xp_2x INTEGER DEFAULT 0,
-                xp_4x INTEGER DEFAULT 0,
-                xp_8x INTEGER DEFAULT 0,
-                xp_10x INTEGER DEFAULT 0,
-                xp_20x INTEGER DEFAULT 0,
-                next_xp_mult REAL DEFAULT 1.0,
-                luck INTEGER DEFAULT 0,
-                last_weekly_claim TEXT DEFAULT NULL,
-                last_kumpul_time TEXT DEFAULT NULL
-            )
-        """)
+from config import (
+    DB_DURABILITY_MODE, WRITE_BEHIND_WINDOW_MS, STORAGE_PROFILE,
+    USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS, FISHING_CACHE_TTL_SECONDS
+)
+
+DB_PATH = "mochi.db"
+
+# ============================================
+# STORAGE PROFILES
+# ============================================
+
+# Pragma yang dipasang di SETIAP koneksi yang dibuka.
+# WAL: pembaca (kumpul_processor, check_quest_completion) tidak diblok penulis.
+STORAGE_PROFILES = {
+    "default": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,        # ~16 MB (negatif = KiB)
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,        # ms
+        "wal_autocheckpoint": 1000,  # pages
+        "checkpoint_interval": 300,  # detik, PASSIVE checkpoint berkala
+    },
+    "throughput": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 10000,
+        "wal_autocheckpoint": 4000,
+        "checkpoint_interval": 600,
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+        "wal_autocheckpoint": 1000,
+        "checkpoint_interval": 120,
+    },
+}
+
+# Urutan pragma; checkpoint_interval bukan pragma (dipakai pool)
+PRAGMA_KEYS = ["journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store", "busy_timeout", "wal_autocheckpoint"]
+
+async def apply_storage_profile(conn, profile: str = STORAGE_PROFILE):
+    """Pasang pragma dari storage profile ke satu koneksi."""
+    settings = STORAGE_PROFILES[profile]
+    for key in PRAGMA_KEYS:
+        await conn.execute(f"PRAGMA {key} = {settings[key]}")
+
+async def storage_report(conn, profile: str = STORAGE_PROFILE):
+    """Return dict setting efektif (dibaca balik dari SQLite)."""
+    report = {"profile": profile}
+    for key in PRAGMA_KEYS:
+        cursor = await conn.execute(f"PRAGMA {key}")
+        row = await cursor.fetchone()
+        report[key] = row[0] if row else None
+    return report
+
+# ============================================
+# CONNECTION POOL
+# ============================================
+
+class ConnectionPool:
+    """Pool koneksi aiosqlite yang hidup lama (dibuka sekali, dipakai ulang).
+
+    Sebelum start() (misal saat `python database.py`), acquire() membuka
+    koneksi baru per pemanggilan seperti perilaku lama.
+    """
+
+    def __init__(self, path: str = DB_PATH, size: int = 4, acquire_timeout: float = 2.0, profile: str = STORAGE_PROFILE):
+        if profile not in STORAGE_PROFILES:
+            raise ValueError(f"Storage profile tidak dikenal: {profile}")
+        self.path = path
+        self.size = size
+        self.acquire_timeout = acquire_timeout
+        self.profile = profile
+        self.started = False
+        self._idle = None
+        self._connections = []
+        self._checkpoint_task = None
+        self.stats = {"connects": 0, "acquires": 0, "waits": 0, "overflow": 0}
+
+    async def _open(self):
+        conn = await aiosqlite.connect(self.path)
+        await apply_storage_profile(conn, self.profile)
+        self.stats["connects"] += 1
+        return conn
+
+    async def _checkpoint_loop(self):
+        """PASSIVE checkpoint berkala supaya file WAL tidak terus membesar."""
+        interval = STORAGE_PROFILES[self.profile]["checkpoint_interval"]
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with connect() as db:
+                    await db.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            except Exception as e:
+                print(f"⚠️ WAL checkpoint failed: {e}")
+
+    async def start(self):
+        """Buka semua koneksi pool (aman dipanggil berulang kali)."""
+        if self.started:
+            return
+        self._idle = asyncio.Queue()
+        for _ in range(self.size):
+            conn = await self._open()
+            self._connections.append(conn)
+            self._idle.put_nowait(conn)
+        self.started = True
+        self._checkpoint_task = asyncio.create_task(self._checkpoint_loop())
+        print(f"✅ Database pool started ({self.size} connections)")
+
+    async def close(self):
+        """Tutup semua koneksi pool."""
+        if not self.started:
+            return
+        self.started = False
+        if self._checkpoint_task is not None:
+            self._checkpoint_task.cancel()
+            self._checkpoint_task = None
+        # Checkpoint penuh sebelum tutup supaya WAL kosong
+        try:
+            await self._connections[0].execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except Exception as e:
+            print(f"⚠️ WAL checkpoint failed: {e}")
+        for conn in self._connections:
+            await conn.close()
+        self._connections.clear()
+        self._idle = None
+        print("✅ Database pool closed")
+
+    async def acquire(self):
+        self.stats["acquires"] += 1
+        if not self.started:
+            return await self._open()
+
+        try:
+            return self._idle.get_nowait()
+        except asyncio.QueueEmpty:
+            self.stats["waits"] += 1
+
+        try:
+            return await asyncio.wait_for(self._idle.get(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            # Semua koneksi sibuk terlalu lama (misal acquire bersarang):
+            # buka koneksi sementara daripada deadlock.
+            self.stats["overflow"] += 1
+            return await self._open()
+
+    async def release(self, conn):
+        # Jangan wariskan transaksi setengah jalan / row_factory ke pemakai berikutnya
+        if conn.in_transaction:
+            await conn.rollback()
+        conn.row_factory = None
+
+        if self.started and any(conn is c for c in self._connections):
+            self._idle.put_nowait(conn)
+        else:
+            await conn.close()
+
+
+pool = ConnectionPool(DB_PATH)
+
+@asynccontextmanager
+async def connect():
+    """Pinjam koneksi dari pool. Pakai: `async with connect() as db:`"""
+    conn = await pool.acquire()
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
+
+# ============================================
+# CACHE
+# ============================================
+
+class LRUCache:
+    """Cache LRU terbatas dengan TTL per entry dan counter hit/miss."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # {key: (expires_at, value)}
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._data[key]
+            self.stats["misses"] += 1
+            return None
+        self._data.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[1]
+
+    def set(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def peek(self, key):
+        """Ambil entry tanpa hitung hit/miss (untuk write-through in-place)."""
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def invalidate(self, key):
+        if self._data.pop(key, None) is not None:
+            self.stats["invalidations"] += 1
+
+    def clear(self):
+        self.stats["invalidations"] += len(self._data)
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def hit_rate(self):
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+
+user_cache = LRUCache(USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS)
+
+def invalidate_user(user_id: int):
+    """Panggil setelah menulis tabel users dengan raw SQL."""
+    user_cache.invalidate(user_id)
+
+def invalidate_all_users():
+    """Panggil setelah update massal tabel users dengan raw SQL."""
+    user_cache.clear()
+
+# State fishing per user: {"stats": {...}, "upgrades": {tipe: level}, "inventory": {ikan: jumlah}}
+# Semua write fishing (tangkap, jual, upgrade) update entry ini langsung,
+# jadi satu tick mancing cukup baca sekali (atau 0x kalau cache hit).
+fishing_cache = LRUCache(USER_CACHE_SIZE, FISHING_CACHE_TTL_SECONDS)
+
+def copy_fishing_state(state: dict) -> dict:
+    return {
+        "stats": dict(state["stats"]),
+        "upgrades": dict(state["upgrades"]),
+        "inventory": dict(state["inventory"]),
+    }
+
+def cache_fish_catch(user_id: int, catches: list, caught_at):
+    """caught_at None = ikan pasif (robot/net), cooldown mancing tidak berubah."""
+    state = fishing_cache.peek(user_id)
+    if state is None:
+        return
+    inventory = state["inventory"]
+    for fish_name, amount in catches:
+        inventory[fish_name] = inventory.get(fish_name, 0) + amount
+    stats = state["stats"]
+    stats["total_fish_caught"] = stats.get("total_fish_caught", 0) + sum(amount for _, amount in catches)
+    if caught_at is not None:
+        stats["last_fish_time"] = caught_at
+
+def cache_daily_claim(user_id: int, claimed_at):
+    state = fishing_cache.peek(user_id)
+    if state is not None:
+        state["stats"]["last_daily_claim"] = claimed_at
+
+def cache_fish_amount(user_id: int, fish_name: str, amount: int):
+    """Set jumlah 1 ikan di cache; amount <= 0 = hapus dari inventory."""
+    state = fishing_cache.peek(user_id)
+    if state is None:
+        return
+    if amount > 0:
+        state["inventory"][fish_name] = amount
+    else:
+        state["inventory"].pop(fish_name, None)
+
+def cache_clear_fish_inventory(user_id: int):
+    state = fishing_cache.peek(user_id)
+    if state is not None:
+        state["inventory"].clear()
+
+def cache_upgrade_level(user_id: int, upgrade_type: str, level: int):
+    state = fishing_cache.peek(user_id)
+    if state is not None:
+        state["upgrades"][upgrade_type] = level
+
+def invalidate_fishing_state(user_id: int):
+    """Panggil setelah menulis tabel fishing_* dengan raw SQL di luar helper ini."""
+    fishing_cache.invalidate(user_id)
+
+# ============================================
+# WRITE-BEHIND QUEUE
+# ============================================
+
+class WriteBehindQueue:
+    """Kumpulkan write frekuensi tinggi lalu flush dalam satu transaksi.
+
+    Delta per user (currency, xp, ...), tangkapan ikan, progress quest dan
+    log pajak digabung per key selama `window_ms`, lalu ditulis sekaligus.
+    Mode "strict" langsung flush setiap kali ada write (perilaku lama).
+    """
+
+    def __init__(self, mode: str = DB_DURABILITY_MODE, window_ms: int = WRITE_BEHIND_WINDOW_MS):
+        self.mode = mode
+        self.window = window_ms / 1000
+        self._lock = asyncio.Lock()
+        self._flush_task = None
+        self._reset_buffers()
+        # User fishing yang cache-nya di-invalidate karena flush gagal; di-invalidate
+        # lagi setelah retry sukses (cache yang dibaca ulang belum berisi write ini)
+        self._stale_fishing = set()
+        self.stats = {"queued": 0, "flushes": 0, "statements": 0, "failures": 0}
+
+    def _reset_buffers(self):
+        self._user_deltas = {}   # {user_id: {column: delta}}
+        self._fish = {}          # {(user_id, fish_name): amount}
+        self._fish_stats = {}    # {user_id: [total_caught, last_fish_time]}
+        self._daily_claims = {}  # {user_id: last_daily_claim}
+        self._quests = {}        # {(quest_id, user_id): [amount, target]}
+        self._tax_rows = []      # [(user_id, tax_type, amount, collected_at)]
+
+    @property
+    def batched(self):
+        return self.mode == "batched"
+
+    async def _queued(self):
+        self.stats["queued"] += 1
+        if not self.batched:
+            await self.flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.window)
+        self._flush_task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            # Buffer sudah dikembalikan oleh flush(): coba lagi di jendela berikutnya
+            print(f"❌ Write-behind flush failed (retry dalam {self.window:.2f}s): {e}")
+            if self._flush_task is None:
+                self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    def _restore_buffers(self, user_deltas, fish, fish_stats, daily_claims, quests, tax_rows):
+        """Gabungkan snapshot flush yang gagal kembali ke buffer (yang mungkin sudah terisi lagi)."""
+        for user_id, deltas in user_deltas.items():
+            pending = self._user_deltas.setdefault(user_id, {})
+            for column, delta in deltas.items():
+                pending[column] = pending.get(column, 0) + delta
+        for key, amount in fish.items():
+            self._fish[key] = self._fish.get(key, 0) + amount
+        for user_id, (total, last) in fish_stats.items():
+            stats = self._fish_stats.setdefault(user_id, [0, None])
+            stats[0] += total
+            if last is not None and (stats[1] is None or last > stats[1]):
+                stats[1] = last
+        for user_id, claimed_at in daily_claims.items():
+            current = self._daily_claims.get(user_id)
+            if current is None or claimed_at > current:
+                self._daily_claims[user_id] = claimed_at
+        for key, (amount, target) in quests.items():
+            pending = self._quests.setdefault(key, [0, target])
+            pending[0] += amount
+        self._tax_rows[:0] = tax_rows
+
+    async def add_user_delta(self, user_id: int, **deltas):
+        """Tambah delta kolom increment user (xp, currency, luck, ...)."""
+        pending = self._user_deltas.setdefault(user_id, {})
+        for column, delta in deltas.items():
+            if column not in USER_INCREMENT_FIELDS:
+                raise ValueError(f"{column} bukan field increment")
+            pending[column] = pending.get(column, 0) + delta
+        await self._queued()
 
-        # Jade Gacha Stats table
+    async def add_fish_catch(self, user_id: int, catches: list):
+        """catches: [(fish_name, amount), ...] dari satu kali mancing."""
+        for fish_name, amount in catches:
+            key = (user_id, fish_name)
+            self._fish[key] = self._fish.get(key, 0) + amount
+        stats = self._fish_stats.setdefault(user_id, [0, None])
+        stats[0] += sum(amount for _, amount in catches)
+        stats[1] = datetime.utcnow()
+        # Cache langsung mencerminkan tangkapan walau flush masih tertunda
+        cache_fish_catch(user_id, catches, stats[1])
+        await self._queued()
+
+    async def add_passive_fish(self, user_id: int, catches: list, claimed_at=None):
+        """Ikan dari Fishing Robot / Fishing Net: masuk inventory & total, tanpa reset cooldown.
+
+        claimed_at diisi untuk klaim robot (disimpan ke fishing_stats.last_daily_claim).
+        Row fishing_stats user harus sudah ada (lihat get_fishing_state).
+        """
+        if catches:
+            for fish_name, amount in catches:
+                key = (user_id, fish_name)
+                self._fish[key] = self._fish.get(key, 0) + amount
+            stats = self._fish_stats.setdefault(user_id, [0, None])
+            stats[0] += sum(amount for _, amount in catches)
+            cache_fish_catch(user_id, catches, None)
+        if claimed_at is not None:
+            self._daily_claims[user_id] = claimed_at
+            cache_daily_claim(user_id, claimed_at)
+        await self._queued()
+
+    async def add_quest_progress(self, quest_id: str, user_id: int, amount: int, target: int):
+        key = (quest_id, user_id)
+        pending = self._quests.setdefault(key, [0, target])
+        pending[0] += amount
+        await self._queued()
+
+    async def add_tax_log(self, user_id: int, tax_type: str, amount: int):
+        self._tax_rows.append((user_id, tax_type, amount, datetime.utcnow()))
+        await self._queued()
+
+    async def flush(self):
+        """Tulis semua yang tertunda dalam satu transaksi."""
+        async with self._lock:
+            user_deltas, fish, fish_stats = self._user_deltas, self._fish, self._fish_stats
+            daily_claims, quests, tax_rows = self._daily_claims, self._quests, self._tax_rows
+            self._reset_buffers()
+            if not (user_deltas or fish or fish_stats or daily_claims or quests or tax_rows):
+                return
+
+            now = datetime.utcnow().isoformat()
+            statements = 0
+            try:
+                statements = await self._write(user_deltas, fish, fish_stats, daily_claims, quests, tax_rows, now)
+            except Exception:
+                # Jangan buang write yang sudah digabung: kembalikan ke buffer,
+                # cache yang sudah mencerminkannya dibuang, error diteruskan ke caller
+                self._restore_buffers(user_deltas, fish, fish_stats, daily_claims, quests, tax_rows)
+                fishing_users = {user_id for user_id, _ in fish} | set(fish_stats) | set(daily_claims)
+                for user_id in fishing_users:
+                    invalidate_fishing_state(user_id)
+                for user_id in user_deltas:
+                    invalidate_user(user_id)
+                self._stale_fishing |= fishing_users
+                self.stats["failures"] += 1
+                raise
+
+            for user_id in user_deltas:
+                invalidate_user(user_id)
+            if self._stale_fishing:
+                flushed = {user_id for user_id, _ in fish} | set(fish_stats) | set(daily_claims)
+                for user_id in self._stale_fishing & flushed:
+                    invalidate_fishing_state(user_id)
+                self._stale_fishing -= flushed
+
+            self.stats["flushes"] += 1
+            self.stats["statements"] += statements
+
+    async def _write(self, user_deltas, fish, fish_stats, daily_claims, quests, tax_rows, now):
+        """Tulis snapshot buffer dalam 1 transaksi, return jumlah statement."""
+        statements = 0
+        async with connect() as db:
+            # Kelompokkan user berdasarkan set kolom supaya bisa executemany
+            grouped = {}
+            for user_id, deltas in user_deltas.items():
+                columns = tuple(sorted(deltas))
+                grouped.setdefault(columns, []).append(
+                    (user_id, *[deltas[c] for c in columns])
+                )
+            for columns, rows in grouped.items():
+                await db.executemany(f"""
+                    INSERT INTO users (user_id, {", ".join(columns)})
+                    VALUES ({", ".join(["?"] * (len(columns) + 1))})
+                    ON CONFLICT(user_id) DO UPDATE SET
+                    {", ".join(f"{c} = {c} + excluded.{c}" for c in columns)}
+                """, rows)
+                statements += 1
+
+            if fish_stats:
+                await db.executemany("""
+                    UPDATE fishing_stats
+                    SET total_fish_caught = total_fish_caught + ?,
+                        last_fish_time = COALESCE(?, last_fish_time)
+                    WHERE user_id = ?
+                """, [(total, last, user_id) for user_id, (total, last) in fish_stats.items()])
+                statements += 1
+
+            if daily_claims:
+                await db.executemany(
+                    "UPDATE fishing_stats SET last_daily_claim = ? WHERE user_id = ?",
+                    [(claimed_at, user_id) for user_id, claimed_at in daily_claims.items()]
+                )
+                statements += 1
+
+            if fish:
+                await db.executemany("""
+                    INSERT INTO fishing_inventory (user_id, fish_name, amount)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(user_id, fish_name) DO UPDATE SET amount = amount + excluded.amount
+                """, [(user_id, name, amount) for (user_id, name), amount in fish.items()])
+                statements += 1
+
+            if quests:
+                await db.executemany("""
+                    INSERT INTO quest_progress (quest_id, user_id, current_progress, last_updated)
+                    VALUES (?1, ?2, MIN(?3, ?4), ?5)
+                    ON CONFLICT(quest_id, user_id) DO UPDATE SET
+                        current_progress = MIN(current_progress + excluded.current_progress, ?4),
+                        last_updated = excluded.last_updated
+                """, [(quest_id, user_id, amount, target, now)
+                      for (quest_id, user_id), (amount, target) in quests.items()])
+                statements += 1
+
+            if tax_rows:
+                await db.executemany("""
+                    INSERT INTO tax_history (user_id, tax_type, amount, collected_at)
+                    VALUES (?, ?, ?, ?)
+                """, tax_rows)
+                statements += 1
+
+            await db.commit()
+        return statements
+
+    async def close(self):
+        """Flush terakhir saat shutdown."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+
+
+write_behind = WriteBehindQueue()
+
+async def open_db():
+    """Start connection pool (dipanggil saat bot start) dan print setting efektif."""
+    await pool.start()
+    async with connect() as db:
+        report = await storage_report(db, pool.profile)
+    print(f"🗄️  Storage profile: {report.pop('profile')}")
+    for key, value in report.items():
+        print(f"   • {key:20} = {value}")
+
+async def close_db():
+    """Flush write-behind lalu tutup connection pool (dipanggil saat bot shutdown)."""
+    try:
+        await write_behind.close()
+        if write_behind.stats["flushes"]:
+            print(f"✅ Write-behind flushed ({write_behind.stats['queued']} writes, {write_behind.stats['flushes']} flushes)")
+    finally:
+        await pool.close()
+
+# ============================================
+# SCHEMA MIGRATIONS
+# ============================================
+
+async def create_core_tables(db):
+    """Migration v1: tabel inti (users, jade, fishing, crypto, kumpul, tax)"""
+    # Users table
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY,
+            xp INTEGER DEFAULT 0,
+            level INTEGER DEFAULT 1,
+            currency INTEGER DEFAULT 0,
+            gacha_rolls INTEGER DEFAULT 0,
+            xp_2x INTEGER DEFAULT 0,
+            xp_4x INTEGER DEFAULT 0,
+            xp_8x INTEGER DEFAULT 0,
+            xp_10x INTEGER DEFAULT 0,
+            xp_20x INTEGER DEFAULT 0,
+            next_xp_mult REAL DEFAULT 1.0,
+            luck INTEGER DEFAULT 0,
+            last_weekly_claim TEXT DEFAULT NULL,
+            last_kumpul_time TEXT DEFAULT NULL
+        )
+    """)
+
+    # Jade Gacha Stats table
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS jade_stats (
+            user_id INTEGER PRIMARY KEY,
+            total_spent INTEGER DEFAULT 0,
+            total_won INTEGER DEFAULT 0,
+            total_cuts INTEGER DEFAULT 0,
+            total_wins INTEGER DEFAULT 0,
+            total_losses INTEGER DEFAULT 0,
+            total_jackpots INTEGER DEFAULT 0,
+            last_cut_time TEXT
+        )
+    """)
+    
+    # Fishing Stats table
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS fishing_stats (
+            user_id INTEGER PRIMARY KEY,
+            total_fish_caught INTEGER DEFAULT 0,
+            last_fish_time TIMESTAMP,
+            last_daily_claim TIMESTAMP
+        )
+    """)
+    
+    # Fishing Inventory table
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS fishing_inventory (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            fish_name TEXT NOT NULL,
+            amount INTEGER DEFAULT 0,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(user_id, fish_name)
+        )
+    """)
+    
+    # Fishing Upgrades table
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS fishing_upgrades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            upgrade_type TEXT NOT NULL,
+            level INTEGER DEFAULT 0,
+            purchased_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(user_id, upgrade_type)
+        )
+    """)
+    
+    # Crypto Portfolio table
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS crypto_portfolio (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            crypto_symbol TEXT NOT NULL,
+            amount REAL NOT NULL,
+            avg_buy_price REAL NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(user_id, crypto_symbol)
+        )
+    """)
+
+    # Kumpul Tracking table (BARU)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS kumpul_tracking (
+            message_id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            start_time TEXT NOT NULL,
+            end_time TEXT NOT NULL,
+            max_reactions INTEGER DEFAULT 0, -- Reaksi tertinggi yang pernah tercatat
+            status TEXT DEFAULT 'active',
+            last_xp_check_time TEXT DEFAULT NULL
+        )
+    """)
+
+    # ====== TABEL TAX HISTORY BARU ======
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS tax_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            tax_type TEXT NOT NULL,
+            amount INTEGER NOT NULL,
+            collected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Create indexes for better performance
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_fishing_inventory_user 
+        ON fishing_inventory(user_id)
+    """)
+    
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_fishing_upgrades_user 
+        ON fishing_upgrades(user_id)
+    """)
+    
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_user_crypto 
+        ON crypto_portfolio(user_id, crypto_symbol)
+    """)
+
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS tax_system_stats (
+            id INTEGER PRIMARY KEY DEFAULT 1,
+            last_forced_tax TEXT DEFAULT NULL
+        )
+    """)
+    
+    # Memastikan selalu ada satu row untuk diupdate
+    await db.execute("INSERT OR IGNORE INTO tax_system_stats (id) VALUES (1)")
+
+async def add_jade_stats_columns(db):
+    """Migration v2: kolom baru jade_stats untuk database lama"""
+    cursor = await db.execute("PRAGMA table_info(jade_stats)")
+    column_names = [col[1] for col in await cursor.fetchall()]
+    
+    for column in ["total_wins", "total_losses", "total_jackpots"]:
+        if column not in column_names:
+            await db.execute(f"ALTER TABLE jade_stats ADD COLUMN {column} INTEGER DEFAULT 0")
+
+async def add_kumpul_fire_count(db):
+    """Migration v7: counter reaksi 🔥 per pesan kumpul (NULL = belum di-seed)"""
+    cursor = await db.execute("PRAGMA table_info(kumpul_tracking)")
+    if "fire_count" not in [col[1] for col in await cursor.fetchall()]:
+        await db.execute("ALTER TABLE kumpul_tracking ADD COLUMN fire_count INTEGER DEFAULT NULL")
+
+async def add_kumpul_user_index(db):
+    """Migration v8: index cek sesi kumpul aktif per user"""
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_kumpul_user_status 
+        ON kumpul_tracking(user_id, status)
+    """)
+
+async def add_hot_query_indexes(db):
+    """Migration v10: index untuk query leaderboard, history, dan poll quest"""
+    # Kolom generated (VIRTUAL, tidak makan storage) supaya sort jlb bisa pakai index
+    cursor = await db.execute("PRAGMA table_xinfo(jade_stats)")
+    column_names = [col[1] for col in await cursor.fetchall()]
+    if "profit" not in column_names:
         await db.execute("""
-            CREATE TABLE IF NOT EXISTS jade_stats (
-                user_id INTEGER PRIMARY KEY,
-                total_spent INTEGER DEFAULT 0,
-                total_won INTEGER DEFAULT 0,
-                total_cuts INTEGER DEFAULT 0,
-                total_wins INTEGER DEFAULT 0,
-                total_losses INTEGER DEFAULT 0,
-                total_jackpots INTEGER DEFAULT 0,
-                last_cut_time TEXT
-            )
+            ALTER TABLE jade_stats ADD COLUMN profit INTEGER
+            GENERATED ALWAYS AS (total_won - total_spent) VIRTUAL
         """)
-        
-        # Fishing Stats table
+    if "win_rate" not in column_names:
         await db.execute("""
-            CREATE TABLE IF NOT EXISTS fishing_stats (
-                user_id INTEGER PRIMARY KEY,
-                total_fish_caught INTEGER DEFAULT 0,
-                last_fish_time TIMESTAMP,
-                last_daily_claim TIMESTAMP
-            )
+            ALTER TABLE jade_stats ADD COLUMN win_rate REAL
+            GENERATED ALWAYS AS (
+                CASE WHEN total_cuts > 0 THEN CAST(total_wins AS REAL) / total_cuts * 100 ELSE 0 END
+            ) VIRTUAL
         """)
+
+    indexes = [
+        "idx_users_level_currency ON users(level DESC, currency DESC)",
+        "idx_jade_profit ON jade_stats(profit DESC)",
+        "idx_jade_cuts ON jade_stats(total_cuts DESC)",
+        "idx_jade_win_rate ON jade_stats(win_rate DESC) WHERE total_cuts > 0",
+        # Covering untuk mochi!taxh dan SUM per user di snapshot taxstats
+        "idx_tax_history_user_time ON tax_history(user_id, collected_at, tax_type, amount)",
+        "idx_trade_history_user_time ON trade_history(user_id, timestamp)",
+        # Poll completion quest tiap 10 detik
+        "idx_quest_progress_completion ON quest_progress(quest_id, completed, current_progress)",
+    ]
+    for index in indexes:
+        await db.execute(f"CREATE INDEX IF NOT EXISTS {index}")
+
+async def add_fishing_rank_index(db):
+    """Migration v11: index COUNT peringkat fishing (mochi!myrank)"""
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_fishing_stats_caught 
+        ON fishing_stats(total_fish_caught DESC)
+    """)
+
+async def create_autofish_sessions(db):
+    """Migration v12: sesi auto-fishing (supaya lanjut lagi setelah restart)"""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS autofish_sessions (
+            user_id INTEGER PRIMARY KEY,
+            channel_id INTEGER NOT NULL,
+            guild_id INTEGER NOT NULL,
+            duration_hours INTEGER NOT NULL,
+            started_at TEXT NOT NULL,
+            end_time TEXT NOT NULL
+        )
+    """)
+
+async def add_autofish_catch_summary(db):
+    """Migration v13: akumulasi tangkapan per sesi auto-fishing (mode digest)"""
+    cursor = await db.execute("PRAGMA table_info(autofish_sessions)")
+    if "catch_summary" not in [col[1] for col in await cursor.fetchall()]:
+        await db.execute("ALTER TABLE autofish_sessions ADD COLUMN catch_summary TEXT DEFAULT NULL")
+
+async def add_kumpul_status_index(db):
+    """Migration v14: index load sesi kumpul aktif (tabel menyimpan semua sesi lama)"""
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_kumpul_status 
+        ON kumpul_tracking(status)
+    """)
+
+# Urutan migrasi TIDAK BOLEH diubah; tambahkan step baru di akhir.
+# Step berupa fungsi `async def step(db)` atau path "modul.fungsi" (untuk cog).
+# Setiap step harus idempotent supaya aman untuk database lama tanpa schema_version.
+MIGRATIONS = [
+    (1, "core_tables", create_core_tables),
+    (2, "jade_stats_columns", add_jade_stats_columns),
+    (3, "achievement_tables", "cogs.achievements.init_achievement_tables"),
+    (4, "quest_tables", "cogs.quests.init_quest_tables"),
+    (5, "shop_tables", "cogs.shop.init_shop_tables"),
+    (6, "trade_history", "cogs.trading_advanced.create_history_table"),
+    (7, "kumpul_fire_count", add_kumpul_fire_count),
+    (8, "kumpul_user_index", add_kumpul_user_index),
+    (9, "leaderboard_snapshots", "cogs.leaderboards.init_leaderboard_tables"),
+    (10, "hot_query_indexes", add_hot_query_indexes),
+    (11, "fishing_rank_index", add_fishing_rank_index),
+    (12, "autofish_sessions", create_autofish_sessions),
+    (13, "autofish_catch_summary", add_autofish_catch_summary),
+    (14, "kumpul_status_index", add_kumpul_status_index),
+]
+
+def _resolve_step(step):
+    if callable(step):
+        return step
+    import importlib
+    module_name, func_name = step.rsplit(".", 1)
+    return getattr(importlib.import_module(module_name), func_name)
+
+async def get_schema_version(db):
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    """)
+    cursor = await db.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return (await cursor.fetchone())[0]
+
+async def run_migrations():
+    """Jalankan migrasi yang belum diterapkan, masing-masing dalam satu transaksi."""
+    async with connect() as db:
+        current = await get_schema_version(db)
+        pending = [m for m in MIGRATIONS if m[0] > current]
         
-        # Fishing Inventory table
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS fishing_inventory (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                fish_name TEXT NOT NULL,
-                amount INTEGER DEFAULT 0,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(user_id, fish_name)
-            )
-        """)
+        if not pending:
+            print(f"✅ Database schema up to date (v{current})")
+            return current
         
-        # Fishing Upgrades table
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS fishing_upgrades (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                upgrade_type TEXT NOT NULL,
-                level INTEGER DEFAULT 0,
-                purchased_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(user_id, upgrade_type)
-            )
-        """)
+        for version, name, step in pending:
+            try:
+                await db.execute("BEGIN")
+                await _resolve_step(step)(db)
+                await db.execute(
+                    "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                    (version, name, datetime.utcnow().isoformat())
+                )
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                print(f"❌ Migration v{version} ({name}) failed: {e}")
+                raise
+            print(f"✅ Migration v{version}: {name}")
+            current = version
         
-        # Crypto Portfolio table
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS crypto_portfolio (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                crypto_symbol TEXT NOT NULL,
-                amount REAL NOT NULL,
-                avg_buy_price REAL NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(user_id, crypto_symbol)
-            )
-        """)
+        return current
 
-        # Kumpul Tracking table (BARU)
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS kumpul_tracking (
-                message_id INTEGER PRIMARY KEY,
-                user_id INTEGER NOT NULL,
-                channel_id INTEGER NOT NULL,
-                start_time TEXT NOT NULL,
-                end_time TEXT NOT NULL,
-                max_reactions INTEGER DEFAULT 0, -- Reaksi tertinggi yang pernah tercatat
-                status TEXT DEFAULT 'active',
-                last_xp_check_time TEXT DEFAULT NULL
-            )
-        """)
+async def init_db():
+    """Initialize all database tables (alias run_migrations)"""
+    await run_migrations()
 
-        # ====== TABEL TAX HISTORY BARU ======
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS tax_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                tax_type TEXT NOT NULL,
-                amount INTEGER NOT NULL,
-                collected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Create indexes for better performance
-        await db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_fishing_inventory_user 
-            ON fishing_inventory(user_id)
-        """)
+async def get_user(user_id: int):
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return dict(cached)
+    
+    async with connect() as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
+        row = await cursor.fetchone()
+    
+    if not row:
+        return None
+    user_data = dict(row)
+    user_cache.set(user_id, user_data)
+    return dict(user_data)
+
+async def get_fishing_state(user_id: int):
+    """Stats + upgrades + inventory fishing user (cached, return copy).
+
+    Row fishing_stats dibuat kalau belum ada.
+    """
+    cached = fishing_cache.get(user_id)
+    if cached is not None:
+        return copy_fishing_state(cached)
+    
+    async with connect() as db:
+        db.row_factory = aiosqlite.Row
         
-        await db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_fishing_upgrades_user 
-            ON fishing_upgrades(user_id)
-        """)
+        cursor = await db.execute("""
+            SELECT * FROM fishing_stats WHERE user_id = ?
+        """, (user_id,))
+        stats = await cursor.fetchone()
         
-        await db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_user_crypto 
-            ON crypto_portfolio(user_id, crypto_symbol)
-        """)
-
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS tax_system_stats (
-                id INTEGER PRIMARY KEY DEFAULT 1,
-                last_forced_tax TEXT DEFAULT NULL
-            )
-        """)
+        if not stats:
+            now = datetime.utcnow()
+            await db.execute("""
+                INSERT INTO fishing_stats (user_id, total_fish_caught, last_fish_time)
+                VALUES (?, 0, ?)
+            """, (user_id, now))
+            await db.commit()
+            stats = {"total_fish_caught": 0, "last_fish_time": now}
         
-        # Memastikan selalu ada satu row untuk diupdate
-        await db.execute("INSERT OR IGNORE INTO tax_system_stats (id) VALUES (1)")
+        cursor = await db.execute("""
+            SELECT upgrade_type, level FROM fishing_upgrades WHERE user_id = ?
+        """, (user_id,))
+        upgrades = {row["upgrade_type"]: row["level"] for row in await cursor.fetchall()}
         
+        cursor = await db.execute("""
+            SELECT fish_name, amount FROM fishing_inventory WHERE user_id = ?
+        """, (user_id,))
+        inventory = {row["fish_name"]: row["amount"] for row in await cursor.fetchall()}
+    
+    state = {"stats": dict(stats), "upgrades": upgrades, "inventory": inventory}
+    fishing_cache.set(user_id, state)
+    return copy_fishing_state(state)
+
+# Batas aman jumlah parameter per query (SQLITE_MAX_VARIABLE_NUMBER lama = 999)
+BULK_CHUNK_SIZE = 500
+
+async def save_fish_catches(catches: dict, caught_at=None):
+    """Tulis tangkapan banyak user dalam 1 transaksi: {user_id: [(fish_name, amount), ...]}.
+
+    Untuk job massal (ticker auto-fishing, Fishing Net) supaya tidak lewat
+    write_behind global. caught_at None = ikan pasif (last_fish_time tetap).
+    Row fishing_stats user harus sudah ada (lihat get_fishing_state).
+    """
+    inventory = {}
+    totals = {}
+    for user_id, fish_list in catches.items():
+        for fish_name, amount in fish_list:
+            key = (user_id, fish_name)
+            inventory[key] = inventory.get(key, 0) + amount
+            totals[user_id] = totals.get(user_id, 0) + amount
+    if not inventory:
+        return
+    
+    async with connect() as db:
+        await db.executemany("""
+            INSERT INTO fishing_inventory (user_id, fish_name, amount)
+            VALUES (?, ?, ?)
+            ON CONFLICT(user_id, fish_name) DO UPDATE SET amount = amount + excluded.amount
+        """, [(user_id, name, amount) for (user_id, name), amount in inventory.items()])
+        await db.executemany("""
+            UPDATE fishing_stats
+            SET total_fish_caught = total_fish_caught + ?,
+                last_fish_time = COALESCE(?, last_fish_time)
+            WHERE user_id = ?
+        """, [(total, caught_at, user_id) for user_id, total in totals.items()])
         await db.commit()
-        print("✅ All database tables created/verified!")
+    
+    for user_id, fish_list in catches.items():
+        cache_fish_catch(user_id, fish_list, caught_at)
 
-async def migrate_jade_stats():
-    """Migrate jade_stats table to add new columns if they don't exist"""
-    async with aiosqlite.connect("mochi.db") as db:
-        try:
-            # Check existing columns
-            cursor = await db.execute("PRAGMA table_info(jade_stats)")
-            columns = await cursor.fetchall()
-            column_names = [col[1] for col in columns]
-            
-            print(f"📊 Checking jade_stats columns: {column_names}")
-            
-            # Add missing columns
-            columns_added = []
-            
-            if 'total_wins' not in column_names:
-                await db.execute("ALTER TABLE jade_stats ADD COLUMN total_wins INTEGER DEFAULT 0")
-                columns_added.append("total_wins")
-            
-            if 'total_losses' not in column_names:
-                await db.execute("ALTER TABLE jade_stats ADD COLUMN total_losses INTEGER DEFAULT 0")
-                columns_added.append("total_losses")
-            
-            if 'total_jackpots' not in column_names:
-                await db.execute("ALTER TABLE jade_stats ADD COLUMN total_jackpots INTEGER DEFAULT 0")
-                columns_added.append("total_jackpots")
-            
-            await db.commit()
-            
-            if columns_added:
-                print(f"✅ Added jade_stats columns: {', '.join(columns_added)}")
-            else:
-                print("✅ Jade stats table already up to date!")
-            
-        except Exception as e:
-            print(f"❌ Migration error: {e}")
+async def get_upgrade_levels(user_ids, upgrade_type: str):
+    """Level 1 upgrade fishing untuk banyak user -> {user_id: level} (yang level 0 dilewati).
 
-async def get_user(user_id: int):
-    async with aiosqlite.connect("mochi.db") as db:
+    Pakai fishing_cache dulu, tidak membuat row fishing_stats baru.
+    """
+    result = {}
+    missing = []
+    for user_id in dict.fromkeys(user_ids):
+        cached = fishing_cache.peek(user_id)
+        if cached is None:
+            missing.append(user_id)
+        elif cached["upgrades"].get(upgrade_type, 0) > 0:
+            result[user_id] = cached["upgrades"][upgrade_type]
+    
+    if not missing:
+        return result
+    
+    async with connect() as db:
+        for i in range(0, len(missing), BULK_CHUNK_SIZE):
+            chunk = missing[i:i + BULK_CHUNK_SIZE]
+            cursor = await db.execute(
+                f"""
+                SELECT user_id, level FROM fishing_upgrades
+                WHERE upgrade_type = ? AND level > 0 AND user_id IN ({', '.join(['?'] * len(chunk))})
+                """,
+                (upgrade_type, *chunk)
+            )
+            for user_id, level in await cursor.fetchall():
+                result[user_id] = level
+    
+    return result
+
+async def get_users_bulk(user_ids):
+    """Ambil banyak user sekaligus -> {user_id: dict}. User yang tidak ada dilewati.
+
+    Pakai user_cache dulu, sisanya diambil dengan query `IN (...)` per chunk.
+    """
+    result = {}
+    missing = []
+    for user_id in dict.fromkeys(user_ids):
+        cached = user_cache.get(user_id)
+        if cached is not None:
+            result[user_id] = dict(cached)
+        else:
+            missing.append(user_id)
+    
+    if not missing:
+        return result
+    
+    async with connect() as db:
         db.row_factory = aiosqlite.Row
-        cursor = await db.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
-        row = await cursor.fetchone()
-        return dict(row) if row else None
+        for i in range(0, len(missing), BULK_CHUNK_SIZE):
+            chunk = missing[i:i + BULK_CHUNK_SIZE]
+            cursor = await db.execute(
+                f"SELECT * FROM users WHERE user_id IN ({', '.join(['?'] * len(chunk))})",
+                chunk
+            )
+            for row in await cursor.fetchall():
+                user_data = dict(row)
+                user_cache.set(user_data["user_id"], user_data)
+                result[user_data["user_id"]] = dict(user_data)
+    
+    return result
+
+async def iter_users(columns=None, where: str = None, params=(), batch_size: int = BULK_CHUNK_SIZE):
+    """Stream tabel users per batch (list of dict) dengan keyset pagination.
+
+    Contoh:
+    async for batch in iter_users(["user_id", "currency"], where="currency > 0"):
+        ...
+    Satu koneksi per batch, tidak menahan koneksi selama caller memproses.
+    """
+    columns = list(columns) if columns else ["*"]
+    if columns != ["*"] and "user_id" not in columns:
+        columns.insert(0, "user_id")
+    
+    condition = f"AND ({where})" if where else ""
+    query = f"""
+        SELECT {", ".join(columns)} FROM users
+        WHERE user_id > ? {condition}
+        ORDER BY user_id
+        LIMIT ?
+    """
+    # Discord ID selalu positif, jadi -1 = mulai dari awal
+    last_id = -1
+    while True:
+        async with connect() as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute(query, (last_id, *params, batch_size))
+            batch = [dict(row) for row in await cursor.fetchall()]
+        
+        if not batch:
+            return
+        yield batch
+        if len(batch) < batch_size:
+            return
+        last_id = batch[-1]["user_id"]
 
 async def create_user(user_id: int):
-    async with aiosqlite.connect("mochi.db") as db:
+    async with connect() as db:
         await db.execute(
             "INSERT INTO users (user_id) VALUES (?)",
             (user_id,)
         )
         await db.commit()
+    invalidate_user(user_id)
+
+# Field yang di-SET (replace, tidak ditambah)
+USER_SET_FIELDS = ["level", "next_xp_mult", "last_weekly_claim"]
+
+# Field yang di-INCREMENT (tambah dengan nilai lama)
+USER_INCREMENT_FIELDS = ["xp", "currency", "luck", "gacha_rolls", "xp_2x", "xp_4x", "xp_8x", "xp_10x", "xp_20x"]
 
 async def update_user(user_id: int, **kwargs):
     """
@@ -204,6 +1071,12 @@ async def update_user(user_id: int, **kwargs):
     DECREMENT (Kurangi dari nilai lama - untuk inventory yang dipakai):
     - Ditandai dengan key yang diawali "set_" (misal: set_gacha_rolls, set_xp_2x)
     
+    Semua dijalankan dalam SATU statement upsert atomik
+    (INSERT ... ON CONFLICT DO UPDATE ... RETURNING), jadi increment
+    yang bersamaan tidak saling menimpa dan user baru dibuat otomatis.
+    Return: dict row user SETELAH update (atau None jika kwargs kosong).
+    Row ini juga langsung disimpan ke user_cache (write-through).
+    
     Contoh:
     await update_user(user_id, xp=100)  -> xp += 100
     await update_user(user_id, level=5)  -> level = 5
@@ -211,54 +1084,53 @@ async def update_user(user_id: int, **kwargs):
     await update_user(user_id, set_gacha_rolls=3)  -> gacha_rolls = 3 (force set)
     """
     if not kwargs:
-        return
-    
-    # Ambil data lama
-    user_data = await get_user(user_id)
-    if not user_data:
-        await create_user(user_id)
-        user_data = await get_user(user_id)
-    
-    # Field yang di-SET (replace, tidak ditambah)
-    set_fields = ["level", "next_xp_mult", "last_weekly_claim"]
-    
-    # Field yang di-INCREMENT (tambah dengan nilai lama)
-    increment_fields = ["xp", "currency", "luck", "gacha_rolls", "xp_2x", "xp_4x", "xp_8x", "xp_10x", "xp_20x"]
-    
-    # Process kwargs untuk handle set_ prefix
-    processed_kwargs = {}
-    values = []
+        return None
     
+    # Process kwargs untuk handle set_ prefix -> {kolom: (value, increment?)}
+    fields = {}
     for key, value in kwargs.items():
-        # Handle force set dengan prefix "set_"
         if key.startswith("set_"):
-            actual_key = key[4:]  # Remove "set_" prefix
-            processed_kwargs[actual_key] = value
-            values.append(value)
-        elif key in set_fields:
-            processed_kwargs[key] = value
-            values.append(value)
-        elif key in increment_fields:
-            processed_kwargs[key] = value
-            values.append(user_data[key] + value)
+            # Handle force set dengan prefix "set_"
+            fields[key[4:]] = (value, False)
+        elif key in USER_INCREMENT_FIELDS:
+            fields[key] = (value, True)
         else:
-            # Default: SET
-            processed_kwargs[key] = value
-            values.append(value)
+            # SET field atau default: SET
+            fields[key] = (value, False)
     
-    # Build query
-    set_clause = ", ".join([f"{key} = ?" for key in processed_kwargs.keys()])
-    values.append(user_id)
+    # Build query: kolom increment default-nya 0, jadi nilai insert = delta
+    columns = ", ".join(["user_id"] + list(fields.keys()))
+    placeholders = ", ".join(["?"] * (len(fields) + 1))
+    update_clause = ", ".join(
+        f"{key} = {key} + excluded.{key}" if increment else f"{key} = excluded.{key}"
+        for key, (_, increment) in fields.items()
+    )
+    values = [user_id] + [value for value, _ in fields.values()]
     
-    async with aiosqlite.connect("mochi.db") as db:
-        await db.execute(
-            f"UPDATE users SET {set_clause} WHERE user_id = ?",
+    async with connect() as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute(
+            f"""
+            INSERT INTO users ({columns}) VALUES ({placeholders})
+            ON CONFLICT(user_id) DO UPDATE SET {update_clause}
+            RETURNING *
+            """,
             values
         )
+        row = await cursor.fetchone()
+        await cursor.close()
         await db.commit()
+    
+    if not row:
+        return None
+    # Write-through: row hasil RETURNING langsung masuk cache
+    user_data = dict(row)
+    user_cache.set(user_id, user_data)
+    return dict(user_data)
+
 async def get_kumpul_tracking(message_id: int):
     """Ambil data tracking kumpul berdasarkan ID pesan."""
-    async with aiosqlite.connect("mochi.db") as db:
+    async with connect() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute("SELECT * FROM kumpul_tracking WHERE message_id = ?", (message_id,))
         return await cursor.fetchone()
@@ -277,32 +1149,72 @@ async def update_kumpul_tracking(message_id: int, **kwargs):
     query = f"UPDATE kumpul_tracking SET {', '.join(updates)} WHERE message_id = ?"
     values.append(message_id)
     
-    async with aiosqlite.connect("mochi.db") as db:
+    async with connect() as db:
         await db.execute(query, tuple(values))
         await db.commit()
 
 # PERBAIKAN: Tambahkan last_xp_check_time ke parameter
 # database.py
-async def insert_kumpul_tracking(message_id: int, user_id: int, channel_id: int, start_time: str, end_time: str, max_reactions: int, last_xp_check_time: str):
+async def insert_kumpul_tracking(message_id: int, user_id: int, channel_id: int, start_time: str, end_time: str, max_reactions: int, last_xp_check_time: str, fire_count: int = 0):
     """Masukkan pesan kumpul baru."""
-    async with aiosqlite.connect("mochi.db") as db:
+    async with connect() as db:
         await db.execute("""
             INSERT INTO kumpul_tracking 
-            (message_id, user_id, channel_id, start_time, end_time, max_reactions, last_xp_check_time) 
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (message_id, user_id, channel_id, start_time, end_time, max_reactions, last_xp_check_time))
+            (message_id, user_id, channel_id, start_time, end_time, max_reactions, last_xp_check_time, fire_count) 
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (message_id, user_id, channel_id, start_time, end_time, max_reactions, last_xp_check_time, fire_count))
         await db.commit()
         
 async def get_active_kumpul_messages():
     """Ambil semua pesan kumpul yang masih aktif."""
-    async with aiosqlite.connect("mochi.db") as db:
+    async with connect() as db:
         db.row_factory = aiosqlite.Row
-        cursor = await db.execute("SELECT * FROM kumpul_tracking WHERE status = 'active' OR status = 'calculating'")
+        cursor = await db.execute(KUMPUL_ACTIVE_QUERY)
         return await cursor.fetchall()
     
+async def get_active_kumpul_for_user(user_id: int):
+    """Ambil sesi kumpul aktif milik user (pakai idx_kumpul_user_status)."""
+    async with connect() as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute(KUMPUL_ACTIVE_FOR_USER_QUERY, (user_id,))
+        return await cursor.fetchone()
+    
+async def get_autofish_sessions():
+    """Ambil semua sesi auto-fishing yang tersimpan."""
+    async with connect() as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute("SELECT * FROM autofish_sessions")
+        return await cursor.fetchall()
+
+async def insert_autofish_session(user_id: int, channel_id: int, guild_id: int, duration_hours: int, started_at: str, end_time: str):
+    """Simpan sesi auto-fishing baru (replace sesi lama user ini)."""
+    async with connect() as db:
+        await db.execute("""
+            INSERT OR REPLACE INTO autofish_sessions 
+            (user_id, channel_id, guild_id, duration_hours, started_at, end_time) 
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (user_id, channel_id, guild_id, duration_hours, started_at, end_time))
+        await db.commit()
+
+async def save_autofish_summaries(summaries: dict):
+    """Simpan akumulasi tangkapan banyak sesi sekaligus: {user_id: json_text}."""
+    if not summaries:
+        return
+    async with connect() as db:
+        await db.executemany(
+            "UPDATE autofish_sessions SET catch_summary = ? WHERE user_id = ?",
+            [(summary, user_id) for user_id, summary in summaries.items()]
+        )
+        await db.commit()
+
+async def delete_autofish_session(user_id: int):
+    async with connect() as db:
+        await db.execute("DELETE FROM autofish_sessions WHERE user_id = ?", (user_id,))
+        await db.commit()
+
 async def get_tax_system_state():
     """Get the global tax system state."""
-    async with aiosqlite.connect("mochi.db") as db:
+    async with connect() as db:
         db.row_factory = aiosqlite.Row
         await db.execute("INSERT OR IGNORE INTO tax_system_stats (id) VALUES (1)")
         cursor = await db.execute("SELECT * FROM tax_system_stats WHERE id = 1")
@@ -311,7 +1223,7 @@ async def get_tax_system_state():
 
 async def update_tax_system_state(last_forced_tax: str = None):
     """Update the global tax system state."""
-    async with aiosqlite.connect("mochi.db") as db:
+    async with connect() as db:
         await db.execute("INSERT OR IGNORE INTO tax_system_stats (id) VALUES (1)")
         
         set_parts = []
@@ -333,7 +1245,7 @@ async def update_tax_system_state(last_forced_tax: str = None):
 
 async def verify_all_tables():
     """Verify all database tables structure"""
-    async with aiosqlite.connect("mochi.db") as db:
+    async with connect() as db:
         tables = ["users", "jade_stats", "fishing_stats", "fishing_inventory", "fishing_upgrades", "crypto_portfolio"]
         
         print("\n" + "="*60)
@@ -367,7 +1279,7 @@ async def backup_database():
     
     backup_data = {}
     
-    async with aiosqlite.connect("mochi.db") as db:
+    async with connect() as db:
         db.row_factory = aiosqlite.Row
         
         tables = ["users", "jade_stats", "fishing_stats", "fishing_inventory", "fishing_upgrades", "crypto_portfolio"]
@@ -398,16 +1310,328 @@ async def backup_database():
 
 async def reset_table(table_name: str):
     """Reset specific table (BE CAREFUL!)"""
-    async with aiosqlite.connect("mochi.db") as db:
+    async with connect() as db:
         response = input(f"⚠️ Are you sure you want to DELETE all data from '{table_name}'? (yes/no): ")
         if response.lower() == 'yes':
             await db.execute(f"DELETE FROM {table_name}")
             await db.commit()
+            if table_name == "users":
+                invalidate_all_users()
+            elif table_name.startswith("fishing_"):
+                fishing_cache.clear()
             print(f"✅ Table '{table_name}' has been cleared!")
         else:
             print("❌ Operation cancelled.")
 
 
+async def benchmark_pool(commands: int = 300, concurrency: int = 8):
+    """Bandingkan koneksi baru per query vs connection pool.
+
+    Mensimulasikan `mochi!fish` (get_user + stats + upgrades + inventory +
+    update_user) di database sementara, lalu print connects/command dan
+    p99 latency untuk kedua mode.
+    """
+    import os
+    import tempfile
+    global pool
+
+    async def fish_command(user_id: int):
+        if not await get_user(user_id):
+            await create_user(user_id)
+        async with connect() as db:
+            cursor = await db.execute("SELECT * FROM fishing_stats WHERE user_id = ?", (user_id,))
+            if not await cursor.fetchone():
+                await db.execute("INSERT INTO fishing_stats (user_id) VALUES (?)", (user_id,))
+                await db.commit()
+        async with connect() as db:
+            cursor = await db.execute("SELECT upgrade_type, level FROM fishing_upgrades WHERE user_id = ?", (user_id,))
+            await cursor.fetchall()
+        async with connect() as db:
+            await db.execute("""
+                INSERT INTO fishing_inventory (user_id, fish_name, amount)
+                VALUES (?, 'Ikan Mas', 1)
+                ON CONFLICT(user_id, fish_name) DO UPDATE SET amount = amount + 1
+            """, (user_id,))
+            await db.execute("UPDATE fishing_stats SET total_fish_caught = total_fish_caught + 1 WHERE user_id = ?", (user_id,))
+            await db.commit()
+        await update_user(user_id, xp=5, currency=10)
+
+    class PlainConnectPool(ConnectionPool):
+        """Baseline sebelum pool: aiosqlite.connect() polos per query, tanpa pragma."""
+        async def _open(self):
+            self.stats["connects"] += 1
+            return await aiosqlite.connect(self.path)
+
+    async def run(label: str, use_pool: bool):
+        global pool
+        # Database terpisah per mode: journal_mode WAL tersimpan di file,
+        # jadi baseline tidak boleh memakai file yang sudah di-set profile
+        if use_pool:
+            pool = ConnectionPool(os.path.join(tmpdir, "pooled.db"))
+        else:
+            pool = PlainConnectPool(os.path.join(tmpdir, "per_call.db"))
+        await init_db()
+        # User sudah ada sebelum diukur: cek-lalu-insert di fish_command
+        # balapan antar command paralel untuk user yang sama
+        async with connect() as db:
+            await db.executemany("INSERT INTO users (user_id) VALUES (?)", [(1000 + i,) for i in range(50)])
+            await db.executemany("INSERT INTO fishing_stats (user_id) VALUES (?)", [(1000 + i,) for i in range(50)])
+            await db.commit()
+        if use_pool:
+            await pool.start()
+        connects_before = pool.stats["connects"]
+        latencies = []
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(i):
+            async with sem:
+                start = time.perf_counter()
+                await fish_command(1000 + i % 50)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        await asyncio.gather(*(one(i) for i in range(commands)))
+        connects = pool.stats["connects"] - connects_before
+        await pool.close()
+
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{label:12} | connects/command: {connects / commands:5.2f} | p50: {p50:7.2f} ms | p99: {p99:7.2f} ms")
+
+    original_pool = pool
+    tmpdir = tempfile.mkdtemp()
+    try:
+        print("\n" + "="*60)
+        print(f"⏱️  POOL BENCHMARK ({commands} fish commands, concurrency {concurrency})")
+        print("="*60)
+        await run("Per-call", use_pool=False)
+        await run("Pooled", use_pool=True)
+        print("="*60)
+    finally:
+        pool = original_pool
+        for name in os.listdir(tmpdir):
+            os.remove(os.path.join(tmpdir, name))
+        os.rmdir(tmpdir)
+
+
+async def benchmark_fish_writes(catches: int = 200, fish_per_catch: int = 12):
+    """Bandingkan write tangkapan ikan: per-ikan SELECT + UPDATE/INSERT vs executemany upsert.
+
+    Mensimulasikan tangkapan voice-boosted (`fish_per_catch` ikan per tick) di
+    database sementara, lalu print statement SQL dan round trip per tangkapan.
+    """
+    import os
+    import random
+    import tempfile
+    global pool
+
+    fish_names = ["Ikan Teri", "Ikan Bandeng", "Ikan Nila", "Ikan Lele", "Ikan Kakap", "Ikan Tuna"]
+    executed = [0]
+
+    def trace(sql):
+        executed[0] += 1
+
+    async def legacy_catch(user_id, caught):
+        round_trips = 0
+        async with connect() as db:
+            for fish_name, amount in caught:
+                cursor = await db.execute("""
+                    SELECT amount FROM fishing_inventory WHERE user_id = ? AND fish_name = ?
+                """, (user_id, fish_name))
+                row = await cursor.fetchone()
+                if row:
+                    await db.execute("""
+                        UPDATE fishing_inventory SET amount = amount + ? WHERE user_id = ? AND fish_name = ?
+                    """, (amount, user_id, fish_name))
+                else:
+                    await db.execute("""
+                        INSERT INTO fishing_inventory (user_id, fish_name, amount) VALUES (?, ?, ?)
+                    """, (user_id, fish_name, amount))
+                round_trips += 2
+            await db.execute("""
+                UPDATE fishing_stats SET total_fish_caught = total_fish_caught + ? WHERE user_id = ?
+            """, (sum(amount for _, amount in caught), user_id))
+            await db.commit()
+        return round_trips + 2
+
+    async def upsert_catch(user_id, caught):
+        queue = WriteBehindQueue(mode="strict")
+        await queue.add_fish_catch(user_id, caught)
+        return queue.stats["statements"] + 1  # + commit
+
+    async def run(label, write):
+        await pool.start()
+        for conn in pool._connections:
+            await conn.set_trace_callback(trace)
+        async with connect() as db:
+            await db.execute("DELETE FROM fishing_inventory")
+            await db.execute("INSERT OR IGNORE INTO fishing_stats (user_id) VALUES (1)")
+            await db.commit()
+
+        rng = random.Random(42)
+        executed[0] = 0
+        round_trips = 0
+        start = time.perf_counter()
+        for _ in range(catches):
+            caught = [(rng.choice(fish_names), rng.randint(1, 3)) for _ in range(fish_per_catch)]
+            round_trips += await write(1, caught)
+        elapsed = (time.perf_counter() - start) * 1000
+        statements = executed[0]
+        await pool.close()
+        print(
+            f"{label:12} | SQL/catch: {statements / catches:6.2f} | round trips/catch: {round_trips / catches:6.2f} "
+            f"| {elapsed / catches:6.2f} ms/catch"
+        )
+
+    original_pool = pool
+    tmpdir = tempfile.mkdtemp()
+    try:
+        pool = ConnectionPool(os.path.join(tmpdir, "bench.db"))
+        await run_migrations()
+
+        print("\n" + "="*60)
+        print(f"⏱️  FISH WRITE BENCHMARK ({catches} catches x {fish_per_catch} fish)")
+        print("="*60)
+        await run("Per-fish", legacy_catch)
+        await run("Upsert", upsert_catch)
+        print("="*60)
+    finally:
+        pool = original_pool
+        for name in os.listdir(tmpdir):
+            os.remove(os.path.join(tmpdir, name))
+        os.rmdir(tmpdir)
+
+
+# ============================================
+# SHARED QUERIES
+# ============================================
+
+# SQL query panas dipakai langsung oleh cog DAN oleh check_query_plans(),
+# jadi plan yang dicek selalu plan yang benar-benar dijalankan.
+LEVEL_BOARD_QUERY = """
+    SELECT user_id, level, currency
+    FROM users
+    ORDER BY level DESC, currency DESC
+    LIMIT ?
+"""
+
+JADE_SORTS = {
+    "profit": "profit DESC",
+    "spent": "total_spent DESC",
+    "won": "total_won DESC",
+    "cuts": "total_cuts DESC",
+    "jackpots": "total_jackpots DESC",
+    "winrate": "win_rate DESC",
+}
+
+JADE_BOARD_QUERY = """
+    SELECT user_id, total_spent, total_won, total_cuts, total_wins, total_losses, total_jackpots,
+           profit, win_rate
+    FROM jade_stats
+    {where}
+    ORDER BY {order_by}
+    LIMIT ?
+"""
+
+def jade_board_query(sort_key: str) -> str:
+    """JADE_BOARD_QUERY untuk satu sort (winrate hanya user yang pernah cut)."""
+    where = "WHERE total_cuts > 0" if sort_key == "winrate" else ""
+    return JADE_BOARD_QUERY.format(where=where, order_by=JADE_SORTS[sort_key])
+
+TAX_HISTORY_QUERY = """
+    SELECT tax_type, amount, collected_at FROM tax_history
+    WHERE user_id = ?
+    ORDER BY collected_at DESC
+    LIMIT ?
+"""
+
+TRADE_HISTORY_QUERY = """
+    SELECT * FROM trade_history 
+    WHERE user_id = ? 
+    ORDER BY timestamp DESC 
+    LIMIT ?
+"""
+
+QUEST_COMPLETION_QUERY = """
+    SELECT user_id, current_progress 
+    FROM quest_progress 
+    WHERE quest_id = ? AND completed = 0 AND current_progress >= ?
+"""
+
+RANK_LEVEL_QUERY = "SELECT COUNT(*) FROM users WHERE (level, currency) > (?, ?)"
+RANK_FISHING_QUERY = "SELECT COUNT(*) FROM fishing_stats WHERE total_fish_caught > ?"
+RANK_JADE_QUERY = "SELECT COUNT(*) FROM jade_stats WHERE profit > ?"
+
+KUMPUL_ACTIVE_FOR_USER_QUERY = """
+    SELECT * FROM kumpul_tracking 
+    WHERE user_id = ? AND status IN ('active', 'calculating')
+    LIMIT 1
+"""
+KUMPUL_ACTIVE_QUERY = "SELECT * FROM kumpul_tracking WHERE status = 'active' OR status = 'calculating'"
+
+# Query panas yang wajib pakai index: (label, sql, params)
+HOT_QUERIES = [
+    ("mochi!top", LEVEL_BOARD_QUERY, (10,)),
+    *[(f"mochi!jlb {sort_key}", jade_board_query(sort_key), (10,)) for sort_key in ("profit", "cuts", "winrate")],
+    ("mochi!taxh", TAX_HISTORY_QUERY, (1, 10)),
+    ("mochi!history", TRADE_HISTORY_QUERY, (1, 10)),
+    ("quest completion poll", QUEST_COMPLETION_QUERY, ("q", 10)),
+    ("mochi!myrank level", RANK_LEVEL_QUERY, (5, 1000)),
+    ("mochi!myrank fishing", RANK_FISHING_QUERY, (10,)),
+    ("mochi!myrank jade", RANK_JADE_QUERY, (0,)),
+    ("kumpul active session", KUMPUL_ACTIVE_FOR_USER_QUERY, (1,)),
+    ("kumpul scheduler load", KUMPUL_ACTIVE_QUERY, ()),
+]
+
+async def check_query_plans(path: str = None):
+    """EXPLAIN QUERY PLAN untuk HOT_QUERIES; gagal jika ada yang full scan / temp sort.
+
+    Default dicek di database sementara hasil run_migrations() (schema bersih),
+    atau di `path` jika diberikan. Return list label query yang gagal.
+    """
+    import os
+    import tempfile
+    global pool
+
+    original_pool = pool
+    tmpdir = None
+    if path is None:
+        tmpdir = tempfile.mkdtemp()
+        path = os.path.join(tmpdir, "plans.db")
+
+    failures = []
+    try:
+        pool = ConnectionPool(path)
+        if tmpdir:
+            await run_migrations()
+
+        print("\n" + "="*60)
+        print("🔍 QUERY PLAN CHECK")
+        print("="*60)
+        async with connect() as db:
+            for label, sql, params in HOT_QUERIES:
+                cursor = await db.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                details = [row[3] for row in await cursor.fetchall()]
+                bad = [
+                    d for d in details
+                    if (d.startswith("SCAN") and "INDEX" not in d) or "TEMP B-TREE" in d
+                ]
+                if bad:
+                    failures.append(label)
+                    print(f"❌ {label}: {' | '.join(details)}")
+                else:
+                    print(f"✅ {label}: {' | '.join(details)}")
+        print("="*60)
+        print(f"{len(HOT_QUERIES) - len(failures)}/{len(HOT_QUERIES)} query pakai index")
+    finally:
+        pool = original_pool
+        if tmpdir:
+            for name in os.listdir(tmpdir):
+                os.remove(os.path.join(tmpdir, name))
+            os.rmdir(tmpdir)
+    return failures
+
+
 # ============================================
 # STANDALONE SCRIPTS
 # ============================================
@@ -426,19 +1650,25 @@ if __name__ == "__main__":
         print("="*60)
         print("1. Verify all tables")
         print("2. Backup database")
-        print("3. Migrate jade_stats (add new columns)")
+        print("3. Run pending schema migrations")
         print("4. Initialize/Reset database")
-        print("5. Exit")
+        print("5. Benchmark connection pool")
+        print("6. Check hot query plans")
+        print("7. Benchmark fish writes")
+        print("8. Check level formulas")
+        print("9. Check fish sampler (alias table)")
+        print("10. Check fish tables (real fish data)")
+        print("11. Exit")
         print("="*60)
         
-        choice = input("\nSelect option (1-5): ")
+        choice = input("\nSelect option (1-11): ")
         
         if choice == "1":
             await verify_all_tables()
         elif choice == "2":
             await backup_database()
         elif choice == "3":
-            await migrate_jade_stats()
+            await run_migrations()
         elif choice == "4":
             confirm = input("⚠️ This will recreate all tables. Continue? (yes/no): ")
             if confirm.lower() == "yes":
@@ -446,6 +1676,22 @@ if __name__ == "__main__":
             else:
                 print("❌ Cancelled")
         elif choice == "5":
+            await benchmark_pool()
+        elif choice == "6":
+            if await check_query_plans():
+                print("❌ Ada query panas yang full scan!")
+        elif choice == "7":
+            await benchmark_fish_writes()
+        elif choice == "8":
+            from utils.helpers import check_level_formulas
+            check_level_formulas()
+        elif choice == "9":
+            from utils.helpers import check_alias_sampler
+            check_alias_sampler()
+        elif choice == "10":
+            from cogs.fishing import check_fish_tables
+            check_fish_tables()
+        elif choice == "11":
             print("👋 Goodbye!")
             sys.exit(0)
         else:
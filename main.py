@@ -2,8 +2,9 @@
 import discord
 from discord.ext import commands
 import asyncio
+import time
 
-from database import init_db, migrate_jade_stats
+from database import run_migrations, open_db, close_db
 from utils.config_secrets import TOKEN
 
 # Setup bot
@@ -12,48 +13,138 @@ intents.message_content = True
 intents.reactions = True
 intents.members = True
 
-bot = commands.Bot(command_prefix="mochi!", intents=intents, help_command=None)
+# Cog registry: {extension: [dependency, ...]}
+# Dependency = cog yang dipakai lewat bot.get_cog(...) dan harus sudah ada
+# sebelum cog ini diload. Cog tanpa hubungan diload paralel per gelombang.
+COG_REGISTRY = {
+    'cogs.achievements': [],
+    'cogs.tax': [],
+    'cogs.economy': [],
+    'cogs.inventory': [],
+    'cogs.error_handler': [],
+    'cogs.shop': [],    # NEW TAX SYSTEM!
+    'cogs.quests': ['cogs.achievements'],
+    'cogs.leveling': ['cogs.achievements'],
+    'cogs.fishing': ['cogs.achievements', 'cogs.quests'],
+    'cogs.gacha': ['cogs.quests'],
+    'cogs.jade': ['cogs.quests'],
+    'cogs.trading': ['cogs.quests', 'cogs.tax'],
+    'cogs.admin': ['cogs.quests', 'cogs.leveling'],
+    'cogs.trading_advanced': ['cogs.trading'],
+    'cogs.leaderboards': ['cogs.fishing', 'cogs.trading'],
+}
+
+def resolve_load_waves(registry):
+    """Kelompokkan cog menjadi gelombang load (topological sort per level)."""
+    remaining = {cog: set(deps) for cog, deps in registry.items()}
+    for cog, deps in remaining.items():
+        unknown = deps - registry.keys()
+        if unknown:
+            raise ValueError(f"{cog} depends on unknown cog(s): {', '.join(sorted(unknown))}")
+    
+    waves = []
+    done = set()
+    while remaining:
+        wave = sorted(cog for cog, deps in remaining.items() if deps <= done)
+        if not wave:
+            raise ValueError(f"Circular cog dependency: {', '.join(sorted(remaining))}")
+        waves.append(wave)
+        done.update(wave)
+        for cog in wave:
+            del remaining[cog]
+    return waves
+
+class MochiBot(commands.Bot):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._initialized = False
+
+    async def setup_hook(self):
+        # setup_hook hanya jalan sekali sebelum login, tapi tetap dijaga
+        # supaya reconnect / pemanggilan ulang tidak mengulang startup
+        if self._initialized:
+            return
+        self._initialized = True
+        self._startup_origin = time.perf_counter()
+        self.startup_timeline = []
+
+        # Start shared database connection pool
+        await self._timed("database pool", open_db())
+
+        # Versioned schema migrations (hanya step yang belum diterapkan)
+        await self._timed("migrations", run_migrations())
+
+        await self.load_all_cogs()
+        self.print_startup_timeline()
+
+    async def _timed(self, label, coro):
+        """Jalankan coro dan catat (label, mulai, durasi, error) ke startup_timeline."""
+        start = time.perf_counter()
+        error = None
+        try:
+            return await coro
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.startup_timeline.append(
+                (label, start - self._startup_origin, time.perf_counter() - start, error)
+            )
+
+    async def _load_cog(self, cog):
+        try:
+            await self._timed(cog, self.load_extension(cog))
+            return True
+        except Exception:
+            return False
+
+    async def load_all_cogs(self):
+        """Load cog per gelombang dependency; cog dalam satu gelombang diload paralel."""
+        failed = set()
+        for wave in resolve_load_waves(COG_REGISTRY):
+            to_load = []
+            for cog in wave:
+                broken = [dep for dep in COG_REGISTRY[cog] if dep in failed]
+                if broken:
+                    print(f"⚠️ Skip {cog}: dependency gagal ({', '.join(broken)})")
+                    failed.add(cog)
+                else:
+                    to_load.append(cog)
+
+            results = await asyncio.gather(*(self._load_cog(cog) for cog in to_load))
+            failed.update(cog for cog, ok in zip(to_load, results) if not ok)
+
+        loaded = len(COG_REGISTRY) - len(failed)
+        print(f"📦 {loaded}/{len(COG_REGISTRY)} cogs berhasil dimuat!")
+
+    def print_startup_timeline(self):
+        """Print timeline startup: offset mulai, durasi, dan status per langkah."""
+        total = time.perf_counter() - self._startup_origin
+        print("="*50)
+        print("⏱️  STARTUP TIMELINE")
+        print("="*50)
+        for label, offset, elapsed, error in self.startup_timeline:
+            status = f"❌ {error}" if error else "✅"
+            print(f"  +{offset * 1000:6.0f} ms  {elapsed * 1000:6.0f} ms  {label:24} {status}")
+        print(f"  Total: {total * 1000:.0f} ms")
+        print("="*50)
+
+    async def close(self):
+        # Tutup pool database setelah koneksi Discord selesai
+        try:
+            await super().close()
+        finally:
+            await close_db()
+
+bot = MochiBot(command_prefix="mochi!", intents=intents, help_command=None)
 
 @bot.event
 async def on_ready():
-    # Initialize database with auto migration
-    await init_db()
-    print("✅ Database initialized!")
-    
-    # Auto migration for jade stats
-    await migrate_jade_stats()
-    print("✅ Jade stats migration complete!")
-    
+    # on_ready bisa terpanggil berkali-kali (resume/reconnect): jangan init di sini
     print(f"✅ {bot.user} sudah online!")
     print("🚀 Mochi siap mengumpulkan portfolio!")
-    
-    # Load all cogs
-    cogs_to_load = [
-        'cogs.leveling',
-        'cogs.gacha',
-        'cogs.economy',
-        'cogs.inventory',
-        'cogs.admin',
-        'cogs.error_handler',
-        'cogs.trading',
-        'cogs.fishing',
-        'cogs.jade',
-        'cogs.achievements',
-        'cogs.quests',
-        'cogs.tax',
-        'cogs.shop'    # NEW TAX SYSTEM!
-    ]
-    
-    for cog in cogs_to_load:
-        try:
-            await bot.load_extension(cog)
-            print(f"✅ Loaded: {cog}")
-        except Exception as e:
-            print(f"❌ Failed to load {cog}: {e}")
-    
-    print("📦 Semua cogs berhasil dimuat!")
     print("="*50)
     
 # Jalankan bot
 if __name__ == "__main__":
-    bot.run(TOKEN)
\ No newline at end of file
+    bot.run(TOKEN)
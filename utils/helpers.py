@@ -1,5 +1,12 @@
+import random
+from bisect import bisect_right
+from math import isqrt
+
 from utils.config_secrets import OWNER_ID, RANK_ROLE_IDS
 
+# Reward currency per level naik: 50000 * level_baru
+LEVEL_UP_CURRENCY_PER_LEVEL = 50000
+
 def total_xp_needed_for_level(level: int) -> int:
     """Total XP kumulatif yang dibutuhkan untuk mencapai level ini."""
     if level <= 1:
@@ -7,59 +14,144 @@ def total_xp_needed_for_level(level: int) -> int:
     n = level - 1
     return n * (n + 2)
 
+def get_level_for_xp(xp: int, current_level: int = 1) -> int:
+    """Level tertinggi yang tercapai dengan total XP ini (tidak pernah turun dari current_level).
+
+    total_xp_needed_for_level(L) = L^2 - 1, jadi L = isqrt(xp + 1).
+    """
+    if xp < 0:
+        return current_level
+    return max(current_level, isqrt(xp + 1))
+
+# ============================================
+# RANK TABLE
+# ============================================
+
+# Satu sumber kebenaran untuk semua atribut rank. Harus urut naik per min_level.
+# gacha_rolls / luck = yang didapat per level naik di rank tersebut.
+RANK_TABLE = [
+    {"min_level": 1,  "role": "Warga",     "title": "🧑‍🌾 Warga",    "gacha_rolls": 1, "luck": 1,  "tax_exempt": False},
+    {"min_level": 5,  "role": "Prajurit",  "title": "🛡️ Prajurit",  "gacha_rolls": 1, "luck": 1,  "tax_exempt": False},
+    {"min_level": 10, "role": "Ksatria",   "title": "🏹 Ksatria",   "gacha_rolls": 2, "luck": 2,  "tax_exempt": False},
+    {"min_level": 15, "role": "Bangsawan", "title": "🎩 Bangsawan", "gacha_rolls": 2, "luck": 3,  "tax_exempt": False},
+    {"min_level": 20, "role": "Adipati",   "title": "👑 Adipati",   "gacha_rolls": 2, "luck": 5,  "tax_exempt": True},
+    {"min_level": 25, "role": "Raja",      "title": "🌟 Raja",      "gacha_rolls": 2, "luck": 10, "tax_exempt": True},
+]
+
+_RANK_THRESHOLDS = [rank["min_level"] for rank in RANK_TABLE]
+
+def _build_prefix(key: str):
+    """prefix[i] = total `key` dari level 1 sampai (min_level rank i) - 1."""
+    prefix = [0]
+    for rank, next_rank in zip(RANK_TABLE, RANK_TABLE[1:]):
+        prefix.append(prefix[-1] + rank[key] * (next_rank["min_level"] - rank["min_level"]))
+    return prefix
+
+_RANK_PREFIX = {key: _build_prefix(key) for key in ("gacha_rolls", "luck")}
+
+def _rank_index(level: int) -> int:
+    return max(0, bisect_right(_RANK_THRESHOLDS, level) - 1)
+
+def get_rank(level: int) -> dict:
+    """Baris RANK_TABLE untuk level ini (bisect, O(log n))."""
+    return RANK_TABLE[_rank_index(level)]
+
+def get_cumulative_rank_value(level: int, key: str) -> int:
+    """Total `key` (gacha_rolls/luck) per level dari level 1 sampai level ini."""
+    if level < 1:
+        return 0
+    i = _rank_index(level)
+    rank = RANK_TABLE[i]
+    return _RANK_PREFIX[key][i] + rank[key] * (level - rank["min_level"] + 1)
+
+def is_tax_exempt_level(level: int) -> bool:
+    """Perk bebas pajak (Adipati/Raja)."""
+    return get_rank(level)["tax_exempt"]
+
+def get_level_up_rewards(current_level: int, new_level: int):
+    """Total (currency, gacha_rolls, luck) untuk naik dari current_level ke new_level.
+
+    Closed form, setara dengan menjumlah per level satu per satu.
+    """
+    levels_gained = new_level - current_level
+    if levels_gained <= 0:
+        return 0, 0, 0
+    
+    # sum(50000 * (current_level + i) for i in 1..levels_gained)
+    total_reward = LEVEL_UP_CURRENCY_PER_LEVEL * (
+        levels_gained * current_level + levels_gained * (levels_gained + 1) // 2
+    )
+    
+    # Rolls tiap level baru sesuai rank level itu (prefix sum)
+    total_rolls = (
+        get_cumulative_rank_value(new_level, "gacha_rolls")
+        - get_cumulative_rank_value(current_level, "gacha_rolls")
+    )
+    
+    # Luck per level mengikuti rank level akhir
+    total_luck = get_luck_gain_for_level(new_level) * levels_gained
+    
+    return total_reward, total_rolls, total_luck
+
+def _reference_level_up(xp: int, current_level: int):
+    """Loop per level versi lama check_level_up (acuan untuk check_level_formulas)."""
+    level = current_level
+    while xp >= total_xp_needed_for_level(level + 1):
+        level += 1
+    levels_gained = level - current_level
+    if levels_gained <= 0:
+        return level, (0, 0, 0)
+    total_reward = sum(LEVEL_UP_CURRENCY_PER_LEVEL * (current_level + i) for i in range(1, levels_gained + 1))
+    total_rolls = sum(get_gacha_rolls_for_level(current_level + i) for i in range(1, levels_gained + 1))
+    total_luck = get_luck_gain_for_level(level) * levels_gained
+    return level, (total_reward, total_rolls, total_luck)
+
+def check_level_formulas(max_level: int = 200, samples: int = 20000, seed: int = 1234):
+    """Bandingkan get_level_for_xp + get_level_up_rewards dengan loop lama.
+
+    Dicek di semua batas level (XP tepat di threshold dan 1 di bawahnya) sampai
+    max_level, plus `samples` pasangan (xp, current_level) acak (seeded).
+    Return list (xp, current_level) yang hasilnya beda.
+    """
+    rng = random.Random(seed)
+    cases = []
+    for level in range(1, max_level + 1):
+        threshold = total_xp_needed_for_level(level)
+        for xp in (threshold - 1, threshold, threshold + 1):
+            for current_level in (1, max(1, level - 1), level):
+                cases.append((xp, current_level))
+    for _ in range(samples):
+        current_level = rng.randint(1, max_level)
+        xp = rng.randint(total_xp_needed_for_level(current_level), total_xp_needed_for_level(max_level))
+        cases.append((xp, current_level))
+
+    failures = []
+    for xp, current_level in cases:
+        level = get_level_for_xp(xp, current_level)
+        expected_level, expected_rewards = _reference_level_up(xp, current_level)
+        if level != expected_level or get_level_up_rewards(current_level, level) != expected_rewards:
+            failures.append((xp, current_level))
+
+    print(f"{'✅' if not failures else '❌'} Level formulas: {len(cases) - len(failures)}/{len(cases)} kasus sama dengan loop lama")
+    for xp, current_level in failures[:10]:
+        print(f"   ❌ xp={xp} current_level={current_level}")
+    return failures
+
 def get_rank_title(level: int) -> str:
     """Kembalikan gelar medival berdasarkan level."""
-    if level >= 25:
-        return "🌟 Raja"
-    elif level >= 20:
-        return "👑 Adipati"
-    elif level >= 15:
-        return "🎩 Bangsawan"
-    elif level >= 10:
-        return "🏹 Ksatria"
-    elif level >= 5:
-        return "🛡️ Prajurit"
-    else:
-        return "🧑‍🌾 Warga"
+    return get_rank(level)["title"]
 
 def get_rank_role_name(level: int) -> str:
     """Kembalikan nama role Discord (tanpa emoji)."""
-    if level >= 25:
-        return "Raja"
-    elif level >= 20:
-        return "Adipati"
-    elif level >= 15:
-        return "Bangsawan"
-    elif level >= 10:
-        return "Ksatria"
-    elif level >= 5:
-        return "Prajurit"
-    else:
-        return "Warga"
+    return get_rank(level)["role"]
 
 def get_gacha_rolls_for_level(level: int) -> int:
     """Hitung berapa gacha rolls yang didapat berdasarkan rank saat naik level."""
-    if level >= 15:  # Bangsawan ke atas
-        return 2
-    elif level >= 10:  # Ksatria
-        return 2
-    else:
-        return 1
+    return get_rank(level)["gacha_rolls"]
 
 def get_luck_gain_for_level(level: int) -> int:
     """Hitung berapa luck yang didapat berdasarkan rank."""
-    if level >= 25:  # Raja
-        return 10
-    elif level >= 20:  # Adipati
-        return 5
-    elif level >= 15:  # Bangsawan
-        return 3
-    elif level >= 10:  # Ksatria
-        return 2
-    elif level >= 5:  # Prajurit
-        return 1
-    else:  # Warga
-        return 1
+    return get_rank(level)["luck"]
     
 # Achievement Luck Integration
 async def get_total_luck(bot, user_id: int):
@@ -84,4 +176,93 @@ async def get_total_luck(bot, user_id: int):
     
     total_luck = base_luck + achievement_luck
     
-    return base_luck, achievement_luck, total_luck
\ No newline at end of file
+    return base_luck, achievement_luck, total_luck
+
+# ============================================
+# WEIGHTED SAMPLING (ALIAS METHOD)
+# ============================================
+
+def build_alias_table(weights):
+    """Vose alias table untuk weights -> (prob, alias).
+
+    Build O(n) sekali, lalu tiap sample O(1): pilih kolom acak i,
+    ambil i dengan peluang prob[i], selain itu alias[i].
+    """
+    n = len(weights)
+    total = sum(weights)
+    scaled = [w * n / total for w in weights]
+    prob = [1.0] * n
+    alias = list(range(n))
+
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] += scaled[s] - 1.0
+        (small if scaled[l] < 1.0 else large).append(l)
+    # Sisa (karena pembulatan float) = kolom penuh, prob tetap 1.0
+    return prob, alias
+
+def alias_sample(table, k: int = 1, rng=random):
+    """Ambil k index dari alias table (dengan pengembalian)."""
+    prob, alias = table
+    n = len(prob)
+    result = []
+    for _ in range(k):
+        i = int(rng.random() * n)
+        result.append(i if rng.random() < prob[i] else alias[i])
+    return result
+
+def alias_probabilities(table):
+    """Peluang eksak tiap index menurut alias table (untuk verifikasi)."""
+    prob, alias = table
+    n = len(prob)
+    result = [0.0] * n
+    for i in range(n):
+        result[i] += prob[i] / n
+        result[alias[i]] += (1.0 - prob[i]) / n
+    return result
+
+def check_alias_sampler(weight_sets=None, samples: int = 200000, seed: int = 1234):
+    """Verifikasi alias table: peluang eksak + histogram sampel (seeded) vs weights.
+
+    Peluang eksak harus sama dengan weight ternormalisasi (toleransi 1e-9);
+    frekuensi sampel harus dalam 5 standar deviasi binomial. Return list
+    index weight set yang gagal.
+    """
+    rng = random.Random(seed)
+    if weight_sets is None:
+        weight_sets = [
+            [1],
+            [1, 1, 1, 1],
+            [40, 30, 20, 25, 15, 12, 13, 7, 5, 6, 3, 2, 0.5, 0.1],
+            [1000, 1, 0.01],
+            [rng.uniform(0.01, 100) for _ in range(50)],
+        ]
+
+    failures = []
+    for index, weights in enumerate(weight_sets):
+        total = sum(weights)
+        expected = [w / total for w in weights]
+        table = build_alias_table(weights)
+
+        exact_error = max(abs(p - e) for p, e in zip(alias_probabilities(table), expected))
+
+        counts = [0] * len(weights)
+        for i in alias_sample(table, samples, rng):
+            counts[i] += 1
+        worst_sigma = 0.0
+        for count, p in zip(counts, expected):
+            sigma = (samples * p * (1 - p)) ** 0.5
+            worst_sigma = max(worst_sigma, abs(count - samples * p) / sigma if sigma else abs(count - samples * p))
+
+        ok = exact_error < 1e-9 and worst_sigma < 5
+        if not ok:
+            failures.append(index)
+        print(
+            f"{'✅' if ok else '❌'} Alias set #{index} ({len(weights)} weights): "
+            f"error peluang {exact_error:.1e}, deviasi sampel maks {worst_sigma:.2f}σ"
+        )
+    return failures